@@ -0,0 +1,92 @@
+"""
+Shared helpers for the Rocket Logbook benchmarks.
+
+The benchmarks are standalone scripts run from the repository root, e.g.
+``python benchmarks/bench_storage.py``. They generate synthetic logbooks that
+resemble real ones (the same rockets, motors and notes as the demo script).
+"""
+
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+# Make the rocket_logbook package importable without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rocket_logbook.models import LaunchRecord
+
+ROCKETS = [
+    {"name": "Estes Alpha III", "motors": ["A8-3", "B6-4", "C6-5"]},
+    {"name": "Quest Big Dog", "motors": ["B4-4", "B6-4", "C6-5"]},
+    {"name": "FlisKits Deuce's Wild", "motors": ["A8-3", "B4-2"]},
+    {"name": "Estes Crossfire ISX", "motors": ["D12-5", "E9-6"]},
+    {"name": "LOC Precision Onyx", "motors": ["E9-4", "E12-4", "F10-4"]}
+]
+
+NOTES = [
+    "Perfect flight, straight as an arrow!",
+    "Slight wind drift but good recovery.",
+    "Parachute failed to deploy fully.",
+    "Motor ejection was delayed, minor damage to rocket.",
+    "Great flight but landed in a tree.",
+    "First flight with this rocket.",
+    "Modified rocket with custom fins.",
+    "Recovery was in tall grass, almost lost it!",
+    "Crowd favorite at the club launch.",
+    ""
+]
+
+def generate_records(count, seed=42):
+    """
+    Generate a list of synthetic launch records.
+
+    Args:
+        count: Number of records to generate
+        seed: Random seed, so runs are comparable
+
+    Returns:
+        list: List of LaunchRecord objects with ids 1..count
+    """
+    rng = random.Random(seed)
+    start_date = datetime(2015, 1, 1)
+    records = []
+
+    for i in range(1, count + 1):
+        rocket = rng.choice(ROCKETS)
+        records.append(LaunchRecord(
+            id=i,
+            date=(start_date + timedelta(days=rng.randint(0, 3650))).strftime("%Y-%m-%d"),
+            rocket_name=rocket["name"],
+            motor_type=rng.choice(rocket["motors"]),
+            altitude=rng.uniform(50, 900),
+            success=rng.random() < 0.8,
+            notes=rng.choice(NOTES)
+        ))
+
+    return records
+
+def time_call(function, repeat=3):
+    """
+    Time a function call, returning the best of several runs in seconds.
+
+    Args:
+        function: Callable taking no arguments
+        repeat: Number of runs
+
+    Returns:
+        float: Fastest run time in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def parse_sizes(text):
+    """Parse a comma separated list of logbook sizes, e.g. "1000,100000"."""
+    return [int(size) for size in text.split(",") if size.strip()]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codecs used for the data file.
+
+Compares load and save time of every installed codec (the standard library
+json module, orjson, msgspec) at several logbook sizes, and checks that a
+file saved with each codec loads back to the same records with every other
+codec.
+
+Usage:
+    python benchmarks/bench_codecs.py [--sizes 1000,10000,100000] [--layout compact] [--repeat 3]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+from rich.console import Console
+from rich.table import Table
+
+from _common import generate_records, time_call, parse_sizes
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.storage import available_codecs
+
+console = Console()
+
+def run(sizes, layout, repeat):
+    """Run the benchmark for each size and codec and print a results table."""
+    codecs = available_codecs()
+    console.print(f"Installed codecs: {', '.join(codecs)}")
+
+    table = Table(show_header=True, header_style="bold magenta", title=f"JSON codecs ({layout} layout)")
+    table.add_column("Records", justify="right")
+    table.add_column("Codec")
+    table.add_column("Load (s)", justify="right")
+    table.add_column("Save (s)", justify="right")
+    table.add_column("Load vs json", justify="right")
+    table.add_column("Save vs json", justify="right")
+    table.add_column("Round trip")
+    ok = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            records = generate_records(size)
+            expected = [record.to_dict() for record in records]
+            baseline = None
+
+            for codec in reversed(codecs):
+                path = os.path.join(directory, f"{size}-{codec}.json")
+                manager = DataManager(path, layout=layout, history=False, result_cache=False, codec=codec)
+
+                save_time = time_call(lambda: manager._save_records(records), repeat)
+                load_time = time_call(manager.get_all_records, repeat)
+                if baseline is None:
+                    baseline = (load_time, save_time)
+
+                # Every codec must read what this one wrote
+                round_trip = all(
+                    [record.to_dict() for record in DataManager(path, history=False, codec=reader).get_all_records()] == expected
+                    for reader in codecs
+                )
+                ok = ok and round_trip
+
+                table.add_row(
+                    str(size), codec,
+                    f"{load_time:.3f}",
+                    f"{save_time:.3f}",
+                    f"{baseline[0] / load_time:.1f}x",
+                    f"{baseline[1] / save_time:.1f}x",
+                    "[green]ok[/green]" if round_trip else "[red]mismatch[/red]"
+                )
+
+    console.print(table)
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs for the data file")
+    parser.add_argument("--sizes", type=parse_sizes, default=[1000, 10000, 100000],
+                        help="Comma separated logbook sizes")
+    parser.add_argument("--layout", choices=["pretty", "compact"], default="compact",
+                        help="JSON layout of the data file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.sizes, args.layout, args.repeat) else 1)
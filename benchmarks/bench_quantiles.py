@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark and accuracy check for the altitude quantile sketches.
+
+For each logbook size, builds sketches per rocket in several partitions,
+merges them, and compares estimated percentiles against exact ones computed
+by sorting. Reports the worst observed rank error against the documented
+bound, the number of values the sketches retain, and build/query times.
+
+Usage:
+    python benchmarks/bench_quantiles.py [--sizes 10000,100000,1000000] [--partitions 4]
+"""
+
+import sys
+import bisect
+import argparse
+from rich.console import Console
+from rich.table import Table
+
+from _common import generate_records, time_call, parse_sizes
+from rocket_logbook.sketches import DEFAULT_RANK_ERROR
+from rocket_logbook.stats import build_altitude_sketches, merge_altitude_sketches
+
+console = Console()
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+def worst_rank_error(sketch, exact_sorted):
+    """Largest difference between the requested and the true rank of an estimate."""
+    worst = 0
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        true_rank = bisect.bisect_right(exact_sorted, estimate) / len(exact_sorted)
+        worst = max(worst, abs(true_rank - q))
+    return worst
+
+def run(sizes, partitions):
+    """Run the benchmark for each size and print a results table."""
+    table = Table(show_header=True, header_style="bold magenta",
+                  title=f"Altitude sketches (bound {DEFAULT_RANK_ERROR:.1%})")
+    table.add_column("Records", justify="right")
+    table.add_column("Build (s)", justify="right")
+    table.add_column("Sort exact (s)", justify="right")
+    table.add_column("Retained values", justify="right")
+    table.add_column("Worst rank error", justify="right")
+    table.add_column("Within bound")
+
+    failed = False
+    for size in sizes:
+        records = generate_records(size)
+        chunk = (size + partitions - 1) // partitions
+
+        def build():
+            merged = build_altitude_sketches([])
+            for start in range(0, size, chunk):
+                merge_altitude_sketches(merged, build_altitude_sketches(records[start:start + chunk]))
+            return merged
+
+        build_time = time_call(build, 1)
+        sketches = build()
+
+        exact = {}
+        def sort_exact():
+            exact.clear()
+            for record in records:
+                exact.setdefault(record.rocket_name, []).append(record.altitude)
+            for values in exact.values():
+                values.sort()
+        sort_time = time_call(sort_exact, 1)
+
+        worst = worst_rank_error(sketches['all'], sorted(record.altitude for record in records))
+        for name, sketch in sketches['rocket'].items():
+            worst = max(worst, worst_rank_error(sketch, exact[name]))
+        retained = sum(len(compactor) for sketch in [sketches['all'], *sketches['rocket'].values()]
+                       for compactor in sketch.compactors)
+
+        within = worst <= DEFAULT_RANK_ERROR
+        failed = failed or not within
+        table.add_row(str(size), f"{build_time:.3f}", f"{sort_time:.3f}", str(retained),
+                      f"{worst:.4f}", "[green]yes[/green]" if within else "[red]no[/red]")
+
+    console.print(table)
+    return not failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark altitude quantile sketches")
+    parser.add_argument("--sizes", type=parse_sizes, default=[10000, 100000, 1000000],
+                        help="Comma separated logbook sizes")
+    parser.add_argument("--partitions", type=int, default=4, help="Number of sketches merged per group")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.sizes, args.partitions) else 1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage options: JSON layout and compression.
+
+Compares file size, load time and save time for each combination of layout
+(pretty, compact) and compression (none, gzip, lzma) at several logbook sizes.
+
+Usage:
+    python benchmarks/bench_storage.py [--sizes 1000,10000,100000] [--repeat 3]
+"""
+
+import os
+import argparse
+import tempfile
+from rich.console import Console
+from rich.table import Table
+
+from _common import generate_records, time_call, parse_sizes
+from rocket_logbook.data_manager import DataManager
+
+console = Console()
+
+OPTIONS = [
+    ("pretty", "none", ".json"),
+    ("compact", "none", ".json"),
+    ("pretty", "gzip", ".json.gz"),
+    ("compact", "gzip", ".json.gz"),
+    ("compact", "lzma", ".json.xz"),
+]
+
+def run(sizes, repeat):
+    """Run the benchmark for each size and print a results table."""
+    table = Table(show_header=True, header_style="bold magenta", title="Storage options")
+    table.add_column("Records", justify="right")
+    table.add_column("Layout")
+    table.add_column("Compression")
+    table.add_column("Size (KiB)", justify="right")
+    table.add_column("Size vs pretty", justify="right")
+    table.add_column("Load (s)", justify="right")
+    table.add_column("Save (s)", justify="right")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            records = generate_records(size)
+            baseline = None
+
+            for layout, compression, extension in OPTIONS:
+                path = os.path.join(directory, f"{size}-{layout}-{compression}{extension}")
+                manager = DataManager(path, layout=layout, compression=compression)
+
+                save_time = time_call(lambda: manager._save_records(records), repeat)
+                load_time = time_call(manager.get_all_records, repeat)
+                file_size = os.path.getsize(path)
+                if baseline is None:
+                    baseline = file_size
+
+                table.add_row(
+                    str(size), layout, compression,
+                    f"{file_size / 1024:.1f}",
+                    f"{file_size / baseline * 100:.0f}%",
+                    f"{load_time:.3f}",
+                    f"{save_time:.3f}"
+                )
+
+    console.print(table)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logbook storage options")
+    parser.add_argument("--sizes", type=parse_sizes, default=[1000, 10000, 100000],
+                        help="Comma separated logbook sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Stress test and throughput benchmark for the thread-safe DataManager.
+
+The stress test runs writer threads that each add records while reader
+threads list, search and compute statistics, then checks that no write was
+lost, that every ID is unique and that the data file matches memory. The
+same workload is run against a plain DataManager for comparison, which is
+expected to lose writes.
+
+The throughput test measures reads per second with 1, 2, 4 and 8 reader
+threads, for the cached thread-safe DataManager and for the plain one that
+parses the data file on every read.
+
+Usage:
+    python benchmarks/bench_threads.py [--records 10000] [--writers 4] [--writes 25] [--seconds 2]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from rich.console import Console
+from rich.table import Table
+
+from _common import generate_records
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.threadsafe import ThreadSafeDataManager
+from rocket_logbook.models import LaunchRecord
+
+console = Console()
+
+THREAD_COUNTS = [1, 2, 4, 8]
+
+def new_launch(writer, index):
+    """Build a record for a writer thread; its ID is assigned when added."""
+    return LaunchRecord(0, "2024-06-01", f"Writer {writer}", "C6-5", 100.0 + index, True, f"write {index}")
+
+def stress(manager_class, path, records, writers, writes):
+    """
+    Run concurrent writers and readers against one DataManager.
+
+    Returns:
+        tuple: (expected record count, records in the data file, duplicate IDs, errors)
+    """
+    manager = manager_class(path, history=False)
+    manager.add_records(records)
+    errors = []
+    stop = threading.Event()
+
+    def write(writer):
+        for index in range(writes):
+            try:
+                record = new_launch(writer, index)
+                if isinstance(manager, ThreadSafeDataManager):
+                    manager.add_new_record(record)
+                else:
+                    # The usual unsynchronized read-modify-write
+                    record.id = manager.get_next_id()
+                    manager.add_record(record)
+            except Exception as e:
+                errors.append(f"writer: {type(e).__name__}: {e}")
+
+    def read():
+        while not stop.is_set():
+            try:
+                manager.get_all_records()
+                manager.search_records("writer")
+                manager.get_statistics_snapshot()
+            except Exception as e:
+                errors.append(f"reader: {type(e).__name__}: {e}")
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writer_threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in readers + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    stored = DataManager(path, history=False).get_all_records()
+    ids = [record.id for record in stored]
+    return len(records) + writers * writes, len(stored), len(ids) - len(set(ids)), errors
+
+def throughput(manager, threads, seconds):
+    """Measure the number of get_all_records calls per second with several threads."""
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def read(slot):
+        while time.perf_counter() < deadline:
+            manager.get_all_records()
+            counts[slot] += 1
+
+    workers = [threading.Thread(target=read, args=(slot,)) for slot in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+def run(size, writers, writes, seconds):
+    """Run the stress and throughput tests and print the results."""
+    records = generate_records(size)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        table = Table(show_header=True, header_style="bold magenta", title="Concurrent writers")
+        table.add_column("DataManager")
+        table.add_column("Expected", justify="right")
+        table.add_column("Stored", justify="right")
+        table.add_column("Duplicate IDs", justify="right")
+        table.add_column("Errors", justify="right")
+        table.add_column("Correct")
+        for name, manager_class in (("thread-safe", ThreadSafeDataManager), ("plain", DataManager)):
+            path = os.path.join(directory, f"stress-{name}.json")
+            expected, stored, duplicates, errors = stress(manager_class, path, records, writers, writes)
+            correct = expected == stored and not duplicates and not errors
+            if manager_class is ThreadSafeDataManager:
+                ok = ok and correct
+            table.add_row(name, str(expected), str(stored), str(duplicates), str(len(errors)),
+                          "[green]yes[/green]" if correct else "[red]no[/red]")
+        console.print(table)
+
+        table = Table(show_header=True, header_style="bold magenta", title=f"Reads per second ({size} records)")
+        table.add_column("Threads", justify="right")
+        table.add_column("Thread-safe (cached)", justify="right")
+        table.add_column("Plain (parses file)", justify="right")
+        table.add_column("Speedup", justify="right")
+        path = os.path.join(directory, "throughput.json")
+        DataManager(path, history=False).add_records(records)
+        cached = ThreadSafeDataManager(path, history=False)
+        plain = DataManager(path, history=False)
+        for threads in THREAD_COUNTS:
+            cached_rate = throughput(cached, threads, seconds)
+            plain_rate = throughput(plain, threads, seconds)
+            table.add_row(str(threads), f"{cached_rate:,.0f}", f"{plain_rate:,.1f}",
+                          f"{cached_rate / plain_rate:,.0f}x" if plain_rate else "-")
+        console.print(table)
+
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress test the thread-safe DataManager")
+    parser.add_argument("--records", type=int, default=10000, help="Records in the logbook")
+    parser.add_argument("--writers", type=int, default=4, help="Number of writer threads")
+    parser.add_argument("--writes", type=int, default=25, help="Records added by each writer")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration of each throughput run")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.records, args.writers, args.writes, args.seconds) else 1)
@@ -0,0 +1,259 @@
+import json
+import shlex
+from rocket_logbook.models import LaunchRecord, RECORD_FIELDS
+from rocket_logbook.session import LogbookSession
+from rocket_logbook.stats import summarize_records
+from rocket_logbook.validation import check_record_fields
+
+# Commands understood in a batch file
+BATCH_COMMANDS = ('add', 'update', 'delete', 'search', 'stats', 'export', 'commit')
+
+# Words accepted as true and false for the success field
+TRUE_WORDS = ('true', 'yes', 'y', '1')
+FALSE_WORDS = ('false', 'no', 'n', '0')
+
+class BatchError(Exception):
+    """A batch command that could not be carried out."""
+
+def _convert_field(field, value):
+    """Convert a key=value argument to the type of the record field."""
+    try:
+        if field == 'id':
+            return int(value)
+        if field == 'altitude':
+            return float(value)
+    except ValueError:
+        raise BatchError(f"{field} must be a number, got {value!r}")
+    if field == 'success':
+        if value.lower() in TRUE_WORDS:
+            return True
+        if value.lower() in FALSE_WORDS:
+            return False
+        raise BatchError(f"success must be true or false, got {value!r}")
+    return value
+
+def parse_command(line):
+    """
+    Parse one line of a batch file.
+
+    A line is either a JSON object with an "op" key and the arguments, e.g.
+    {"op": "delete", "id": 3}, or a command followed by key=value
+    arguments, e.g. add date=2024-06-01 rocket_name="Big Bertha" ...
+    Quoting follows shell rules. search and export also take their term
+    or file as a bare word.
+
+    Args:
+        line: Line of the batch file, without the newline
+
+    Returns:
+        tuple: (command, dict of arguments), or None for a blank or
+            comment line
+
+    Raises:
+        BatchError: If the line cannot be parsed
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        try:
+            arguments = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise BatchError(f"invalid JSON: {e}")
+        if not isinstance(arguments, dict):
+            raise BatchError("expected a JSON object")
+        command = arguments.pop('op', None)
+    else:
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            raise BatchError(f"cannot parse line: {e}")
+        command = words[0]
+        arguments = {}
+        for word in words[1:]:
+            field, equals, value = word.partition('=')
+            if not equals:
+                if command not in ('search', 'export'):
+                    raise BatchError(f"expected key=value, got {word!r}")
+                field, value = ('term' if command == 'search' else 'file'), word
+            arguments[field] = value if field not in RECORD_FIELDS else _convert_field(field, value)
+
+    if command not in BATCH_COMMANDS:
+        raise BatchError(f"unknown command {command!r}, expected one of {', '.join(BATCH_COMMANDS)}")
+    return command, arguments
+
+def _check_row(row):
+    """Raise BatchError describing every problem with a record row."""
+    problems = check_record_fields(row)
+    if problems:
+        raise BatchError("; ".join(f"{field}: {message}" if field else message
+                                   for field, message in problems))
+
+def _record_id(arguments):
+    """Get the required integer id argument of a command."""
+    record_id = arguments.get('id')
+    if type(record_id) is not int:
+        raise BatchError("id must be given as an integer")
+    return record_id
+
+class BatchRunner:
+    """
+    Execute batch commands against a single loaded logbook.
+
+    The logbook is loaded once into a LogbookSession. Changes are made in
+    memory and written together when a commit command is reached or the
+    batch ends, so a batch of any number of edits costs one load and one
+    save instead of one of each per edit. The session runs without its
+    journal: changes after the last commit are lost if the process dies,
+    which is what a batch without commit points would expect.
+    """
+
+    def __init__(self, data_manager):
+        """
+        Load the logbook.
+
+        Args:
+            data_manager: DataManager of the logbook
+        """
+        self.session = LogbookSession(data_manager, autosave_interval=None, journal=False)
+
+    def execute(self, command, arguments):
+        """
+        Execute one parsed command.
+
+        Args:
+            command: Name of the command
+            arguments: Dictionary of arguments
+
+        Returns:
+            dict: Result of the command, without the op and ok keys
+
+        Raises:
+            BatchError: If the command cannot be carried out
+        """
+        return getattr(self, '_' + command)(arguments)
+
+    def _add(self, arguments):
+        """Add a record, giving it the next ID unless one is supplied."""
+        row = {'notes': ""}
+        row.update(arguments)
+        row.setdefault('id', self.session.get_next_id())
+        _check_row(row)
+        if self.session.get_record_by_id(row['id']) is not None:
+            raise BatchError(f"a record with id {row['id']} already exists")
+        self.session.add_record(LaunchRecord(**row))
+        return {'id': row['id']}
+
+    def _update(self, arguments):
+        """Change the given fields of a record."""
+        record = self.session.get_record_by_id(_record_id(arguments))
+        if record is None:
+            raise BatchError(f"no record with id {arguments['id']}")
+        row = record.to_dict()
+        row.update(arguments)
+        _check_row(row)
+        self.session.update_record(LaunchRecord(**row))
+        return {'id': row['id']}
+
+    def _delete(self, arguments):
+        """Delete a record by ID."""
+        record_id = _record_id(arguments)
+        if not self.session.delete_record(record_id):
+            raise BatchError(f"no record with id {record_id}")
+        return {'id': record_id}
+
+    def _search(self, arguments):
+        """Search the records, as --search does; fuzzy=true allows for typos."""
+        term = arguments.get('term')
+        if not isinstance(term, str) or not term:
+            raise BatchError("search needs a term")
+        if arguments.get('fuzzy') in (True, 'true', 'yes', '1'):
+            records = self.session.fuzzy_search_records(term)
+        else:
+            records = self.session.search_records(term)
+        return {'count': len(records), 'records': [record.to_dict() for record in records]}
+
+    def _stats(self, arguments):
+        """Compute the statistics shown by --stats, including pending changes."""
+        session = self.session
+        return session.result_cache.get(('statistics',), session.generation, self._compute_stats)
+
+    def _compute_stats(self):
+        """Compute statistics over the records in the session in one pass."""
+        summary = summarize_records(self.session.get_all_records())
+        return {
+            'statistics': summary['statistics'],
+            'monthly_launch_count': summary['monthly_launch_count'],
+            'rocket_success_rates': summary['rocket_success_rates'],
+            # Impulse classes and delays may be None, which JSON objects cannot key on
+            'impulse_class_altitudes': [list(pair) for pair in summary['impulse_class_altitudes'].items()],
+            'delay_success_rates': [list(pair) for pair in summary['delay_success_rates'].items()]
+        }
+
+    def _export(self, arguments):
+        """Return all records, or write them as a JSON array to file=PATH."""
+        rows = [record.to_dict() for record in self.session.get_all_records()]
+        path = arguments.get('file')
+        if path is None:
+            return {'count': len(rows), 'records': rows}
+        try:
+            with open(path, 'w') as f:
+                json.dump(rows, f, indent=2)
+        except OSError as e:
+            raise BatchError(f"cannot write {path}: {e}")
+        return {'count': len(rows), 'file': path}
+
+    def _commit(self, arguments):
+        """Write the changes made so far in one save."""
+        result = {'written': self.session.flush()}
+        if self.session.remapped:
+            result['remapped'] = [{'old_id': old_id, 'new_id': new_id} for old_id, new_id in self.session.remapped]
+        if self.session.skipped:
+            result['skipped'] = [{'id': record_id, 'reason': reason} for record_id, reason in self.session.skipped]
+        return result
+
+    def close(self):
+        """
+        Write the changes made since the last commit.
+
+        Returns:
+            int: Number of changes written
+        """
+        return self.session.flush()
+
+def run_batch(data_manager, lines, output):
+    """
+    Run a batch of commands and write one JSON line per command.
+
+    Each output line holds the line number, the command, "ok" and either
+    the result or an "error" message. A failing command does not stop the
+    batch. A final commit line reports the changes written at the end.
+
+    Args:
+        data_manager: DataManager of the logbook
+        lines: Iterable of batch file lines
+        output: Text stream the JSON Lines are written to
+
+    Returns:
+        int: Number of commands that failed
+    """
+    runner = BatchRunner(data_manager)
+    failures = 0
+
+    for number, line in enumerate(lines, 1):
+        parsed = None
+        try:
+            parsed = parse_command(line)
+            if parsed is None:
+                continue
+            command, arguments = parsed
+            result = {'line': number, 'op': command, 'ok': True}
+            result.update(runner.execute(command, arguments))
+        except BatchError as e:
+            failures += 1
+            result = {'line': number, 'op': parsed[0] if parsed else None, 'ok': False, 'error': str(e)}
+        output.write(json.dumps(result) + "\n")
+
+    output.write(json.dumps({'line': None, 'op': 'commit', 'ok': True, 'written': runner.close()}) + "\n")
+    return failures
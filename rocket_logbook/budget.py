@@ -0,0 +1,234 @@
+import os
+import re
+import sys
+import json
+import heapq
+import struct
+import tempfile
+from itertools import islice
+from rocket_logbook.models import LaunchRecord, record_view_type
+from rocket_logbook.stats import GroupAggregate, multi_group_by, parse_group_keys, _make_key_function
+from rocket_logbook.storage import detect_compression
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Peak memory of loading a logbook and rendering it as a table, per byte of
+# uncompressed JSON. Loading alone peaks at 2.5 to 6 times the JSON size,
+# depending on the layout and codec; the table takes about as much again.
+MEMORY_PER_JSON_BYTE = 8
+
+# Assumed compression ratio of lzma files, whose uncompressed size is not
+# stored in a fixed place
+LZMA_RATIO = 8
+
+# Records held in memory at once by the streaming algorithms: rows shown per
+# table, and records sorted per run before spilling to a temporary file
+CHUNK_SIZE = 5000
+
+# Number of temporary files rows are partitioned into when a group-by has
+# more groups than fit in memory
+SPILL_PARTITIONS = 16
+
+# Rough memory held per group by a group-by, including its key
+GROUP_MEMORY = 1024
+
+# Size suffixes accepted by parse_size
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:I?B)?\s*$', re.IGNORECASE)
+
+def parse_size(text):
+    """
+    Parse a memory size such as "512K", "64M", "64MiB" or "1G".
+
+    Args:
+        text: Number of bytes with an optional K, M or G suffix (powers of 1024)
+
+    Returns:
+        int: Size in bytes
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    match = SIZE_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid memory size '{text}', expected e.g. 64M or 512K")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def format_size(size):
+    """Format a number of bytes in MiB for reports."""
+    return f"{size / 1024 ** 2:.1f} MiB"
+
+def json_size(data_file):
+    """
+    Estimate the uncompressed size of a data file.
+
+    gzip stores the uncompressed size (modulo 4 GiB) in its last four bytes;
+    for lzma a typical compression ratio is assumed.
+
+    Args:
+        data_file: Path of the data file
+
+    Returns:
+        int: Estimated size of the JSON text in bytes
+    """
+    size = os.path.getsize(data_file)
+    compression = detect_compression(data_file)
+    if compression == 'gzip' and size >= 4:
+        with open(data_file, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            return struct.unpack('<I', f.read(4))[0]
+    if compression == 'lzma':
+        return size * LZMA_RATIO
+    return size
+
+def estimate_memory(data_manager):
+    """
+    Estimate the peak memory of loading and listing a whole logbook.
+
+    Args:
+        data_manager: DataManager of the logbook
+
+    Returns:
+        int: Estimated peak in bytes
+    """
+    try:
+        return json_size(data_manager.data_file) * MEMORY_PER_JSON_BYTE
+    except FileNotFoundError:
+        return 0
+
+def group_limit(budget):
+    """Number of groups a group-by may hold in memory within a budget in bytes."""
+    return max(1, budget // GROUP_MEMORY)
+
+def peak_memory():
+    """
+    Get the peak resident memory of this process so far.
+
+    Returns:
+        int: Peak in bytes, or None where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def chunks(iterable, size=CHUNK_SIZE):
+    """
+    Split an iterable into lists of at most size items.
+
+    Yields:
+        Lists of consecutive items
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _spill(items, directory):
+    """Write JSON-serializable items to a new temporary file, one per line."""
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".jsonl")
+    with os.fdopen(fd, 'w') as f:
+        for item in items:
+            f.write(json.dumps(item, separators=(',', ':')) + "\n")
+    return path
+
+def _read_spilled(path):
+    """Read back the items of a temporary file written by _spill."""
+    with open(path, 'r') as f:
+        for line in f:
+            yield json.loads(line)
+
+def external_sort(records, field, reverse=False, chunk_size=CHUNK_SIZE):
+    """
+    Sort records that may not fit in memory, as ranking.sort_records does.
+
+    Runs of chunk_size records are sorted in memory and spilled to
+    temporary files, which are then merged. Only one run, plus one record
+    per run during the merge, is held at a time. The order is the same as
+    sort_records, since keys end in the unique ID.
+
+    Args:
+        records: Iterable of LaunchRecord objects, e.g. a generator
+        field: Name of a field in ranking.SORT_FIELDS
+        reverse: Sort in descending order
+        chunk_size: Number of records sorted per run
+
+    Yields:
+        LaunchRecord objects in sorted order
+    """
+    with tempfile.TemporaryDirectory(prefix="rocket-logbook-sort-") as directory:
+        runs = []
+        for chunk in chunks(records, chunk_size):
+            rows = [((getattr(record, field), record.id), record.to_dict()) for record in chunk]
+            rows.sort(key=lambda item: item[0], reverse=reverse)
+            runs.append(_spill(rows, directory))
+            del rows, chunk
+
+        # JSON turns the key tuples into lists, which compare the same way
+        merged = heapq.merge(*(_read_spilled(path) for path in runs),
+                             key=lambda item: item[0], reverse=reverse)
+        for _key, row in merged:
+            yield LaunchRecord(**row)
+
+def spilling_group_by(make_records, keys, fields, max_groups):
+    """
+    Group records by keys like stats.multi_group_by, spilling to disk if needed.
+
+    The records are first aggregated in memory. If more than max_groups
+    groups appear, the aggregation is restarted: the rows are partitioned
+    by group key into temporary files, and each partition is aggregated on
+    its own, so only the groups of one partition are held at a time. Every
+    group still sees its records in file order, so the aggregates equal the
+    in-memory ones exactly.
+
+    Args:
+        make_records: Function returning a new iterable of records, such as
+            views with the given fields; called twice if spilling
+        keys: Key specification accepted by stats.parse_group_keys
+        fields: Record fields needed by the keys and aggregates
+        max_groups: Number of groups to hold in memory before spilling
+
+    Returns:
+        dict: Group key -> GroupAggregate, as multi_group_by returns for one grouping
+    """
+    keys = parse_group_keys(keys)
+    key_function = _make_key_function(keys)
+
+    groups = {}
+    for record in make_records():
+        key = key_function(record)
+        aggregate = groups.get(key)
+        if aggregate is None:
+            if len(groups) >= max_groups:
+                break
+            aggregate = groups[key] = GroupAggregate()
+        aggregate.add(record)
+    else:
+        return groups
+    del groups
+
+    view_type = record_view_type(tuple(fields))
+    with tempfile.TemporaryDirectory(prefix="rocket-logbook-group-") as directory:
+        paths = [os.path.join(directory, f"partition-{index}.jsonl") for index in range(SPILL_PARTITIONS)]
+        files = [open(path, 'w') for path in paths]
+        try:
+            for record in make_records():
+                # Within one run, equal keys always hash to the same partition
+                partition = hash(key_function(record)) % SPILL_PARTITIONS
+                files[partition].write(json.dumps([getattr(record, field) for field in fields]) + "\n")
+        finally:
+            for f in files:
+                f.close()
+
+        result = {}
+        for path in paths:
+            rows = (view_type._make(row) for row in _read_spilled(path))
+            result.update(multi_group_by(rows, {'groups': keys})['groups'])
+        return result
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+
+# Number of query results kept by default
+RESULT_CACHE_SIZE = 64
+
+# Results with more items than this are not cached, so a broad search
+# cannot pin a copy of the whole logbook in memory
+RESULT_CACHE_MAX_ITEMS = 10000
+
+class ResultCache:
+    """
+    Bounded least-recently-used cache of query results.
+
+    Each entry remembers the data generation it was computed at. A lookup
+    with a newer generation is a miss and replaces the entry, so bumping
+    the generation on every mutation invalidates all results at once
+    without touching the cache.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, enabled=True, max_items=RESULT_CACHE_MAX_ITEMS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries; the least recently used
+                entry is evicted beyond it
+            enabled: When False every lookup is computed and nothing is kept
+            max_items: Largest result length that is cached
+        """
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, generation, compute):
+        """
+        Get a cached result, computing and caching it if needed.
+
+        Args:
+            key: Hashable normalized query
+            generation: Data generation the result must be computed at
+            compute: Function without arguments that computes the result
+
+        Returns:
+            The cached or newly computed result
+        """
+        if not self.enabled or self.maxsize <= 0:
+            return compute()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == generation:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = compute()
+        if hasattr(value, '__len__') and len(value) > self.max_items:
+            self._entries.pop(key, None)
+            return value
+
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache, 0 before the first lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Describe the cache for reporting.
+
+        Returns:
+            dict: Dictionary with enabled, size, maxsize, hits, misses and hit_rate
+        """
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate
+        }
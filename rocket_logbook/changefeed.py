@@ -0,0 +1,182 @@
+import os
+import re
+import json
+import tempfile
+
+# Consumer names are used as file names
+CONSUMER_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+def change_kind(change):
+    """Classify a {'before', 'after'} change as 'add', 'update' or 'delete'."""
+    if change['before'] is None:
+        return 'add'
+    if change['after'] is None:
+        return 'delete'
+    return 'update'
+
+def change_events(event):
+    """
+    Split a history event into one change event per record.
+
+    Args:
+        event: History event with seq, timestamp, op and changes
+
+    Returns:
+        list: Change dictionaries with seq and index (their position in the
+            feed), timestamp, op ('add', 'update' or 'delete'), cause (the
+            operation that made the change, e.g. 'sync' or 'undo'), id and
+            the before and after images of the record
+    """
+    events = []
+    for index, change in enumerate(event['changes']):
+        row = change['after'] if change['after'] is not None else change['before']
+        events.append({
+            'seq': event['seq'],
+            'index': index,
+            'timestamp': event['timestamp'],
+            'op': change_kind(change),
+            'cause': event['op'],
+            'id': row['id'],
+            'before': change['before'],
+            'after': change['after']
+        })
+    return events
+
+def read_changes(history, position, limit=None):
+    """
+    Read the change events after a position in the history.
+
+    Args:
+        history: History of the logbook
+        position: {'seq': last consumed sequence number, 'offset': byte
+            offset just past it}, as returned by a previous call
+        limit: Maximum number of history events to read; a single event may
+            hold several changes
+
+    Returns:
+        tuple: (list of change events, position after them)
+    """
+    seq, offset = position['seq'], position['offset']
+    try:
+        f = open(history.events_file, 'rb')
+    except FileNotFoundError:
+        return [], position
+
+    changes = []
+    with f:
+        f.seek(0, os.SEEK_END)
+        if offset > f.tell():
+            offset = 0
+        elif offset:
+            f.seek(offset - 1)
+            if f.read(1) != b'\n':
+                offset = 0
+        # Without a valid offset (the log was replaced), the place is found
+        # again by sequence number
+        f.seek(offset)
+
+        read = 0
+        while limit is None or read < limit:
+            line = f.readline()
+            if not line.endswith(b'\n'):
+                # End of the log, or an event that is still being written
+                break
+            offset += len(line)
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event['seq'] <= seq:
+                continue
+            changes.extend(change_events(event))
+            seq = event['seq']
+            read += 1
+
+    return changes, {'seq': seq, 'offset': offset}
+
+class FeedConsumer:
+    """
+    Named reader of the change feed that remembers how far it has read.
+
+    The position of each consumer is kept in a small file in the history
+    directory, so a job can stop and resume where it left off. Reading does
+    not move the position; call ack once the changes are processed, which
+    gives at-least-once delivery if the job fails in between.
+
+    Typical use:
+
+        consumer = data_manager.get_feed_consumer("leaderboard")
+        changes = consumer.poll()
+        for change in changes:
+            ...
+        consumer.ack()
+    """
+
+    def __init__(self, history, name):
+        """
+        Open a consumer, starting at the beginning of the feed if it is new.
+
+        Args:
+            history: History of the logbook
+            name: Name of the consumer (letters, digits, '_', '.' and '-')
+
+        Raises:
+            ValueError: If the name is not valid
+        """
+        if not CONSUMER_NAME.match(name):
+            raise ValueError(f"Invalid consumer name '{name}'")
+        self.history = history
+        self.name = name
+        self.cursor_file = os.path.join(history.directory, "cursors", name + ".json")
+        self.position = self._load_position()
+        self._pending = None
+
+    def poll(self, limit=None):
+        """
+        Read the changes since the last acknowledged position.
+
+        Args:
+            limit: Maximum number of history events to read
+
+        Returns:
+            list: Change events in feed order, see change_events
+        """
+        changes, self._pending = read_changes(self.history, self.position, limit)
+        return changes
+
+    def ack(self):
+        """Persist the position after the changes returned by the last poll."""
+        if self._pending is None:
+            return
+        self.position = self._pending
+        self._pending = None
+        self._save_position()
+
+    def seek_to_end(self):
+        """
+        Skip all changes made so far, e.g. right before a full export.
+
+        Returns:
+            int: Sequence number of the latest change skipped
+        """
+        self.position = {'seq': self.history.get_last_seq(), 'offset': self.history.get_events_size()}
+        self._pending = None
+        self._save_position()
+        return self.position['seq']
+
+    def _load_position(self):
+        """Read the saved position, or the start of the feed."""
+        try:
+            with open(self.cursor_file, 'r') as f:
+                position = json.load(f)
+            return {'seq': int(position['seq']), 'offset': int(position['offset'])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {'seq': 0, 'offset': 0}
+
+    def _save_position(self):
+        """Write the position atomically."""
+        directory = os.path.dirname(self.cursor_file)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".cursor-", suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.position, f)
+        os.replace(temp_path, self.cursor_file)
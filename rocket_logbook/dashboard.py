@@ -0,0 +1,255 @@
+import os
+import time
+from collections import deque
+from rich.console import Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rocket_logbook.utils import format_date_for_display
+
+# Number of recent launches shown on the dashboard
+RECENT_LAUNCHES = 10
+
+# Fields loaded on a full reload; the dashboard never shows notes
+DASHBOARD_FIELDS = ('id', 'date', 'rocket_name', 'motor_type', 'altitude', 'success')
+
+class LiveAggregates:
+    """
+    Dashboard aggregates that can be updated one change at a time.
+
+    Only invertible aggregates (counts and sums) are kept, so updates and
+    deletes can be applied by subtracting the before image and adding the
+    after image, without looking at any other record.
+    """
+
+    def __init__(self, recent_size=RECENT_LAUNCHES):
+        """Initialize empty aggregates."""
+        self.recent = deque(maxlen=recent_size)
+        self.reset([])
+
+    def reset(self, rows):
+        """
+        Rebuild the aggregates from a full list of record dictionaries.
+
+        Args:
+            rows: Iterable of record dictionaries in file order
+        """
+        self.total = 0
+        self.successes = 0
+        self.altitude_sum = 0
+        self.rocket_totals = {}
+        self.rocket_successes = {}
+        self.recent.clear()
+        for row in rows:
+            self._add(row)
+            self.recent.append(row)
+
+    def apply(self, changes):
+        """
+        Apply the changes of one history event.
+
+        Args:
+            changes: List of {'before': row or None, 'after': row or None}
+        """
+        for change in changes:
+            before = change['before']
+            after = change['after']
+            if before is not None:
+                self._remove(before)
+            if after is not None:
+                self._add(after)
+            self._update_recent(before, after)
+
+    def _add(self, row):
+        """Count a record in the aggregates."""
+        rocket = row['rocket_name']
+        self.total += 1
+        self.altitude_sum += row['altitude']
+        self.rocket_totals[rocket] = self.rocket_totals.get(rocket, 0) + 1
+        if row['success']:
+            self.successes += 1
+            self.rocket_successes[rocket] = self.rocket_successes.get(rocket, 0) + 1
+
+    def _remove(self, row):
+        """Take a record out of the aggregates."""
+        rocket = row['rocket_name']
+        self.total -= 1
+        self.altitude_sum -= row['altitude']
+        self.rocket_totals[rocket] -= 1
+        if row['success']:
+            self.successes -= 1
+            self.rocket_successes[rocket] -= 1
+        if not self.rocket_totals[rocket]:
+            del self.rocket_totals[rocket]
+            self.rocket_successes.pop(rocket, None)
+
+    def _update_recent(self, before, after):
+        """Keep the recent launches list in step with a change."""
+        if before is None:
+            self.recent.append(after)
+            return
+        for i, row in enumerate(self.recent):
+            if row['id'] == before['id']:
+                if after is None:
+                    del self.recent[i]
+                else:
+                    self.recent[i] = after
+                return
+
+class LogbookWatcher:
+    """
+    Keeps LiveAggregates in step with a logbook that is changed elsewhere.
+
+    Each poll only stats the data file and the history event log. When the
+    event log has grown, just the new bytes are read and applied to the
+    aggregates, so the cost of a refresh does not depend on the size of the
+    logbook. A change to the data file that is not explained by new events
+    (an external edit, or history being disabled) triggers a full reload.
+    """
+
+    def __init__(self, data_manager):
+        """
+        Initialize the watcher and load the logbook once.
+
+        Args:
+            data_manager: DataManager of the logbook to watch
+        """
+        self.data_manager = data_manager
+        self.history = data_manager.history
+        self.aggregates = LiveAggregates()
+        self.events_offset = 0
+        self.fingerprint = None
+        self.pending_reload = False
+        self.full_reloads = 0
+        self.incremental_updates = 0
+        self.reload()
+
+    def reload(self):
+        """Rebuild the aggregates from the whole data file."""
+        # Retry if the logbook changed while it was being read, so the event
+        # offset always matches the loaded contents
+        while True:
+            offset = self.history.get_events_size() if self.history is not None else 0
+            fingerprint = self.data_manager.get_fingerprint()
+            views = self.data_manager.get_views(DASHBOARD_FIELDS)
+            current_offset = self.history.get_events_size() if self.history is not None else 0
+            if current_offset == offset and self.data_manager.get_fingerprint() == fingerprint:
+                break
+
+        self.events_offset = offset
+        self.fingerprint = fingerprint
+        self.aggregates.reset(view._asdict() for view in views)
+        self.pending_reload = False
+        self.full_reloads += 1
+
+    def poll(self):
+        """
+        Check for changes and update the aggregates.
+
+        Returns:
+            bool: True if the aggregates changed
+        """
+        changed = False
+
+        if self.history is not None:
+            size = self.history.get_events_size()
+            if size < self.events_offset:
+                # The event log was replaced; start over
+                self.reload()
+                return True
+            if size > self.events_offset:
+                events, self.events_offset = self.history.read_events_from(self.events_offset)
+                for event in events:
+                    self.aggregates.apply(event['changes'])
+                if events:
+                    self.fingerprint = self.data_manager.get_fingerprint()
+                    self.pending_reload = False
+                    self.incremental_updates += len(events)
+                    changed = True
+
+        fingerprint = self.data_manager.get_fingerprint()
+        if fingerprint != self.fingerprint:
+            # The DataManager saves the data file just before appending the
+            # event, so give the event one poll to arrive before reloading
+            if self.pending_reload or self.history is None:
+                self.reload()
+                changed = True
+            else:
+                self.pending_reload = True
+
+        return changed
+
+    def render(self):
+        """
+        Build the dashboard renderable.
+
+        Returns:
+            A rich renderable with totals, recent launches and success rates
+        """
+        aggregates = self.aggregates
+
+        totals = Table(show_header=True, header_style="bold magenta")
+        totals.add_column("Statistic")
+        totals.add_column("Value")
+        success_rate = (aggregates.successes / aggregates.total) * 100 if aggregates.total else 0
+        average = aggregates.altitude_sum / aggregates.total if aggregates.total else 0
+        totals.add_row("Total Launches", str(aggregates.total))
+        totals.add_row("Successful Launches", str(aggregates.successes))
+        totals.add_row("Failed Launches", str(aggregates.total - aggregates.successes))
+        totals.add_row("Success Rate", f"{success_rate:.2f}%")
+        totals.add_row("Average Altitude", f"{average:.2f} meters")
+
+        recent = Table(show_header=True, header_style="bold magenta", title="Recent Launches")
+        recent.add_column("ID", style="dim")
+        recent.add_column("Date")
+        recent.add_column("Rocket Name")
+        recent.add_column("Motor Type")
+        recent.add_column("Altitude (m)")
+        recent.add_column("Success")
+        for row in reversed(aggregates.recent):
+            recent.add_row(
+                str(row['id']),
+                format_date_for_display(row['date']),
+                row['rocket_name'],
+                row['motor_type'],
+                f"{row['altitude']:.1f}",
+                "[green]Yes[/green]" if row['success'] else "[red]No[/red]"
+            )
+
+        rates = Table(show_header=True, header_style="bold magenta", title="Success Rate by Rocket")
+        rates.add_column("Rocket Name")
+        rates.add_column("Launches", justify="right")
+        rates.add_column("Success Rate", justify="right")
+        for rocket in sorted(aggregates.rocket_totals):
+            total = aggregates.rocket_totals[rocket]
+            successes = aggregates.rocket_successes.get(rocket, 0)
+            rates.add_row(rocket, str(total), f"{successes / total * 100:.2f}%")
+
+        footer = (f"[dim]Watching {os.path.basename(self.data_manager.data_file)} - "
+                  f"updated {time.strftime('%H:%M:%S')} - Ctrl+C to stop[/dim]")
+        return Group(
+            Panel("[bold]Live Launch Dashboard[/bold]", border_style="green"),
+            totals, recent, rates, footer
+        )
+
+def watch(data_manager, console, interval=1.0):
+    """
+    Show a live dashboard that refreshes as the logbook changes.
+
+    Args:
+        data_manager: DataManager of the logbook to watch
+        console: rich Console to draw on
+        interval: Seconds between polls of the data file
+
+    Raises:
+        ValueError: If the interval is not positive
+    """
+    if not interval > 0:
+        raise ValueError("The watch interval must be a positive number of seconds")
+    watcher = LogbookWatcher(data_manager)
+    with Live(watcher.render(), console=console, refresh_per_second=4) as live:
+        while True:
+            time.sleep(interval)
+            watcher.poll()
+            # Re-render even without changes so the timestamp stays current
+            live.update(watcher.render())
@@ -1,14 +1,68 @@
 import os
 import json
+import shutil
+import itertools
+import hashlib
+import time
+import tempfile
 from datetime import datetime
-from rocket_logbook.models import LaunchRecord
+from operator import itemgetter
+from rocket_logbook.models import LaunchRecord, record_view_type
+from rocket_logbook.stats import summarize_records, build_altitude_sketches
+from rocket_logbook.sketches import QuantileSketch
+from rocket_logbook.storage import (detect_compression, detect_layout, open_data_file,
+                                    write_json_array, get_codec, NotesBlob, NOTES_STORAGES, JSON_CODEC,
+                                    READ_CHUNK_SIZE)
+from rocket_logbook.validation import validate_batch, is_notes_ref, ValidationReport
+from rocket_logbook.fuzzy import FuzzyIndex
+from rocket_logbook.dedupe import find_duplicate_groups, merge_notes
+from rocket_logbook.history import History, apply_changes, DEFAULT_CHECKPOINT_INTERVAL
+from rocket_logbook.sync import RecordSummary
+from rocket_logbook.cache import ResultCache, RESULT_CACHE_SIZE
+from rocket_logbook.ranking import sort_records, top_records, top_records_per_group
+from rocket_logbook.changefeed import FeedConsumer, change_events
+from rocket_logbook.integrity import (verify_blocks, recover_rows, IntegrityReport, DataFileDamagedError,
+                                      READ_ERRORS)
 import appdirs
 
+# Bumped whenever the layout of the sidecar cache files changes
+STATS_SNAPSHOT_VERSION = 2
+
+# Number of raw rows validated together while loading
+VALIDATION_BATCH_SIZE = 10000
+
+# Garbage left in the notes blob by replaced notes before it is compacted
+NOTES_COMPACT_MIN_BYTES = 64 * 1024
+
+# Fields read when computing statistics and altitude sketches
+STATS_FIELDS = ('date', 'rocket_name', 'motor_type', 'altitude', 'success')
+SKETCH_FIELDS = ('rocket_name', 'motor_type', 'altitude')
+
 class DataManager:
     """Handles all data persistence operations for the rocket logbook."""
     
-    def __init__(self, data_file=None):
-        """Initialize the data manager with the specified data file."""
+    def __init__(self, data_file=None, layout=None, compression=None, history=True,
+                 checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL, notes_storage=None,
+                 result_cache=True, result_cache_size=RESULT_CACHE_SIZE, codec=None):
+        """
+        Initialize the data manager with the specified data file.
+        
+        Args:
+            data_file: Path of the data file, defaults to the user's app data directory
+            layout: 'pretty' or 'compact' JSON; defaults to the layout of the
+                existing file, or 'pretty' for a new one
+            compression: 'gzip', 'lzma' or 'none'; defaults to the compression of
+                the existing file (by magic bytes) or the file extension
+            history: Keep an event log of mutations for as_of and undo
+            checkpoint_interval: Number of history events between snapshots
+            notes_storage: 'inline' to keep notes in each record or 'blob' to
+                store them out of line in a notes blob next to the data file;
+                defaults to 'blob' if the logbook already has one
+            result_cache: Cache search and statistics results in memory
+            result_cache_size: Maximum number of cached results
+            codec: JSON codec for the data file, 'json', 'orjson' or
+                'msgspec'; defaults to the fastest one installed
+        """
         if data_file is None:
             # Use a default data file in the user's app data directory
             app_data_dir = appdirs.user_data_dir("rocket-logbook", "rocket-logbook")
@@ -18,23 +72,241 @@ class DataManager:
         else:
             self.data_file = data_file
         
+        # Sidecars holding precomputed statistics and altitude sketches
+        self.stats_file = self.data_file + ".stats.json"
+        self.sketches_file = self.data_file + ".sketches.json"
+        
+        # Sidecar of per-record hashes, and the state agreed at the last sync with each peer
+        self.summary_file = self.data_file + ".summary.json"
+        self.sync_file = self.data_file + ".sync.json"
+        
+        # Sidecar of block checksums, written with every save
+        self.checksums_file = self.data_file + ".checksums.json"
+        
+        # Format used for writing; reads always detect the format of the file
+        existing_compression = detect_compression(self.data_file)
+        if compression is None:
+            compression = existing_compression
+        self.compression = None if compression == 'none' else compression
+        self.layout = layout or detect_layout(self.data_file, existing_compression) or 'pretty'
+        self.codec = get_codec(codec)
+        
+        # Notes blob; records refer to it when notes are stored out of line
+        self.notes_blob = NotesBlob(self.data_file + ".notes")
+        if notes_storage is None:
+            notes_storage = 'blob' if self.notes_blob.latest_generation is not None else 'inline'
+        if notes_storage not in NOTES_STORAGES:
+            raise ValueError(f"Unknown notes storage '{notes_storage}'")
+        self.notes_storage = notes_storage
+        
+        # Event log of mutations, stored next to the data file
+        self.history = History(self.data_file + ".history", checkpoint_interval) if history else None
+        
+        # Callbacks told about every change made through this DataManager,
+        # and the sequence used for them when there is no history
+        self.subscribers = []
+        self._change_seq = 0
+        
+        # Fuzzy search index with the fingerprint of the file it was built from
+        self._fuzzy_cache = None
+        
+        # Search and statistics results, valid for one data generation. The
+        # generation is bumped by every save and whenever the data file is
+        # found changed by someone else.
+        self.result_cache = ResultCache(result_cache_size, enabled=result_cache)
+        self.generation = 0
+        self._generation_fingerprint = None
+        
+        # Validation result of the last load, and the raw rows it rejected.
+        # Rejected rows are written back unchanged so saving never drops them.
+        self.last_validation_report = ValidationReport()
+        self.rejected_rows = []
+        
+        # Set when the last full load failed on a damaged file; saving is
+        # then refused, since it would replace the file with what was read
+        self.damaged = False
+        
         self.ensure_data_file_exists()
     
     def ensure_data_file_exists(self):
         """Ensure the data file exists, creating it if necessary."""
         if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w') as f:
-                json.dump([], f)
+            self._save_records([])
+    
+    def iter_raw_records(self, codec=None):
+        """
+        Stream the raw record dictionaries from the data file without validation.
+        
+        Args:
+            codec: Codec to read with instead of self.codec, e.g. the
+                standard library one, which streams the file
+        
+        Yields:
+            dict objects in file order
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a valid JSON array
+        """
+        # Detect from the file itself: it may not be saved in the target format yet
+        compression = detect_compression(self.data_file)
+        with open_data_file(self.data_file, 'r', compression) as f:
+            yield from (codec or self.codec).iter_array(f)
+    
+    def iter_valid_rows(self, codec=None):
+        """
+        Stream validated record dictionaries from the data file one at a time.
+        
+        Rows are validated in batches. Invalid rows are skipped rather than
+        raising; once the stream is exhausted they are available in
+        rejected_rows and described by last_validation_report.
+        
+        Args:
+            codec: Codec to read with instead of self.codec
+        
+        Yields:
+            dict objects in file order
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a valid JSON array
+        """
+        report = ValidationReport()
+        rejected_rows = []
+        seen_ids = set()
+        batch = []
+        
+        def flush():
+            start = report.checked
+            valid_rows, batch_report = validate_batch(batch, seen_ids, start)
+            report.merge(batch_report)
+            rejected_rows.extend(batch[index - start] for index in batch_report.rejected_indexes)
+            batch.clear()
+            return valid_rows
+        
+        for row in self.iter_raw_records(codec):
+            batch.append(row)
+            if len(batch) >= VALIDATION_BATCH_SIZE:
+                yield from flush()
+        yield from flush()
+        
+        self._publish_validation(report, rejected_rows)
+    
+    def _publish_validation(self, report, rejected_rows):
+        """Keep the outcome of a finished validation pass for later writes."""
+        self.last_validation_report = report
+        self.rejected_rows = rejected_rows
+    
+    def iter_records(self, codec=None):
+        """
+        Stream validated launch records from the data file one at a time.
+        
+        Args:
+            codec: Codec to read with instead of self.codec
+        
+        Yields:
+            LaunchRecord objects in file order
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a valid JSON array
+        """
+        for row in self.iter_valid_rows(codec):
+            yield self._record_from_row(row)
+    
+    def _record_from_row(self, row):
+        """Build a LaunchRecord from a validated row, leaving out-of-line notes unread."""
+        ref = row.pop('notes_ref', None)
+        record = LaunchRecord(**row)
+        if ref is not None:
+            record.set_notes_source(self.notes_blob, ref)
+        return record
+    
+    def iter_views(self, fields):
+        """
+        Stream validated records holding only the requested fields.
+        
+        No LaunchRecord is built and the other fields (such as the notes) are
+        dropped as soon as each row is validated, so callers that need only
+        a few fields allocate and keep much less.
+        
+        Args:
+            fields: Tuple of field names, e.g. ('id',) or ('altitude', 'success')
+            
+        Yields:
+            Named tuples from record_view_type(fields) in file order
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a valid JSON array
+        """
+        view_type = record_view_type(tuple(fields))
+        make = tuple.__new__
+        if 'notes' in view_type._fields:
+            # Notes may be missing from a row or stored out of line
+            blob = self.notes_blob
+            for row in self.iter_valid_rows():
+                values = []
+                for field in view_type._fields:
+                    if field != 'notes':
+                        values.append(row[field])
+                    elif 'notes_ref' in row:
+                        values.append(blob.read(row['notes_ref']))
+                    else:
+                        values.append(row.get('notes', ""))
+                yield make(view_type, values)
+            return
+        
+        getter = itemgetter(*view_type._fields)
+        if len(view_type._fields) == 1:
+            for row in self.iter_valid_rows():
+                yield make(view_type, (getter(row),))
+        else:
+            for row in self.iter_valid_rows():
+                yield make(view_type, getter(row))
+    
+    def get_views(self, fields):
+        """
+        Retrieve all valid records holding only the requested fields.
+        
+        Args:
+            fields: Tuple of field names, as for iter_views
+            
+        Returns:
+            List of named tuples, empty if the file is missing or not valid JSON
+        """
+        try:
+            views = list(self.iter_views(fields))
+        except FileNotFoundError:
+            return []
+        except (json.JSONDecodeError, UnicodeDecodeError, EOFError):
+            self.damaged = not self._data_file_is_blank()
+            return []
+        self.damaged = False
+        return views
     
     def get_all_records(self):
-        """Retrieve all launch records from the data file."""
+        """Retrieve all valid launch records from the data file."""
         try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                return [LaunchRecord(**record) for record in data]
-        except (json.JSONDecodeError, FileNotFoundError):
-            # If the file is empty or has invalid JSON, return an empty list
+            records = list(self.iter_records())
+        except FileNotFoundError:
             return []
+        except (json.JSONDecodeError, UnicodeDecodeError, EOFError):
+            # If the file is empty or has invalid JSON, return an empty list;
+            # unless it is empty, saving is refused until it is recovered
+            self.damaged = not self._data_file_is_blank()
+            return []
+        self.damaged = False
+        return records
+    
+    def _data_file_is_blank(self):
+        """Whether the data file holds nothing but whitespace."""
+        try:
+            with open_data_file(self.data_file, 'r', detect_compression(self.data_file), errors='replace') as f:
+                while True:
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        return True
+                    if not chunk.isspace():
+                        return False
+        except READ_ERRORS:
+            return False
     
     def get_record_by_id(self, record_id):
         """
@@ -54,12 +326,15 @@ class DataManager:
     
     def get_next_id(self):
         """Generate the next available ID for a new record."""
-        records = self.get_all_records()
-        if not records:
+        # Rejected rows keep their IDs in the file, so never reuse them
+        ids = [view.id for view in self.get_views(('id',))]
+        ids.extend(row['id'] for row in self.rejected_rows
+                   if isinstance(row, dict) and type(row.get('id')) is int)
+        if not ids:
             return 1
         
         # Find the maximum ID and increment by 1
-        max_id = max(record.id for record in records)
+        max_id = max(ids)
         return max_id + 1
     
     def add_record(self, record):
@@ -71,7 +346,49 @@ class DataManager:
         """
         records = self.get_all_records()
         records.append(record)
-        self._save_records(records)
+        self._commit(records, 'add', [{'before': None, 'after': record.to_dict()}])
+    
+    def add_records(self, records):
+        """
+        Validate and add a batch of new launch records in a single write.
+        
+        Args:
+            records: Iterable of LaunchRecord objects or record dictionaries
+            
+        Returns:
+            ValidationReport: Report of the rows that were rejected; valid
+                rows are added even if others are rejected
+        """
+        existing = self.get_all_records()
+        seen_ids = {record.id for record in existing}
+        seen_ids.update(row['id'] for row in self.rejected_rows
+                        if isinstance(row, dict) and type(row.get('id')) is int)
+        
+        rows = [record.to_dict() if isinstance(record, LaunchRecord) else record for record in records]
+        valid_rows, report = validate_batch(rows, seen_ids)
+        
+        if valid_rows:
+            existing.extend(LaunchRecord(**row) for row in valid_rows)
+            self._commit(existing, 'add', [{'before': None, 'after': row} for row in valid_rows])
+        return report
+    
+    def validate(self):
+        """
+        Validate every row of the data file without keeping the records.
+        
+        Returns:
+            ValidationReport: Structured report of all problems found
+        """
+        seen_ids = set()
+        report = ValidationReport()
+        batch = []
+        for row in self.iter_raw_records(codec):
+            batch.append(row)
+            if len(batch) >= VALIDATION_BATCH_SIZE:
+                report.merge(validate_batch(batch, seen_ids, report.checked)[1])
+                batch.clear()
+        report.merge(validate_batch(batch, seen_ids, report.checked)[1])
+        return report
     
     def update_record(self, updated_record):
         """
@@ -87,7 +404,7 @@ class DataManager:
         for i, record in enumerate(records):
             if record.id == updated_record.id:
                 records[i] = updated_record
-                self._save_records(records)
+                self._commit(records, 'update', [{'before': record.to_dict(), 'after': updated_record.to_dict()}])
                 return True
         return False
     
@@ -102,15 +419,52 @@ class DataManager:
             bool: True if successful, False if record not found
         """
         records = self.get_all_records()
-        initial_length = len(records)
+        deleted = [record for record in records if record.id == record_id]
         
         records = [record for record in records if record.id != record_id]
         
-        if len(records) < initial_length:
-            self._save_records(records)
+        if deleted:
+            self._commit(records, 'delete', [{'before': record.to_dict(), 'after': None} for record in deleted])
             return True
         return False
     
+    def replace_records(self, rows_by_id, deleted_ids=(), op='sync'):
+        """
+        Replace, add and delete records in a single write.
+        
+        Args:
+            rows_by_id: Dictionary mapping IDs to the record dictionaries to
+                store; records with other IDs are added in ID order
+            deleted_ids: IDs of the records to remove
+            op: Name of the operation recorded in the history
+            
+        Returns:
+            int: Number of records changed
+        """
+        if not rows_by_id and not deleted_ids:
+            return 0
+        
+        records = []
+        changes = []
+        pending = dict(rows_by_id)
+        for record in self.get_all_records():
+            if record.id in deleted_ids:
+                changes.append({'before': record.to_dict(), 'after': None})
+            elif record.id in pending:
+                row = pending.pop(record.id)
+                changes.append({'before': record.to_dict(), 'after': row})
+                records.append(LaunchRecord(**row))
+            else:
+                records.append(record)
+        for record_id in sorted(pending):
+            row = pending[record_id]
+            changes.append({'before': None, 'after': row})
+            records.append(LaunchRecord(**row))
+        
+        if changes:
+            self._commit(records, op, changes)
+        return len(changes)
+    
     def search_records(self, search_term):
         """
         Search for records matching a search term.
@@ -121,7 +475,52 @@ class DataManager:
         Returns:
             List of matching LaunchRecord objects
         """
-        records = self.get_all_records()
+        search_term = search_term.lower()
+        results = self.result_cache.get(('search', search_term), self.get_generation(),
+                                        lambda: self._search_rows(search_term))
+        # A copy, so callers cannot reorder or shorten the cached result
+        return list(results)
+    
+    def _search_rows(self, search_term):
+        """Search the data file for a lowercased term."""
+        try:
+            return list(self.iter_search_records(search_term))
+        except (json.JSONDecodeError, FileNotFoundError, EOFError):
+            return []
+    
+    def iter_search_records(self, search_term):
+        """
+        Stream the records matching a search term, without caching.
+        
+        Args:
+            search_term: String to search for in dates or rocket names/types
+            
+        Yields:
+            Matching LaunchRecord objects in file order
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a valid JSON array
+        """
+        search_term = search_term.lower()
+        
+        # Same test as filter_records, applied to the raw rows so that only
+        # the matches are turned into LaunchRecord objects
+        for row in self.iter_valid_rows():
+            if (search_term in row['date'] or search_term in row['rocket_name'].lower()
+                    or search_term in row['motor_type'].lower()):
+                yield self._record_from_row(row)
+    
+    def filter_records(self, records, search_term):
+        """
+        Filter already loaded records by a search term.
+        
+        Args:
+            records: Iterable of LaunchRecord objects
+            search_term: String to search for in dates or rocket names/types
+            
+        Returns:
+            List of matching LaunchRecord objects
+        """
         results = []
         
         # Convert search term to lowercase for case-insensitive comparison
@@ -140,15 +539,759 @@ class DataManager:
                 
         return results
     
+    def get_sorted_records(self, field, reverse=False):
+        """
+        Retrieve all valid records sorted on a field.
+        
+        Args:
+            field: Name of a field in ranking.SORT_FIELDS
+            reverse: Sort in descending order
+            
+        Returns:
+            List of LaunchRecord objects
+        """
+        return sort_records(self.get_all_records(), field, reverse)
+    
+    def get_top_records(self, n, field='altitude', smallest=False, per=None):
+        """
+        Retrieve the records with the largest (or smallest) values of a field.
+        
+        The records are streamed through a heap of n entries (per group),
+        so only the selected records are kept and nothing is fully sorted.
+        
+        Args:
+            n: Number of records, per group if per is given
+            field: Name of a field in ranking.SORT_FIELDS
+            smallest: Select the smallest values instead
+            per: 'rocket' or 'motor' to select the top n of each group
+            
+        Returns:
+            list: Records best first, or a dict of such lists per group;
+                empty if the file is missing or not valid JSON
+        """
+        try:
+            return self._select_top_records(self.iter_records(), n, field, smallest, per)
+        except (json.JSONDecodeError, FileNotFoundError, EOFError):
+            return {} if per is not None else []
+    
+    def _select_top_records(self, records, n, field, smallest, per):
+        """Select the top records from an iterable, as get_top_records does."""
+        if per is not None:
+            return top_records_per_group(records, n, field, per, smallest)
+        return top_records(records, n, field, smallest)
+    
+    def find_duplicates(self, near=False):
+        """
+        Find records that appear to describe the same launch.
+        
+        Args:
+            near: Also report near-duplicates, not just exact ones
+            
+        Returns:
+            list: DuplicateGroup objects, exact groups first
+        """
+        return find_duplicate_groups(self.get_all_records(), near=near)
+    
+    def merge_duplicates(self, groups):
+        """
+        Merge groups of duplicates in a single write.
+        
+        The first logged record of each group is kept and given the combined
+        notes of the group; the other records are deleted.
+        
+        Args:
+            groups: DuplicateGroup objects, e.g. from find_duplicates
+            
+        Returns:
+            int: Number of records removed
+        """
+        keepers = {}
+        removed = set()
+        for group in groups:
+            keeper = group.keeper
+            notes = merge_notes(group.records)
+            if notes != keeper.notes:
+                keepers[keeper.id] = notes
+            removed.update(record.id for record in group.duplicates)
+        
+        if not removed:
+            return 0
+        
+        records = []
+        changes = []
+        for record in self.get_all_records():
+            if record.id in removed:
+                changes.append({'before': record.to_dict(), 'after': None})
+                continue
+            if record.id in keepers:
+                before = record.to_dict()
+                record.notes = keepers[record.id]
+                changes.append({'before': before, 'after': record.to_dict()})
+            records.append(record)
+        
+        self._commit(records, 'dedupe', changes)
+        return len(removed)
+    
+    def get_fuzzy_index(self):
+        """
+        Get the fuzzy search index over distinct rocket names and motor types.
+        
+        The index is rebuilt only when the data file changes.
+        
+        Returns:
+            FuzzyIndex: Index of the distinct values
+        """
+        return self._get_fuzzy_cache()[1]
+    
+    def fuzzy_search_records(self, search_term, max_distance=None):
+        """
+        Search for records whose rocket name or motor type nearly matches a term.
+        
+        Args:
+            search_term: Possibly misspelled rocket name or motor type
+            max_distance: Largest edit distance to accept, defaults to about
+                one typo per four characters
+            
+        Returns:
+            List of matching LaunchRecord objects, closest matches first
+        """
+        _, index, records_by_value = self._get_fuzzy_cache()
+        
+        results = []
+        seen_ids = set()
+        for value, _distance in index.search(search_term, max_distance):
+            for record in records_by_value[value]:
+                if record.id not in seen_ids:
+                    seen_ids.add(record.id)
+                    results.append(record)
+        return results
+    
+    def _get_fuzzy_cache(self):
+        """Return (fingerprint, index, records by value), rebuilding if the file changed."""
+        fingerprint = self.get_fingerprint()
+        if self._fuzzy_cache is None or self._fuzzy_cache[0] != fingerprint:
+            index = FuzzyIndex()
+            records_by_value = {}
+            for record in self.get_all_records():
+                for value in (record.rocket_name, record.motor_type):
+                    index.add(value)
+                    records_by_value.setdefault(value, []).append(record)
+            self._fuzzy_cache = (fingerprint, index, records_by_value)
+        return self._fuzzy_cache
+    
+    def as_of(self, timestamp):
+        """
+        Reconstruct the logbook as it was at a point in time.
+        
+        Args:
+            timestamp: datetime or seconds since the epoch
+            
+        Returns:
+            List of LaunchRecord objects, or None if history is disabled or
+            does not go back that far
+        """
+        if self.history is None:
+            return None
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        
+        rows = self.history.as_of(timestamp)
+        if rows is None:
+            return None
+        return [LaunchRecord(**row) for row in rows]
+    
+    def undo(self):
+        """
+        Undo the most recent change that has not been undone yet.
+        
+        The undo is itself recorded as an event, so the history stays
+        append-only. A change that affected several records (such as a bulk
+        add) is undone as a whole.
+        
+        Returns:
+            dict: The event that was undone, or None if there is nothing to undo
+        """
+        if self.history is None:
+            return None
+        event = self.history.find_undoable()
+        if event is None:
+            return None
+        
+        state = {record.id: record.to_dict() for record in self.get_all_records()}
+        apply_changes(state, event['changes'], reverse=True)
+        
+        inverse = [{'before': change['after'], 'after': change['before']} for change in reversed(event['changes'])]
+        records = [LaunchRecord(**row) for row in state.values()]
+        self._save_records(records)
+        undo_event = self.history.append('undo', inverse, [record.to_dict() for record in records], undoes=event['seq'])
+        self._publish('undo', inverse, undo_event)
+        return event
+    
+    def subscribe(self, callback):
+        """
+        Call a function for every record changed through this DataManager.
+        
+        The callback receives one change event per added, updated or deleted
+        record, as described in changefeed.change_events, after the change
+        has been saved. Changes made by other processes are not seen; read
+        them with get_feed_consumer instead.
+        
+        Args:
+            callback: Function taking a change event dictionary
+        """
+        self.subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Stop calling a function registered with subscribe."""
+        self.subscribers.remove(callback)
+    
+    def get_feed_consumer(self, name):
+        """
+        Open a named, resumable reader of the change feed.
+        
+        Args:
+            name: Name of the consumer, e.g. 'leaderboard'
+            
+        Returns:
+            FeedConsumer reading the history of this logbook
+            
+        Raises:
+            ValueError: If history is disabled or the name is not valid
+        """
+        if self.history is None:
+            raise ValueError("The change feed needs the history, which is disabled")
+        return FeedConsumer(self.history, name)
+    
+    def _publish(self, op, changes, event):
+        """
+        Pass the changes of a saved mutation to the subscribers.
+        
+        Every subscriber is called even if one fails; the first error is
+        raised afterwards.
+        """
+        if not self.subscribers:
+            return
+        if event is None:
+            self._change_seq += 1
+            event = {'seq': self._change_seq, 'timestamp': time.time(), 'op': op, 'changes': changes}
+        
+        error = None
+        for change in change_events(event):
+            for callback in list(self.subscribers):
+                try:
+                    callback(change)
+                except Exception as e:
+                    if error is None:
+                        error = e
+        if error is not None:
+            raise error
+    
+    def _commit(self, records, op, changes):
+        """
+        Save the records, record the change in the history and keep the
+        altitude sketches current.
+        
+        Args:
+            records: List of LaunchRecord objects after the change
+            op: Name of the operation, e.g. 'add', 'update' or 'delete'
+            changes: List of {'before': row or None, 'after': row or None}
+        """
+        fingerprint_before = self.get_fingerprint()
+        self._save_records(records)
+        event = None
+        if self.history is not None:
+            # Only built when the history takes a snapshot, which keeps
+            # out-of-line notes unread on most writes
+            event = self.history.append(op, changes, lambda: [record.to_dict() for record in records])
+        
+        # Sketches can absorb new records but not forget old ones, so only
+        # pure additions are applied incrementally; anything else leaves the
+        # sidecar stale and it is rebuilt on the next query
+        if op == 'add':
+            self._extend_altitude_sketches(fingerprint_before, [LaunchRecord(**change['after']) for change in changes])
+        self._update_record_summary(fingerprint_before, changes)
+        self._publish(op, changes, event)
+    
     def _save_records(self, records):
         """
         Save the records list to the data file.
         
+        The records are written to a temporary file next to the data file,
+        synced to disk and then moved over the data file, so a crash or a
+        full disk while saving leaves the previous version intact.
+        
         Args:
             records: List of LaunchRecord objects to save
+            
+        Raises:
+            DataFileDamagedError: If the last load found the data file damaged
+        """
+        if self.damaged:
+            raise DataFileDamagedError(f"The data file {self.data_file} is damaged; "
+                                       f"recover it before making changes")
+        
+        if self.notes_storage == 'blob':
+            rows, compacted_generation = self._rows_with_notes_refs(records)
+        else:
+            # Convert LaunchRecord objects to dictionaries as they are written,
+            # followed by any rows rejected by validation on the last load
+            rows = itertools.chain((record.to_dict() for record in records), self._inline_rejected_rows())
+            compacted_generation = None
+        
+        # Rejected rows are written back exactly as they were read, which
+        # only the standard library guarantees (e.g. for NaN values)
+        codec = JSON_CODEC if self.rejected_rows else self.codec
+        blocks = []
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.data_file)),
+                                         prefix=".data-", suffix=".tmp")
+        os.close(fd)
+        try:
+            with open_data_file(temp_path, 'w', self.compression) as f:
+                length = write_json_array(f, rows, self.layout, codec, blocks)
+            # The compressed streams only finish writing when closed, so the
+            # file is synced through a descriptor of its own
+            fd = os.open(temp_path, os.O_WRONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            if os.path.exists(self.data_file):
+                shutil.copymode(self.data_file, temp_path)
+            os.replace(temp_path, self.data_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.generation += 1
+        self._generation_fingerprint = self.get_fingerprint()
+        self._write_sidecar(self.checksums_file, {
+            'version': STATS_SNAPSHOT_VERSION,
+            'fingerprint': self._generation_fingerprint,
+            'layout': self.layout,
+            'length': length,
+            'blocks': blocks
+        })
+        
+        # Older generations are only dropped once the data file points past them
+        if compacted_generation is not None:
+            self.notes_blob.remove_generations(keep=compacted_generation)
+        elif self.notes_storage == 'inline' and not any(isinstance(row, dict) and 'notes_ref' in row
+                                                        for row in self.rejected_rows):
+            self.notes_blob.remove_generations()
+    
+    def _inline_rejected_rows(self):
+        """Rejected rows with readable out-of-line notes moved back inline."""
+        for row in self.rejected_rows:
+            if isinstance(row, dict) and is_notes_ref(row.get('notes_ref')) and 'notes' not in row:
+                try:
+                    notes = self.notes_blob.read(row['notes_ref'])
+                except (OSError, UnicodeDecodeError):
+                    yield row
+                    continue
+                row = {key: value for key, value in row.items() if key != 'notes_ref'}
+                row['notes'] = notes
+            yield row
+    
+    def _rows_with_notes_refs(self, records):
+        """
+        Build the rows to save with notes stored out of line.
+        
+        Notes that are already in the current blob generation keep their
+        reference; new or changed notes are appended to it. When more than
+        half of the blob is garbage from replaced notes, the live notes are
+        copied into a new generation instead.
+        
+        Args:
+            records: List of LaunchRecord objects
+            
+        Returns:
+            tuple: (list of rows followed by the rejected rows, the new
+                generation if the blob was compacted, otherwise None)
+        """
+        blob = self.notes_blob
+        generation = blob.latest_generation
+        rows = []
+        pending = []
+        live_bytes = 0
+        
+        for record in records:
+            row = record.to_dict(include_notes=False)
+            ref = record.get_notes_ref(blob)
+            if ref is not None and ref[0] == generation:
+                row['notes_ref'] = ref
+                live_bytes += ref[2]
+            else:
+                notes = record.notes
+                if notes:
+                    pending.append((row, notes.encode('utf-8')))
+                else:
+                    row['notes'] = ""
+            rows.append(row)
+        
+        rejected_rows = list(self.rejected_rows)
+        if generation is None:
+            generation = 1
+            compacted_generation = None
+        else:
+            garbage = blob.size(generation) - live_bytes
+            if garbage > NOTES_COMPACT_MIN_BYTES and garbage > live_bytes:
+                generation += 1
+                compacted_generation = generation
+            else:
+                compacted_generation = None
+        
+        if compacted_generation is not None:
+            # Copy the live notes, including those of rejected rows, to the new generation
+            for row in rows:
+                if 'notes_ref' in row:
+                    pending.append((row, blob.read_bytes(row.pop('notes_ref'))))
+            for i, row in enumerate(rejected_rows):
+                if isinstance(row, dict) and is_notes_ref(row.get('notes_ref')):
+                    try:
+                        chunk = blob.read_bytes(row['notes_ref'])
+                    except OSError:
+                        continue
+                    rejected_rows[i] = row = dict(row)
+                    pending.append((row, chunk))
+        
+        refs = blob.append(generation, [chunk for _row, chunk in pending])
+        for (row, _chunk), ref in zip(pending, refs):
+            row['notes_ref'] = ref
+        
+        rows.extend(rejected_rows)
+        return rows, compacted_generation
+    
+    def verify(self):
+        """
+        Check the data file for damage without building any records.
+        
+        The file is checked against the block checksums written with the
+        last save, even if it changed since: a block that no longer matches
+        its recorded length and CRC was damaged or edited externally. If
+        there are no checksums, the file is parsed instead.
+        
+        Returns:
+            IntegrityReport: Report of the blocks and records checked and
+                any damage found
+        """
+        if not os.path.exists(self.data_file):
+            report = IntegrityReport()
+            report.problems.append(f"The data file {self.data_file} does not exist")
+            return report
+        
+        checksums = self._load_checksums()
+        if checksums is not None:
+            report = verify_blocks(self.data_file, detect_compression(self.data_file), checksums)
+            if not report.ok and not self._snapshot_matches(checksums.get('fingerprint', {}), self.get_fingerprint()):
+                report.problems.append("The data file changed since its checksums were written: "
+                                       "it was damaged or edited externally")
+            return report
+        
+        # The standard library codec streams, so the records before any
+        # damage are counted
+        report = IntegrityReport()
+        try:
+            with open_data_file(self.data_file, 'r', detect_compression(self.data_file)) as f:
+                for _row in JSON_CODEC.iter_array(f):
+                    report.records += 1
+        except (json.JSONDecodeError, UnicodeDecodeError) + READ_ERRORS as e:
+            if not self._data_file_is_blank():
+                report.problems.append(f"The data file cannot be read after {report.records} records: {e}")
+        return report
+    
+    def recover(self):
+        """
+        Rewrite a damaged data file with every record that can be recovered.
+        
+        Intact blocks are read whole and damaged ones are scanned record by
+        record (see integrity.recover_rows). The damaged file is kept next
+        to the data file with a .damaged suffix. Recovered rows that fail
+        validation are kept as rejected rows, as on a normal load. The
+        recovery itself is not recorded in the history.
+        
+        Returns:
+            dict: Dictionary with the number of records 'recovered', how
+                many of them were 'salvaged' from damaged parts, the
+                number 'rejected' by validation and the 'backup' path
+        """
+        rows, salvaged = recover_rows(self.data_file, detect_compression(self.data_file), self._load_checksums())
+        valid_rows, report = validate_batch(rows)
+        
+        backup = self.data_file + ".damaged"
+        shutil.copy2(self.data_file, backup)
+        self.rejected_rows = [rows[index] for index in report.rejected_indexes]
+        self.damaged = False
+        self._save_records([self._record_from_row(row) for row in valid_rows])
+        return {
+            'recovered': len(valid_rows),
+            'salvaged': salvaged,
+            'rejected': report.rejected,
+            'backup': backup
+        }
+    
+    def _load_checksums(self):
+        """
+        Load the block checksums written with the last save, or None if missing.
+        
+        They are used even if the data file changed since, which is what
+        damage looks like: each block is checked against its own recorded
+        length and CRC.
+        """
+        data = self._load_sidecar(self.checksums_file)
+        if data is None or not isinstance(data.get('blocks'), list):
+            return None
+        return data
+    
+    def get_generation(self):
+        """
+        Get the data generation, which changes whenever the logbook does.
+        
+        Saves bump it directly; changes made by another process are noticed
+        by comparing the fingerprint of the data file, which costs one stat.
+        
+        Returns:
+            int: Current generation
+        """
+        fingerprint = self.get_fingerprint()
+        if fingerprint != self._generation_fingerprint:
+            self._generation_fingerprint = fingerprint
+            self.generation += 1
+        return self.generation
+    
+    def get_fingerprint(self, include_hash=False):
+        """
+        Compute a cheap fingerprint of the data file.
+        
+        Args:
+            include_hash: Also hash the file contents, which catches rewrites
+                that keep the same size within one mtime tick
+            
+        Returns:
+            dict: Dictionary with size, mtime_ns and sha256 (None unless requested)
+        """
+        stat = os.stat(self.data_file)
+        fingerprint = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': None
+        }
+        
+        if include_hash:
+            digest = hashlib.sha256()
+            with open(self.data_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            fingerprint['sha256'] = digest.hexdigest()
+        
+        return fingerprint
+    
+    def get_statistics_snapshot(self, verify_hash=False):
+        """
+        Get statistics, monthly counts and rocket success rates for the logbook.
+        
+        The results are served from the statistics sidecar when its fingerprint
+        matches the data file, so the data file itself is not read. Otherwise
+        they are recomputed and the sidecar is rewritten atomically.
+        
+        Args:
+            verify_hash: Also require the content hash to match
+            
+        Returns:
+            dict: Dictionary with 'statistics', 'monthly_launch_count' and
+                'rocket_success_rates' entries, and 'impulse_class_altitudes'
+                and 'delay_success_rates' as lists of [key, value] pairs
+        """
+        if not verify_hash:
+            return self.result_cache.get(('statistics',), self.get_generation(), self._load_statistics_snapshot)
+        return self._load_statistics_snapshot(verify_hash)
+    
+    def _load_statistics_snapshot(self, verify_hash=False):
+        """Get the statistics from the sidecar, recomputing them if it is stale."""
+        fingerprint = self.get_fingerprint(include_hash=verify_hash)
+        
+        snapshot = self._load_sidecar(self.stats_file)
+        if snapshot is not None and self._snapshot_matches(snapshot['fingerprint'], fingerprint):
+            return snapshot
+        
+        # One streaming pass, so no more than one view is held at a time
+        try:
+            summary = summarize_records(self.iter_views(STATS_FIELDS))
+        except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError, EOFError):
+            summary = summarize_records([])
+        snapshot = {
+            'version': STATS_SNAPSHOT_VERSION,
+            'fingerprint': fingerprint,
+            'statistics': summary['statistics'],
+            'monthly_launch_count': summary['monthly_launch_count'],
+            'rocket_success_rates': summary['rocket_success_rates'],
+            # Impulse classes and delays may be None, which JSON objects cannot key on
+            'impulse_class_altitudes': [list(pair) for pair in summary['impulse_class_altitudes'].items()],
+            'delay_success_rates': [list(pair) for pair in summary['delay_success_rates'].items()]
+        }
+        
+        # Only persist if the data file did not change while we were reading it
+        if self._snapshot_matches(fingerprint, self.get_fingerprint(include_hash=verify_hash)):
+            self._write_sidecar(self.stats_file, snapshot)
+        return snapshot
+    
+    def get_altitude_sketches(self):
         """
-        # Convert LaunchRecord objects to dictionaries
-        records_dict = [record.to_dict() for record in records]
+        Get altitude quantile sketches overall, per rocket and per motor.
         
-        with open(self.data_file, 'w') as f:
-            json.dump(records_dict, f, indent=4)
\ No newline at end of file
+        The sketches are kept in a sidecar next to the data file, extended
+        incrementally as records are added and rebuilt in one streaming pass
+        when the data file changed in any other way.
+        
+        Returns:
+            dict: Dictionary with 'all' (a QuantileSketch), 'rocket' and
+                'motor' (dictionaries mapping names to QuantileSketch objects)
+        """
+        fingerprint = self.get_fingerprint()
+        data = self._load_sidecar(self.sketches_file)
+        if data is not None and self._snapshot_matches(data['fingerprint'], fingerprint):
+            return self._sketches_from_dict(data)
+        
+        try:
+            sketches = build_altitude_sketches(self.iter_views(SKETCH_FIELDS))
+        except (json.JSONDecodeError, FileNotFoundError, EOFError):
+            sketches = build_altitude_sketches([])
+        if self._snapshot_matches(fingerprint, self.get_fingerprint()):
+            self._write_sketches(sketches, fingerprint)
+        return sketches
+    
+    def _extend_altitude_sketches(self, fingerprint_before, added_records):
+        """Add new records to the sketch sidecar if it was current before the write."""
+        data = self._load_sidecar(self.sketches_file)
+        if data is None or not self._snapshot_matches(data['fingerprint'], fingerprint_before):
+            return
+        sketches = build_altitude_sketches(added_records, sketches=self._sketches_from_dict(data))
+        self._write_sketches(sketches, self.get_fingerprint())
+    
+    def _sketches_from_dict(self, data):
+        """Restore sketches stored in the sketch sidecar."""
+        return {
+            'all': QuantileSketch.from_dict(data['all']),
+            'rocket': {name: QuantileSketch.from_dict(sketch) for name, sketch in data['rocket'].items()},
+            'motor': {name: QuantileSketch.from_dict(sketch) for name, sketch in data['motor'].items()}
+        }
+    
+    def _write_sketches(self, sketches, fingerprint):
+        """Write sketches to the sketch sidecar for the given fingerprint."""
+        self._write_sidecar(self.sketches_file, {
+            'version': STATS_SNAPSHOT_VERSION,
+            'fingerprint': fingerprint,
+            'all': sketches['all'].to_dict(),
+            'rocket': {name: sketch.to_dict() for name, sketch in sketches['rocket'].items()},
+            'motor': {name: sketch.to_dict() for name, sketch in sketches['motor'].items()}
+        })
+    
+    def get_record_summary(self):
+        """
+        Get the per-record hashes of the logbook, used to compare replicas.
+        
+        The summary is kept in a sidecar next to the data file and updated
+        with every change made through the DataManager, so it is only rebuilt
+        after the file was changed some other way.
+        
+        Returns:
+            RecordSummary: Hashes of all valid records, grouped into buckets
+            
+        Raises:
+            DataFileDamagedError: If the data file cannot be read; its
+                records are unknown, not absent
+        """
+        fingerprint = self.get_fingerprint()
+        data = self._load_sidecar(self.summary_file)
+        if data is not None and self._snapshot_matches(data['fingerprint'], fingerprint):
+            return RecordSummary.from_dict(data['hashes'])
+        
+        records = self.get_all_records()
+        if self.damaged:
+            raise DataFileDamagedError(f"The data file {self.data_file} is damaged; "
+                                       f"recover it before comparing it with another logbook")
+        summary = RecordSummary.from_rows(record.to_dict() for record in records)
+        if self._snapshot_matches(fingerprint, self.get_fingerprint()):
+            self._write_record_summary(summary, fingerprint)
+        return summary
+    
+    def _update_record_summary(self, fingerprint_before, changes):
+        """Apply changes to the summary sidecar if it was current before the write."""
+        data = self._load_sidecar(self.summary_file)
+        if data is None or not self._snapshot_matches(data['fingerprint'], fingerprint_before):
+            return
+        summary = RecordSummary.from_dict(data['hashes'])
+        summary.apply(changes)
+        self._write_record_summary(summary, self.get_fingerprint())
+    
+    def _write_record_summary(self, summary, fingerprint):
+        """Write a record summary to the summary sidecar for the given fingerprint."""
+        self._write_sidecar(self.summary_file, {
+            'version': STATS_SNAPSHOT_VERSION,
+            'fingerprint': fingerprint,
+            'hashes': summary.to_dict()
+        })
+    
+    def get_sync_base(self, peer_file):
+        """
+        Get the record hashes agreed with a peer logbook at the last sync.
+        
+        Args:
+            peer_file: Data file of the peer logbook
+            
+        Returns:
+            dict: Dictionary mapping record IDs to hashes, or None if the
+                logbooks have not been synced before
+        """
+        data = self._load_sidecar(self.sync_file)
+        if data is None:
+            return None
+        base = data['peers'].get(os.path.realpath(peer_file))
+        if base is None:
+            return None
+        return {int(record_id): digest for record_id, digest in base.items()}
+    
+    def set_sync_base(self, peer_file, hashes):
+        """
+        Remember the record hashes agreed with a peer logbook.
+        
+        Args:
+            peer_file: Data file of the peer logbook
+            hashes: Dictionary mapping record IDs to hashes
+        """
+        data = self._load_sidecar(self.sync_file) or {'version': STATS_SNAPSHOT_VERSION, 'peers': {}}
+        data['peers'][os.path.realpath(peer_file)] = {str(record_id): digest for record_id, digest in hashes.items()}
+        self._write_sidecar(self.sync_file, data)
+    
+    def _snapshot_matches(self, stored, current):
+        """Check whether a stored fingerprint is still valid for the current one."""
+        if stored.get('size') != current['size'] or stored.get('mtime_ns') != current['mtime_ns']:
+            return False
+        if current['sha256'] is not None and stored.get('sha256') != current['sha256']:
+            return False
+        return True
+    
+    def _load_sidecar(self, path):
+        """Load a sidecar cache file, returning None if missing, unreadable or outdated."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+        
+        if not isinstance(data, dict) or data.get('version') != STATS_SNAPSHOT_VERSION:
+            return None
+        return data
+    
+    def _write_sidecar(self, path, data):
+        """Atomically replace a sidecar cache file with the given data."""
+        directory = os.path.dirname(os.path.abspath(path))
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".sidecar-", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, path)
+        except OSError:
+            # Sidecars are only caches; failing to write one is not an error
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from rocket_logbook.fuzzy import edit_distance
+from rocket_logbook.motors import parse_motor_designation
+
+# Near-duplicate altitudes may differ by this fraction of the larger one
+NEAR_ALTITUDE_TOLERANCE = 0.03
+
+# Near-duplicate motor types may differ by this many edits, e.g. "C6-5" and "C6-3";
+# the impulse class must still be the same, so "B6-4" and "C6-4" never match
+NEAR_MOTOR_DISTANCE = 1
+
+def _normalize_text(value):
+    """Case-fold a text field and collapse its whitespace."""
+    return " ".join(value.casefold().split())
+
+def duplicate_key(record):
+    """
+    Normalized key under which exact duplicates collide.
+
+    Case and spacing of the rocket name and motor type are ignored, and
+    altitudes are compared to a tenth of a meter.
+
+    Args:
+        record: LaunchRecord to build the key for
+
+    Returns:
+        tuple: Hashable key
+    """
+    return (
+        record.date,
+        _normalize_text(record.rocket_name),
+        _normalize_text(record.motor_type),
+        round(float(record.altitude), 1)
+    )
+
+def blocking_key(record):
+    """Key of the block a record is compared within when looking for near-duplicates."""
+    return (record.date, _normalize_text(record.rocket_name))
+
+def is_near_duplicate(a, b):
+    """
+    Check whether two records from the same block look like the same launch.
+
+    Args:
+        a: First LaunchRecord
+        b: Second LaunchRecord
+
+    Returns:
+        bool: True if the outcome and impulse class are the same and the
+            motor types and altitudes are close
+    """
+    if a.success != b.success:
+        return False
+    highest = max(abs(a.altitude), abs(b.altitude))
+    if abs(a.altitude - b.altitude) > highest * NEAR_ALTITUDE_TOLERANCE:
+        return False
+    # A different impulse class is a different motor, and so a different flight
+    if parse_motor_designation(a.motor_type).impulse_class != parse_motor_designation(b.motor_type).impulse_class:
+        return False
+    motor_a = _normalize_text(a.motor_type)
+    motor_b = _normalize_text(b.motor_type)
+    return edit_distance(motor_a, motor_b, NEAR_MOTOR_DISTANCE) <= NEAR_MOTOR_DISTANCE
+
+class DuplicateGroup:
+    """Records that appear to describe the same launch."""
+
+    def __init__(self, kind, records):
+        """
+        Initialize a group of duplicates.
+
+        Args:
+            kind: 'exact' or 'near'
+            records: LaunchRecord objects in the group, ordered by ID
+        """
+        self.kind = kind
+        self.records = records
+
+    @property
+    def keeper(self):
+        """The record kept when the group is merged: the one logged first."""
+        return self.records[0]
+
+    @property
+    def duplicates(self):
+        """The records removed when the group is merged."""
+        return self.records[1:]
+
+    def to_dict(self):
+        """
+        Convert the group to a dictionary for JSON serialization.
+
+        Returns:
+            dict: Dictionary with the kind and IDs of the group
+        """
+        return {
+            'kind': self.kind,
+            'keep': self.keeper.id,
+            'remove': [record.id for record in self.duplicates]
+        }
+
+def find_duplicate_groups(records, near=False):
+    """
+    Group records that appear to describe the same launch.
+
+    Exact duplicates are found in a single pass by bucketing records under
+    their normalized key. Near-duplicates are only searched for within
+    blocks of records sharing a date and rocket, so the pairwise comparison
+    stays confined to a handful of records.
+
+    Args:
+        records: Iterable of LaunchRecord objects
+        near: Also look for near-duplicates (same outcome, close altitudes,
+            a motor type of the same impulse class differing by one character)
+
+    Returns:
+        list: DuplicateGroup objects, exact groups first, each ordered by ID
+    """
+    buckets = defaultdict(list)
+    for record in records:
+        buckets[duplicate_key(record)].append(record)
+
+    groups = []
+    representatives = []
+    for bucket in buckets.values():
+        bucket.sort(key=lambda record: record.id)
+        if len(bucket) > 1:
+            groups.append(DuplicateGroup('exact', bucket))
+        representatives.append(bucket[0])
+
+    if near:
+        # Compare one representative per exact bucket so exact duplicates
+        # are not reported twice
+        blocks = defaultdict(list)
+        for record in representatives:
+            blocks[blocking_key(record)].append(record)
+        for block in blocks.values():
+            if len(block) > 1:
+                groups.extend(_near_groups(block))
+
+    groups.sort(key=lambda group: (group.kind != 'exact', group.keeper.id))
+    return groups
+
+def _near_groups(block):
+    """Cluster a block of records into near-duplicate groups."""
+    block.sort(key=lambda record: record.id)
+    parent = list(range(len(block)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(block)):
+        for j in range(i + 1, len(block)):
+            if is_near_duplicate(block[i], block[j]):
+                parent[find(j)] = find(i)
+
+    clusters = defaultdict(list)
+    for i, record in enumerate(block):
+        clusters[find(i)].append(record)
+    return [DuplicateGroup('near', cluster) for cluster in clusters.values() if len(cluster) > 1]
+
+def merge_notes(records):
+    """
+    Combine the distinct notes of several records, in order.
+
+    Args:
+        records: LaunchRecord objects
+
+    Returns:
+        str: Non-empty notes joined with "; "
+    """
+    notes = []
+    for record in records:
+        note = record.notes.strip()
+        if note and note not in notes:
+            notes.append(note)
+    return "; ".join(notes)
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.models import LaunchRecord
+
+# File names recognised as logbooks when a directory is given
+LOGBOOK_SUFFIXES = ('.json', '.json.gz', '.json.xz')
+
+# Sidecar files kept next to logbooks, which are not logbooks themselves
+SIDECAR_SUFFIXES = ('.stats.json', '.sketches.json', '.summary.json', '.sync.json', '.checksums.json')
+
+def collect_data_files(paths):
+    """
+    Expand a list of files and directories into logbook data files.
+
+    Args:
+        paths: Iterable of file or directory paths
+
+    Returns:
+        list: Sorted, de-duplicated list of data file paths
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                full_path = os.path.join(path, name)
+                if (name.endswith(LOGBOOK_SUFFIXES) and not name.endswith(SIDECAR_SUFFIXES)
+                        and os.path.isfile(full_path)):
+                    files.add(full_path)
+        else:
+            files.add(path)
+    return sorted(files)
+
+def _query_file(path, search_term):
+    """
+    Run a query against one logbook.
+
+    Runs in a worker thread or process, so it returns plain data and reports
+    failures instead of raising.
+
+    Args:
+        path: Path of the data file
+        search_term: Term as for DataManager.search_records, or None to list all records
+
+    Returns:
+        tuple: (path, list of record dictionaries, error message or None)
+    """
+    if not os.path.isfile(path):
+        return path, [], "file not found"
+
+    try:
+        # Read-only: no history is written for federated queries
+        data_manager = DataManager(path, history=False)
+        # iter_records is used rather than get_all_records so that a corrupt
+        # file is reported instead of looking like an empty logbook
+        records = list(data_manager.iter_records())
+        if search_term is not None:
+            records = data_manager.filter_records(records, search_term)
+        return path, [record.to_dict() for record in records], None
+    except Exception as e:
+        # Isolate any failure to the file that caused it
+        return path, [], f"{type(e).__name__}: {e}"
+
+class FederatedResult:
+    """Merged result of a query across several logbooks."""
+
+    def __init__(self):
+        """Initialize an empty result."""
+        self.rows = []
+        self.errors = []
+        self.files = []
+
+    def add(self, path, rows, error):
+        """
+        Add the outcome of querying one logbook.
+
+        Args:
+            path: Path of the data file
+            rows: List of record dictionaries
+            error: Error message, or None if the query succeeded
+        """
+        self.files.append(path)
+        if error is not None:
+            self.errors.append((path, error))
+            return
+        self.rows.extend((path, LaunchRecord(**row)) for row in rows)
+
+    def sort(self):
+        """Order rows by launch date, then source logbook, then record ID."""
+        self.rows.sort(key=lambda row: (row[1].date, row[0], row[1].id))
+
+def federated_query(paths, search_term=None, workers=None, use_processes=False):
+    """
+    Run a search or listing across many logbooks concurrently.
+
+    Each logbook is parsed in its own worker. A file that is missing or
+    corrupt only adds an entry to the errors of the result; the other
+    logbooks are still queried.
+
+    Args:
+        paths: Iterable of data files or directories of data files
+        search_term: Term as for DataManager.search_records, or None to list all records
+        workers: Maximum number of concurrent workers, defaults to the executor's default
+        use_processes: Use worker processes instead of threads; parsing is
+            CPU bound, so processes scale better on multi-core machines
+
+    Returns:
+        FederatedResult: Rows tagged with their source logbook, ordered by date
+    """
+    files = collect_data_files(paths)
+    result = FederatedResult()
+    if not files:
+        return result
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        futures = [executor.submit(_query_file, path, search_term) for path in files]
+        for future in futures:
+            result.add(*future.result())
+
+    result.sort()
+    return result
@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+# Length of the character n-grams used to find candidate values
+NGRAM_SIZE = 3
+
+def edit_distance(a, b, limit=None):
+    """
+    Compute the optimal string alignment distance between two strings.
+
+    This is the Levenshtein distance extended with transpositions of adjacent
+    characters, so "Dgo" is one edit away from "Dog".
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Stop early and return limit + 1 once the distance exceeds it
+
+    Returns:
+        int: Number of edits needed to turn a into b
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    if not b:
+        return len(a) if limit is None else min(len(a), limit + 1)
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        char_a = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1 and char_a == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    if limit is not None and previous[-1] > limit:
+        return limit + 1
+    return previous[-1]
+
+def match_distance(term, value, limit=None):
+    """
+    Distance between a search term and a value, allowing partial matches.
+
+    The term is compared with the whole value and with every run of
+    consecutive words of the same length as the term, so "Estes Alfa"
+    matches "Estes Alpha III" at distance 2.
+
+    Args:
+        term: Lowercase search term
+        value: Lowercase value to compare against
+        limit: Optional early-exit limit passed to edit_distance
+
+    Returns:
+        int: The smallest distance found
+    """
+    best = edit_distance(term, value, limit)
+    term_words = term.split()
+    value_words = value.split()
+    width = len(term_words)
+
+    if 0 < width < len(value_words):
+        for start in range(len(value_words) - width + 1):
+            window = " ".join(value_words[start:start + width])
+            best = min(best, edit_distance(term, window, limit))
+            if best == 0:
+                break
+    return best
+
+def default_max_distance(term):
+    """Number of typos tolerated for a term: roughly one per four characters."""
+    return max(1, round(len(term) / 4))
+
+def _ngrams(text):
+    """Set of character n-grams of a string, padded to include word boundaries."""
+    padded = f" {text} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+class FuzzyIndex:
+    """
+    N-gram candidate index over a vocabulary of distinct values.
+
+    Queries only look at values sharing enough n-grams with the term, then
+    rank those candidates by edit distance. The cost of a query depends on
+    the number of distinct values, never on how many records use them.
+    """
+
+    def __init__(self, values=()):
+        """
+        Initialize the index with an optional iterable of values.
+
+        Args:
+            values: Iterable of strings to index
+        """
+        self.values = []
+        self._lowered = []
+        self._positions = {}
+        self._postings = defaultdict(list)
+        for value in values:
+            self.add(value)
+
+    def __len__(self):
+        """Return the number of distinct values in the index."""
+        return len(self.values)
+
+    def add(self, value):
+        """
+        Add a value to the index; duplicates are ignored.
+
+        Args:
+            value: String to index
+        """
+        if value in self._positions:
+            return
+        position = len(self.values)
+        self._positions[value] = position
+        self.values.append(value)
+        lowered = value.lower()
+        self._lowered.append(lowered)
+        for gram in _ngrams(lowered):
+            self._postings[gram].append(position)
+
+    def search(self, term, max_distance=None):
+        """
+        Find values within an edit distance of a term.
+
+        Args:
+            term: Search term
+            max_distance: Largest distance to accept; defaults to
+                default_max_distance(term)
+
+        Returns:
+            list: (value, distance) tuples, closest first
+        """
+        term = " ".join(term.lower().split())
+        if not term:
+            return []
+        if max_distance is None:
+            max_distance = default_max_distance(term)
+
+        # Each edit destroys at most NGRAM_SIZE + 1 of the term's n-grams (a
+        # transposition touches one more than a substitution), so a match
+        # must share at least this many with the value
+        grams = _ngrams(term)
+        required = len(grams) - (NGRAM_SIZE + 1) * max_distance
+
+        if required > 0:
+            shared = defaultdict(int)
+            for gram in grams:
+                for position in self._postings.get(gram, ()):
+                    shared[position] += 1
+            candidates = [position for position, count in shared.items() if count >= required]
+        else:
+            # Term too short for the n-gram filter to prune anything
+            candidates = range(len(self.values))
+
+        results = []
+        for position in candidates:
+            distance = match_distance(term, self._lowered[position], max_distance)
+            if distance <= max_distance:
+                results.append((self.values[position], distance))
+
+        results.sort(key=lambda item: (item[1], item[0]))
+        return results
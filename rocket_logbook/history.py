@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import tempfile
+
+# Default number of events between snapshot checkpoints. Smaller values use
+# more disk but bound the replay needed to reconstruct a past version.
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+def apply_changes(state, changes, reverse=False):
+    """
+    Apply the changes of one event to a logbook state.
+
+    Args:
+        state: Dictionary mapping record ID to record dictionary, in file order;
+            modified in place
+        changes: List of {'before': row or None, 'after': row or None} dictionaries
+        reverse: Apply the inverse of the changes (restore the before images)
+    """
+    if reverse:
+        changes = [{'before': change['after'], 'after': change['before']} for change in reversed(changes)]
+
+    for change in changes:
+        after = change['after']
+        if after is None:
+            state.pop(change['before']['id'], None)
+        else:
+            state[after['id']] = after
+
+class History:
+    """
+    Append-only event log of logbook mutations with periodic snapshots.
+
+    Every mutation made through the DataManager appends one event holding the
+    before and after images of the records it touched. Every
+    checkpoint_interval events a full snapshot of the logbook is written, so
+    reconstructing any past version costs one snapshot load plus at most
+    checkpoint_interval events of replay.
+
+    Files live in a directory next to the data file:
+        events.jsonl      one JSON event per line
+        snapshots.jsonl   index of snapshots: seq, timestamp, events offset
+        snapshot-N.json   the logbook as of event N
+    """
+
+    def __init__(self, directory, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Initialize the history stored in the given directory.
+
+        Args:
+            directory: Directory holding the history files
+            checkpoint_interval: Number of events between snapshots
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+
+        self.directory = directory
+        self.checkpoint_interval = checkpoint_interval
+        self.events_file = os.path.join(directory, "events.jsonl")
+        self.snapshots_file = os.path.join(directory, "snapshots.jsonl")
+
+    def get_snapshots(self):
+        """
+        Read the snapshot index.
+
+        Returns:
+            list: Snapshot entries ordered by sequence number
+        """
+        try:
+            with open(self.snapshots_file, 'r') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def get_last_seq(self):
+        """Return the sequence number of the latest event, 0 if there are none."""
+        last = None
+        for event in self.iter_events_reverse():
+            last = event
+            break
+        return last['seq'] if last else 0
+
+    def append(self, op, changes, records_after, undoes=None):
+        """
+        Record a mutation.
+
+        Args:
+            op: Name of the operation, e.g. 'add', 'update', 'delete' or 'undo'
+            changes: List of {'before': row or None, 'after': row or None}
+            records_after: List of record dictionaries after the mutation, or a
+                callable returning it; only used for the baseline and
+                checkpoint snapshots
+            undoes: For 'undo' events, the sequence number of the undone event
+
+        Returns:
+            dict: The appended event
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        snapshots = self.get_snapshots()
+        timestamp = time.time()
+
+        if not callable(records_after):
+            rows_after = records_after
+            records_after = lambda: rows_after
+
+        if not snapshots:
+            # First change: snapshot the logbook as it was before it
+            state = {row['id']: row for row in records_after()}
+            apply_changes(state, changes, reverse=True)
+            self._write_snapshot(0, timestamp, list(state.values()), offset=0)
+            snapshots = self.get_snapshots()
+
+        event = {
+            'seq': self.get_last_seq() + 1,
+            'timestamp': timestamp,
+            'op': op,
+            'changes': changes
+        }
+        if undoes is not None:
+            event['undoes'] = undoes
+        with open(self.events_file, 'a') as f:
+            f.write(json.dumps(event, separators=(',', ':')) + "\n")
+            f.flush()
+            offset = f.tell()
+
+        if event['seq'] - snapshots[-1]['seq'] >= self.checkpoint_interval:
+            self._write_snapshot(event['seq'], timestamp, records_after(), offset)
+
+        return event
+
+    def as_of(self, timestamp):
+        """
+        Reconstruct the logbook as it was at the given time.
+
+        Args:
+            timestamp: Seconds since the epoch
+
+        Returns:
+            list: Record dictionaries in file order, or None if the history
+                does not go back that far
+        """
+        base = None
+        for snapshot in self.get_snapshots():
+            if snapshot['timestamp'] > timestamp:
+                break
+            base = snapshot
+        if base is None:
+            return None
+
+        with open(os.path.join(self.directory, base['file']), 'r') as f:
+            state = {row['id']: row for row in json.load(f)}
+
+        # Replay the bounded run of events after the snapshot
+        try:
+            with open(self.events_file, 'r') as f:
+                f.seek(base['offset'])
+                for line in f:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event['timestamp'] > timestamp:
+                        break
+                    apply_changes(state, event['changes'])
+        except FileNotFoundError:
+            pass
+
+        return list(state.values())
+
+    def read_events_from(self, offset):
+        """
+        Read the events appended after a byte offset of the event log.
+
+        Only complete lines are returned, so an event that is still being
+        written is picked up by the next call.
+
+        Args:
+            offset: Byte offset to start reading at, e.g. a previous return value
+
+        Returns:
+            tuple: (list of events, offset just past the last complete event)
+        """
+        try:
+            with open(self.events_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = data.rfind(b'\n') + 1
+        events = [json.loads(line) for line in data[:end].split(b'\n') if line.strip()]
+        return events, offset + end
+
+    def get_events_size(self):
+        """Return the current size of the event log in bytes."""
+        try:
+            return os.path.getsize(self.events_file)
+        except FileNotFoundError:
+            return 0
+
+    def find_undoable(self):
+        """
+        Find the latest event that has not been undone.
+
+        Undo events themselves are skipped, so repeated undos walk further
+        back through the history.
+
+        Returns:
+            dict: The event to undo, or None if there is nothing to undo
+        """
+        undone = set()
+        for event in self.iter_events_reverse():
+            if event['op'] == 'undo':
+                undone.add(event['undoes'])
+            elif event['seq'] not in undone:
+                return event
+        return None
+
+    def iter_events_reverse(self, block_size=64 * 1024):
+        """
+        Iterate over events from newest to oldest, reading the log backwards.
+
+        Yields:
+            Event dictionaries
+        """
+        try:
+            f = open(self.events_file, 'rb')
+        except FileNotFoundError:
+            return
+
+        with f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                size = min(block_size, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + remainder).split(b'\n')
+                # The first piece may be a partial line; keep it for the next block
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield json.loads(line)
+            if remainder.strip():
+                yield json.loads(remainder)
+
+    def _write_snapshot(self, seq, timestamp, rows, offset):
+        """Write a snapshot file atomically and add it to the snapshot index."""
+        name = f"snapshot-{seq}.json"
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".snapshot-", suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(rows, f, separators=(',', ':'))
+        os.replace(temp_path, os.path.join(self.directory, name))
+
+        entry = {'seq': seq, 'timestamp': timestamp, 'file': name, 'offset': offset}
+        with open(self.snapshots_file, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,292 @@
+import re
+import json
+import zlib
+import lzma
+from rocket_logbook.storage import open_data_file, array_end
+
+# Characters read at a time from a damaged file. A compressed file that is
+# cut off loses the chunk being decompressed, so this is kept small.
+SCAN_CHUNK_SIZE = 16 * 1024
+
+# Errors raised when a compressed data file is truncated or corrupt
+READ_ERRORS = (EOFError, OSError, zlib.error, lzma.LZMAError)
+
+# Every block after the first starts at a record boundary: the comma
+# separating two records, then the opening brace of the next one
+RECORD_BOUNDARY = re.compile(r',\s*\{')
+
+# Characters searched again when the buffer grows, so that a record
+# boundary split across two reads is still found
+BOUNDARY_OVERLAP = 64
+
+class DataFileDamagedError(Exception):
+    """The data file could not be read, so saving over it would lose records."""
+
+class IntegrityReport:
+    """Result of verifying a data file against its block checksums."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.checksums = False
+        self.blocks = 0
+        self.records = 0
+        self.bad_blocks = []
+        self.problems = []
+
+    @property
+    def ok(self):
+        """Whether no damage was found."""
+        return not self.bad_blocks and not self.problems
+
+    def to_dict(self):
+        """
+        Convert the report to a dictionary.
+
+        Returns:
+            dict: Dictionary representation of the report
+        """
+        return {
+            'ok': self.ok,
+            'checksums': self.checksums,
+            'blocks': self.blocks,
+            'records': self.records,
+            'bad_blocks': list(self.bad_blocks),
+            'problems': list(self.problems)
+        }
+
+def _read_text(f, size):
+    """Read up to size characters, stopping early where the file is unreadable."""
+    parts = []
+    while size > 0:
+        try:
+            part = f.read(min(size, SCAN_CHUNK_SIZE))
+        except READ_ERRORS:
+            break
+        if not part:
+            break
+        parts.append(part)
+        size -= len(part)
+    return "".join(parts)
+
+class _BlockScanner:
+    """
+    Reads the blocks of a data file in order, finding them again after damage.
+
+    Blocks are read by their recorded lengths while their checksums match.
+    A damaged block may also have gained or lost characters, which shifts
+    every block after it, so the next intact block is searched for instead
+    of assumed to follow: at each record boundary after the damage, every
+    later block is tried, and one is found where its length and checksum
+    match and the next block or the end of the array follows it. Only the
+    damaged part of the file and one block are held in memory.
+    """
+
+    def __init__(self, f, checksums):
+        """
+        Initialize a scanner.
+
+        Args:
+            f: Text file object positioned at the start of the data file
+            checksums: Checksums sidecar data with 'blocks' and 'layout'
+        """
+        self.f = f
+        self.blocks = checksums['blocks']
+        self.end = array_end(checksums['layout'], not self.blocks)
+        self.buffer = ""
+        self.eof = False
+
+    def _fill(self, size):
+        """Read until the buffer holds size characters or the file ends."""
+        if len(self.buffer) >= size or self.eof:
+            return
+        # Growing at least geometrically keeps a long search linear
+        wanted = max(size - len(self.buffer), len(self.buffer), SCAN_CHUNK_SIZE)
+        text = _read_text(self.f, wanted)
+        if len(text) < wanted:
+            self.eof = True
+        self.buffer += text
+
+    def _take(self, size):
+        """Remove and return the first size characters of the buffer."""
+        text = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return text
+
+    def _matches(self, position, index):
+        """Whether block index starts at a position in the buffer."""
+        _offset, length, crc, _count = self.blocks[index]
+        self._fill(position + length)
+        text = self.buffer[position:position + length]
+        return len(text) == length and zlib.crc32(text.encode('utf-8')) == crc
+
+    def _is_followed(self, position, index):
+        """Whether what comes after block index, if it started at position, is the next block or the array end."""
+        end = position + self.blocks[index][1]
+        if index + 1 < len(self.blocks):
+            self._fill(end + 1)
+            return self.buffer[end:end + 1] == ','
+        self._fill(end + len(self.end))
+        return self.buffer[end:end + len(self.end)] == self.end
+
+    def _resync(self, index):
+        """
+        Find the next intact block after a damaged block at the start of the buffer.
+
+        Returns:
+            tuple: (position in the buffer, block index), or None if no later
+                block is intact
+        """
+        start = 1
+        while True:
+            match = RECORD_BOUNDARY.search(self.buffer, start)
+            if match is None:
+                if self.eof:
+                    return None
+                start = max(start, len(self.buffer) - BOUNDARY_OVERLAP)
+                self._fill(len(self.buffer) + 1)
+                continue
+            position = match.start()
+            for candidate in range(index + 1, len(self.blocks)):
+                if self._is_followed(position, candidate) and self._matches(position, candidate):
+                    return position, candidate
+            start = position + 1
+
+    def __iter__(self):
+        """
+        Read the blocks.
+
+        Yields:
+            tuple: (first block index, index after the last, text, intact),
+                one for each intact block and one for each run of damaged
+                blocks; a run reaching the end of the file ends the scan
+        """
+        index = 0
+        while index < len(self.blocks):
+            if self._matches(0, index):
+                yield index, index + 1, self._take(self.blocks[index][1]), True
+                index += 1
+                continue
+            found = self._resync(index)
+            if found is None:
+                yield index, len(self.blocks), self._take(len(self.buffer)), False
+                return
+            position, next_index = found
+            yield index, next_index, self._take(position), False
+            index = next_index
+
+    def rest(self):
+        """Read everything after the blocks."""
+        self._fill(float('inf'))
+        return self._take(len(self.buffer))
+
+def verify_blocks(path, compression, checksums):
+    """
+    Check a data file against the block checksums written with it.
+
+    Each block is read and its CRC-32 compared, without decoding any JSON,
+    so this runs at about the speed the file can be read. After a damaged
+    block the next intact one is searched for, so damage that adds or
+    removes characters only marks the blocks it touches.
+
+    Args:
+        path: Path of the data file
+        compression: Compression of the file as returned by detect_compression
+        checksums: Checksums sidecar data with 'blocks', 'length' and 'layout'
+
+    Returns:
+        IntegrityReport: Blocks checked, records in intact blocks and damage found
+    """
+    report = IntegrityReport()
+    report.checksums = True
+    blocks = checksums['blocks']
+    report.blocks = len(blocks)
+    with open_data_file(path, 'r', compression, errors='replace') as f:
+        scanner = _BlockScanner(f, checksums)
+        for first, last, text, intact in scanner:
+            if intact:
+                report.records += blocks[first][3]
+                continue
+            report.bad_blocks.extend(range(first, last))
+            if last == len(blocks):
+                # No intact block follows, so the damage runs to the end of the file
+                if len(text) < blocks[first][1]:
+                    report.problems.append(f"The file ends early, in block {first}")
+                return report
+
+        # Whitespace after the array is accepted, as it is on load
+        end = scanner.end
+        rest = scanner.rest()
+        if not rest.startswith(end) or rest[len(end):].strip():
+            report.problems.append("The end of the file does not match the checksums")
+    return report
+
+def salvage_rows(text):
+    """
+    Find the records in damaged JSON text.
+
+    Decoding restarts at the next '{' after anything that cannot be decoded,
+    so every record that is intact is found, whatever surrounds it.
+
+    Args:
+        text: JSON text, possibly cut off or with damaged parts
+
+    Yields:
+        Decoded objects that have an 'id', in file order
+    """
+    decode = json.JSONDecoder().raw_decode
+    position = text.find('{')
+    while position != -1:
+        try:
+            row, end = decode(text, position)
+        except ValueError:
+            position = text.find('{', position + 1)
+            continue
+        if isinstance(row, dict) and 'id' in row:
+            yield row
+            position = text.find('{', end)
+        else:
+            position = text.find('{', position + 1)
+
+def recover_rows(path, compression, checksums=None):
+    """
+    Read every record that can be recovered from a damaged data file.
+
+    With checksums, blocks that are intact are decoded as a whole and only
+    damaged blocks are scanned record by record, so recovery starts afresh
+    at the next intact block, wherever damage has moved it. Consecutive damaged blocks are scanned
+    together, which keeps records that straddle them. Without checksums
+    the whole file is scanned.
+
+    Args:
+        path: Path of the data file
+        compression: Compression of the file as returned by detect_compression
+        checksums: Checksums sidecar data, or None
+
+    Returns:
+        tuple: (list of recovered rows in file order, number of them taken
+            from damaged parts of the file)
+    """
+    rows = []
+    salvaged = 0
+    damaged = []
+
+    def salvage():
+        nonlocal salvaged
+        found = list(salvage_rows("".join(damaged)))
+        rows.extend(found)
+        salvaged += len(found)
+        damaged.clear()
+
+    with open_data_file(path, 'r', compression, errors='replace') as f:
+        scanner = _BlockScanner(f, checksums) if checksums else None
+        for _first, _last, text, intact in (scanner or ()):
+            if intact:
+                salvage()
+                rows.extend(json.loads('[' + text[1:] + ']'))
+            else:
+                damaged.append(text)
+
+        # Anything after the known blocks (or the whole file without them)
+        damaged.append(scanner.rest() if scanner else _read_text(f, float('inf')))
+        salvage()
+    return rows, salvaged
@@ -2,6 +2,8 @@
 
 import os
 import sys
+import json
+import atexit
 import argparse
 from rich.console import Console
 from rich.table import Table
@@ -9,44 +11,264 @@ from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 from rich.markdown import Markdown
 from datetime import datetime
-from rocket_logbook.data_manager import DataManager
+from rocket_logbook.data_manager import DataManager, STATS_FIELDS
 from rocket_logbook.models import LaunchRecord
-from rocket_logbook.stats import calculate_statistics
-from rocket_logbook.utils import validate_date, clear_screen, format_date_for_display
+from rocket_logbook.motors import impulse_class_rank
+from rocket_logbook.stats import group_by, parse_group_keys, check_aggregates, AGGREGATES, GROUP_KEYS
+from rocket_logbook.validation import check_record_fields
+from rocket_logbook.sketches import DEFAULT_RANK_ERROR
+from rocket_logbook.dashboard import watch
+from rocket_logbook.federation import federated_query
+from rocket_logbook.sync import sync_logbooks
+from rocket_logbook.session import LogbookSession
+from rocket_logbook.batch import run_batch
+from rocket_logbook.ranking import SORT_FIELDS, TOP_PER_KEYS, sort_records
+from rocket_logbook.storage import get_codec, write_json_array
+from rocket_logbook.integrity import DataFileDamagedError
+from rocket_logbook.report import write_report, REPORT_FORMATS, REPORT_PAGE_SIZE
+from rocket_logbook.trends import (compute_trends, write_trends_csv, DEFAULT_WINDOW_DAYS, TREND_FIELDS,
+                                   TREND_COLUMNS, ROCKET_TREND_COLUMNS)
+from rocket_logbook.budget import (parse_size, format_size, estimate_memory, peak_memory, group_limit,
+                                   chunks, external_sort, spilling_group_by)
+from rocket_logbook.utils import validate_date, clear_screen, format_date_for_display, parse_timestamp
 
 console = Console()
 data_manager = DataManager()
 
+# Unit of work used while the interactive menu is open
+session = None
+
+# Memory budget in bytes set with --max-memory, and whether the logbook is
+# estimated to exceed it, in which case commands stream the data file
+memory_budget = None
+low_memory = False
+
+def current_logbook():
+    """Return the interactive session if one is open, otherwise the DataManager."""
+    return session if session is not None else data_manager
+
+def streaming():
+    """Whether commands should stream the data file to stay within the memory budget."""
+    return low_memory and session is None
+
 def main():
     """Main entry point of the application."""
+    try:
+        run_command_line()
+    except DataFileDamagedError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        console.print("Run 'rocket-logbook --verify' to check it and 'rocket-logbook --recover' to salvage its records.")
+        sys.exit(1)
+
+def run_command_line():
+    """Parse the command line arguments and run the requested command."""
     parser = argparse.ArgumentParser(description="Model Rocket Launch Logbook")
     parser.add_argument("--stats", action="store_true", help="Display statistics about launches")
     parser.add_argument("--list", action="store_true", help="List all launches")
     parser.add_argument("--search", type=str, help="Search for launches by rocket type or date (YYYY-MM-DD)")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="With --search, match rocket names and motor types allowing for typos")
+    parser.add_argument("--sort", choices=SORT_FIELDS, metavar="FIELD",
+                        help=f"Sort --list and --search results, or rank --top, by a field ({', '.join(SORT_FIELDS)})")
+    parser.add_argument("--reverse", action="store_true",
+                        help="Sort in descending order; with --top, select the lowest values instead")
+    parser.add_argument("--top", type=int, metavar="N",
+                        help="List the N launches with the highest value of --sort (default: altitude)")
+    parser.add_argument("--top-per", choices=list(TOP_PER_KEYS),
+                        help="With --top, list the top launches of each rocket or motor (default N: 1)")
     parser.add_argument("--data-file", type=str, help="Specify a custom data file path")
+    parser.add_argument("--federate", type=str, nargs="+", metavar="PATH",
+                        help="With --list or --search, query several data files or directories of data files at once")
+    parser.add_argument("--workers", type=int, help="Maximum number of logbooks queried concurrently with --federate")
+    parser.add_argument("--processes", action="store_true",
+                        help="With --federate, use worker processes instead of threads")
+    parser.add_argument("--batch", type=str, metavar="FILE",
+                        help="Run newline-delimited commands from FILE (- for standard input) "
+                             "and print the results as JSON Lines")
+    parser.add_argument("--changes", type=str, metavar="CONSUMER",
+                        help="Print the changes made since CONSUMER last asked, as JSON Lines, and remember its position")
+    parser.add_argument("--watch", type=float, nargs="?", const=1.0, metavar="SECONDS",
+                        help="Show a live dashboard that refreshes as launches are logged (default: every second)")
+    parser.add_argument("--as-of", type=str, metavar="WHEN",
+                        help="List launches as the logbook was at a past time (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
+    parser.add_argument("--undo", action="store_true", help="Undo the most recent change to the logbook")
+    parser.add_argument("--validate", action="store_true", help="Check every record in the logbook and report problems")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the data file for damage against its block checksums")
+    parser.add_argument("--recover", action="store_true",
+                        help="Rewrite a damaged data file with every record that can be salvaged")
+    parser.add_argument("--dedupe", choices=["exact", "near"], nargs="?", const="exact",
+                        help="Report duplicate launches, exact (default) or also near-duplicates")
+    parser.add_argument("--merge", action="store_true",
+                        help="With --dedupe, merge each group of duplicates into its first record")
+    parser.add_argument("--layout", choices=["pretty", "compact"],
+                        help="JSON layout used when the logbook is next saved")
+    parser.add_argument("--compression", choices=["none", "gzip", "lzma"],
+                        help="Compression used when the logbook is next saved (default: detected)")
+    parser.add_argument("--notes-storage", choices=["inline", "blob"],
+                        help="Where notes are kept when the logbook is next saved: in each record, "
+                             "or in a separate notes file (default: keep the current storage)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not cache search and statistics results in memory")
+    parser.add_argument("--cache-info", action="store_true",
+                        help="Print the hits, misses and hit rate of the result caches when the command ends")
+    parser.add_argument("--codec", choices=["auto", "json", "orjson", "msgspec"],
+                        help="JSON library used to read and write the data file (default: the fastest installed)")
+    parser.add_argument("--max-memory", type=str, metavar="SIZE",
+                        help="Memory budget (e.g. 64M); larger logbooks are listed, searched, "
+                             "summarized and exported by streaming, and peak memory is reported")
+    parser.add_argument("--export", type=str, metavar="FILE",
+                        help="Write all launches to a JSON file")
+    parser.add_argument("--verify-hash", action="store_true",
+                        help="With --stats, also check a content hash before trusting cached statistics")
+    parser.add_argument("--percentiles", choices=["rocket", "motor"], nargs="?", const="rocket",
+                        help="Display estimated altitude percentiles per rocket (default) or motor")
+    parser.add_argument("--trends", type=int, nargs="?", const=DEFAULT_WINDOW_DAYS, metavar="DAYS",
+                        help="Display rolling launches per week, success rate and mean altitude over "
+                             f"a window of DAYS days (default: {DEFAULT_WINDOW_DAYS})")
+    parser.add_argument("--by-rocket", action="store_true",
+                        help="With --trends, report the rolling success rate and mean altitude of each rocket")
+    parser.add_argument("--csv", type=str, metavar="FILE",
+                        help="With --trends, write the trends to a CSV file ('-' for standard output)")
+    parser.add_argument("--group-by", type=str, metavar="KEYS",
+                        help=f"Report aggregates grouped by keys, comma separated ({', '.join(GROUP_KEYS)})")
+    parser.add_argument("--aggregates", type=str, default=",".join(AGGREGATES),
+                        help=f"Aggregates for --group-by, comma separated ({', '.join(AGGREGATES)})")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    sync_parser = subparsers.add_parser("sync", help="Two-way synchronize two copies of a logbook")
+    sync_parser.add_argument("a", metavar="A", help="Data file of the first logbook")
+    sync_parser.add_argument("b", metavar="B", help="Data file of the second logbook")
+    sync_parser.add_argument("--prefer", choices=["a", "b"],
+                             help="Resolve conflicts in favour of this logbook instead of leaving them")
+    report_parser = subparsers.add_parser("report", help="Write a season report with statistics and all launches")
+    report_parser.add_argument("--format", choices=REPORT_FORMATS, default="md",
+                               help="Report format (default: md)")
+    report_parser.add_argument("--output", "-o", type=str, metavar="FILE",
+                               help="File to write (default: rocket_launch_report.md or .html)")
+    report_parser.add_argument("--title", type=str, default="Rocket Launch Report", help="Title of the report")
+    report_parser.add_argument("--page-size", type=int, default=REPORT_PAGE_SIZE, metavar="N",
+                               help=f"Launches per page of the launch list (default: {REPORT_PAGE_SIZE})")
     
     args = parser.parse_args()
     
-    # If a custom data file is specified, use it
-    if args.data_file:
+    if args.command == "sync":
+        sync_data_files(args.a, args.b, args.prefer)
+        return
+    
+    # If a custom data file or storage format is specified, use it
+    if args.data_file or args.layout or args.compression or args.notes_storage or args.no_cache or args.codec:
         global data_manager
-        data_manager = DataManager(args.data_file)
+        try:
+            data_manager = DataManager(args.data_file, layout=args.layout, compression=args.compression,
+                                       notes_storage=args.notes_storage, result_cache=not args.no_cache,
+                                       codec=args.codec)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.cache_info:
+        atexit.register(report_cache_info, "Result cache", data_manager.result_cache)
+    
+    if args.max_memory:
+        try:
+            set_memory_budget(parse_size(args.max_memory))
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.command == "report":
+        if args.page_size < 1:
+            parser.error("--page-size must be at least 1")
+        write_report_file(args.output or f"rocket_launch_report.{args.format}", args.format, args.title, args.page_size)
+        return
+    
+    if args.federate:
+        if not (args.list or args.search):
+            parser.error("--federate requires --list or --search")
+        list_federated_launches(args.federate, args.search, args.workers, args.processes)
+        return
+    
+    if args.batch:
+        run_batch_file(args.batch)
+        return
+    
+    if args.changes:
+        print_changes(args.changes)
+        return
     
     if args.stats:
-        display_statistics()
+        display_statistics(verify_hash=args.verify_hash)
+        return
+    elif args.top is not None or args.top_per:
+        if args.top is not None and args.top < 1:
+            parser.error("--top must be at least 1")
+        display_top_launches(1 if args.top is None else args.top, args.sort or "altitude", args.top_per, smallest=args.reverse)
         return
     elif args.list:
-        list_all_launches()
+        list_all_launches(sort=args.sort, reverse=args.reverse)
         return
     elif args.search:
-        search_launches(args.search)
+        search_launches(args.search, fuzzy=args.fuzzy, sort=args.sort, reverse=args.reverse)
+        return
+    elif args.export:
+        export_launches(args.export)
+        return
+    elif args.watch is not None:
+        if not args.watch > 0:
+            parser.error("--watch must be a positive number of seconds")
+        watch(data_manager, console, interval=args.watch)
+        return
+    elif args.as_of:
+        list_launches_as_of(args.as_of)
+        return
+    elif args.undo:
+        undo_last_change()
+        return
+    elif args.validate:
+        display_validation_report()
+        return
+    elif args.verify:
+        if not verify_data_file():
+            sys.exit(1)
+        return
+    elif args.recover:
+        recover_data_file()
+        return
+    elif args.percentiles:
+        display_altitude_percentiles(args.percentiles)
+        return
+    elif args.trends is not None:
+        display_trends(args.trends, by_rocket=args.by_rocket, csv_path=args.csv)
+        return
+    elif args.group_by:
+        display_group_report(args.group_by, args.aggregates)
+        return
+    elif args.dedupe:
+        display_duplicates(near=args.dedupe == "near", merge=args.merge)
         return
     
     # If no command line arguments, start interactive mode
-    show_main_menu()
+    show_main_menu(cache_info=args.cache_info)
+    
+def show_main_menu(cache_info=False):
+    """
+    Display the main menu and handle user choices.
     
-def show_main_menu():
-    """Display the main menu and handle user choices."""
+    Args:
+        cache_info: Print the session's result cache counters on exit
+    """
+    global session
+    session = LogbookSession(data_manager)
+    try:
+        run_main_menu()
+    finally:
+        # Save pending changes on exit, including Ctrl+C
+        session.close()
+        if cache_info:
+            report_cache_info("Session result cache", session.result_cache)
+        session = None
+
+def run_main_menu():
+    """Show the main menu until the user exits."""
     while True:
         clear_screen()
         console.print(Panel.fit("[bold blue]Model Rocket Launch Logbook[/bold blue]", 
@@ -59,9 +281,11 @@ def show_main_menu():
         console.print("4. Delete Launch Record")
         console.print("5. Search/Filter Launch Records")
         console.print("6. Display Statistics")
+        console.print("7. Undo Last Change")
+        console.print("8. Top Launches")
         console.print("0. Exit")
         
-        choice = Prompt.ask("Enter your choice", choices=["0", "1", "2", "3", "4", "5", "6"])
+        choice = Prompt.ask("Enter your choice", choices=["0", "1", "2", "3", "4", "5", "6", "7", "8"])
         
         if choice == "1":
             add_launch_record()
@@ -74,7 +298,16 @@ def show_main_menu():
         elif choice == "5":
             search_menu()
         elif choice == "6":
+            # Statistics are read from the data file's sidecar
+            session.flush()
             display_statistics()
+        elif choice == "7":
+            session.flush()
+            undo_last_change()
+            session.reload()
+            input("\nPress Enter to continue...")
+        elif choice == "8":
+            top_launches_menu()
         elif choice == "0":
             console.print("[bold green]Thank you for using the Model Rocket Launch Logbook![/bold green]")
             sys.exit(0)
@@ -110,7 +343,7 @@ def add_launch_record():
         
         # Create and save the new record
         new_record = LaunchRecord(
-            id=data_manager.get_next_id(),
+            id=current_logbook().get_next_id(),
             date=date_str,
             rocket_name=rocket_name,
             motor_type=motor_type,
@@ -119,18 +352,49 @@ def add_launch_record():
             notes=notes
         )
         
-        data_manager.add_record(new_record)
-        console.print("[bold green]Launch record added successfully![/bold green]")
+        if not show_record_problems(new_record):
+            current_logbook().add_record(new_record)
+            console.print("[bold green]Launch record added successfully![/bold green]")
     
     except Exception as e:
         console.print(f"[bold red]Error adding launch record: {str(e)}[/bold red]")
     
     input("\nPress Enter to continue...")
 
-def list_all_launches():
-    """Display all launch records in a table."""
+def show_record_problems(record):
+    """
+    Validate a record entered at the prompts and print any problems.
+    
+    Returns:
+        bool: True if the record has problems and should not be saved
+    """
+    problems = check_record_fields(record.to_dict())
+    for field, message in problems:
+        console.print(f"[bold red]Invalid {field.replace('_', ' ')}: {message}[/bold red]")
+    return bool(problems)
+
+def list_all_launches(sort=None, reverse=False):
+    """
+    Display all launch records in a table.
+    
+    Args:
+        sort: Field to sort on, or None for the order they were logged in
+        reverse: Sort in descending order
+    """
     clear_screen()
-    records = data_manager.get_all_records()
+    if streaming():
+        records = data_manager.iter_records()
+        if sort:
+            records = external_sort(records, sort, reverse)
+        if not display_launch_chunks(records):
+            console.print("[bold yellow]No launch records found.[/bold yellow]")
+        input("\nPress Enter to continue...")
+        return
+    
+    if sort:
+        records = current_logbook().get_sorted_records(sort, reverse)
+    else:
+        records = current_logbook().get_all_records()
     
     if not records:
         console.print("[bold yellow]No launch records found.[/bold yellow]")
@@ -165,12 +429,255 @@ def display_launch_records(records):
     
     console.print(table)
 
+def display_launch_chunks(records):
+    """
+    Display streamed launch records as a series of tables.
+    
+    Only one table of records is held in memory at a time.
+    
+    Args:
+        records: Iterable of LaunchRecord objects, e.g. a generator
+        
+    Returns:
+        int: Number of records displayed
+    """
+    count = 0
+    try:
+        for chunk in chunks(records):
+            display_launch_records(chunk)
+            count += len(chunk)
+    except (json.JSONDecodeError, FileNotFoundError, EOFError):
+        # Like get_all_records, an unreadable file has no records
+        pass
+    return count
+
+def export_launches(path):
+    """Write all launch records to a file as a JSON array."""
+    if streaming():
+        records = data_manager.iter_records()
+    else:
+        records = current_logbook().get_all_records()
+    
+    count = 0
+    def rows():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record.to_dict()
+    
+    try:
+        with open(path, 'w') as f:
+            write_json_array(f, rows())
+    except (json.JSONDecodeError, FileNotFoundError, EOFError):
+        # An unreadable data file exports as no records
+        with open(path, 'w') as f:
+            write_json_array(f, [])
+        count = 0
+    except OSError as e:
+        console.print(f"[bold red]Cannot write {path}: {e}[/bold red]")
+        return
+    console.print(f"[bold green]Exported {count} launch records to {path}.[/bold green]")
+
+def write_report_file(path, fmt, title, page_size):
+    """
+    Stream a report of the whole logbook to a file.
+    
+    Args:
+        path: File to write
+        fmt: 'html' or 'md'
+        title: Title of the report
+        page_size: Launches per page of the launch list
+    """
+    # The faster codecs parse the whole file at once; the standard library
+    # one streams it, so memory use does not grow with the logbook
+    records = data_manager.iter_records(codec=get_codec('json'))
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            try:
+                count = write_report(records, f, fmt, title, page_size)
+            except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError, EOFError):
+                # Like get_all_records, an unreadable data file has no records
+                f.seek(0)
+                f.truncate()
+                count = write_report([], f, fmt, title, page_size)
+    except OSError as e:
+        console.print(f"[bold red]Cannot write {path}: {e}[/bold red]")
+        return
+    console.print(f"[bold green]Wrote a report of {count} launch records to {path}.[/bold green]")
+
+def set_memory_budget(budget):
+    """
+    Choose between in-memory and streaming commands for a memory budget.
+    
+    The peak memory of the process is reported when it exits.
+    
+    Args:
+        budget: Memory budget in bytes
+    """
+    global memory_budget, low_memory
+    memory_budget = budget
+    low_memory = estimate_memory(data_manager) > budget
+    if low_memory:
+        # The faster codecs parse the whole file at once; the standard
+        # library one streams it
+        data_manager.codec = get_codec('json')
+    atexit.register(report_peak_memory)
+
+def report_peak_memory():
+    """Print the peak memory of the process against the memory budget."""
+    peak = peak_memory()
+    if peak is None:
+        return
+    mode = "streaming" if low_memory else "in-memory"
+    colour = "green" if peak <= memory_budget else "yellow"
+    console.print(f"[{colour}]Peak memory: {format_size(peak)} of {format_size(memory_budget)} budget "
+                  f"({mode} mode)[/{colour}]")
+
+def report_cache_info(label, cache):
+    """
+    Print the counters of a result cache.
+    
+    Args:
+        label: Name of the cache shown before its counters
+        cache: ResultCache to describe
+    """
+    info = cache.info()
+    if not info['enabled'] or not info['maxsize']:
+        console.print(f"[dim]{label}: disabled[/dim]")
+        return
+    console.print(f"[dim]{label}: {info['hits']} hits, {info['misses']} misses "
+                  f"({info['hit_rate']:.0%} hit rate), {info['size']} of {info['maxsize']} entries[/dim]")
+
+def list_federated_launches(paths, search_term=None, workers=None, use_processes=False):
+    """
+    List or search launches across several logbooks.
+    
+    Args:
+        paths: Data files or directories of data files
+        search_term: Term to search for, or None to list every launch
+        workers: Maximum number of logbooks queried concurrently
+        use_processes: Query the logbooks in worker processes instead of threads
+    """
+    result = federated_query(paths, search_term, workers=workers, use_processes=use_processes)
+    
+    for path, error in result.errors:
+        console.print(f"[bold red]Could not read {path}: {error}[/bold red]")
+    
+    if not result.rows:
+        console.print("[bold yellow]No launch records found.[/bold yellow]")
+        return
+    
+    console.print(f"[bold green]Found {len(result.rows)} records in "
+                  f"{len(result.files) - len(result.errors)} logbooks:[/bold green]")
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Logbook", style="cyan")
+    table.add_column("ID", style="dim")
+    table.add_column("Date")
+    table.add_column("Rocket Name")
+    table.add_column("Motor Type")
+    table.add_column("Altitude (m)")
+    table.add_column("Success")
+    
+    for path, record in result.rows:
+        table.add_row(
+            os.path.basename(path),
+            str(record.id),
+            format_date_for_display(record.date),
+            record.rocket_name,
+            record.motor_type,
+            str(record.altitude),
+            "[green]Yes[/green]" if record.success else "[red]No[/red]"
+        )
+    
+    console.print(table)
+
+def run_batch_file(path):
+    """Run a batch file against the logbook, exiting with status 1 if a command failed."""
+    if path == "-":
+        failures = run_batch(data_manager, sys.stdin, sys.stdout)
+    else:
+        try:
+            with open(path, 'r') as f:
+                failures = run_batch(data_manager, f, sys.stdout)
+        except OSError as e:
+            console.print(f"[bold red]Cannot read batch file: {e}[/bold red]")
+            sys.exit(1)
+    if failures:
+        sys.exit(1)
+
+def print_changes(consumer_name):
+    """Print the pending changes of a feed consumer as JSON Lines and acknowledge them."""
+    try:
+        consumer = data_manager.get_feed_consumer(consumer_name)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+    
+    for change in consumer.poll():
+        sys.stdout.write(json.dumps(change) + "\n")
+    sys.stdout.flush()
+    # Only move on once everything has been written out
+    consumer.ack()
+
+def sync_data_files(path_a, path_b, prefer=None):
+    """
+    Two-way synchronize two logbook data files and report the outcome.
+    
+    Args:
+        path_a: Data file of the first logbook
+        path_b: Data file of the second logbook
+        prefer: 'a' or 'b' to resolve conflicts in favour of that logbook
+    """
+    for path in (path_a, path_b):
+        if not os.path.isfile(path):
+            console.print(f"[bold red]Data file not found: {path}[/bold red]")
+            return
+    
+    try:
+        report = sync_logbooks(DataManager(path_a), DataManager(path_b), prefer=prefer)
+    except DataFileDamagedError as e:
+        # Syncing would treat the unreadable records as deleted
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        console.print("Run 'rocket-logbook --data-file FILE --recover' on it, then sync again.")
+        sys.exit(1)
+    
+    if not report.changed and not report.conflicts:
+        console.print("[bold green]Logbooks are already in sync.[/bold green]")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Change")
+    table.add_column("Records", justify="right")
+    table.add_column("IDs")
+    rows = [
+        (f"Copied to {path_a}", report.copied_to_a),
+        (f"Copied to {path_b}", report.copied_to_b),
+        (f"Deleted from {path_a}", report.deleted_from_a),
+        (f"Deleted from {path_b}", report.deleted_from_b)
+    ]
+    for label, ids in rows:
+        if ids:
+            table.add_row(label, str(len(ids)), ", ".join(str(record_id) for record_id in ids))
+    if table.row_count:
+        console.print(table)
+    
+    for old_id, new_id in report.remapped:
+        console.print(f"[bold yellow]Record {old_id} was created in both logbooks; "
+                      f"the one from {path_b} is now record {new_id}[/bold yellow]")
+    
+    if report.conflicts:
+        resolution = f"kept the version from {path_a if prefer == 'a' else path_b}" if prefer else "left unchanged"
+        console.print(f"[bold red]{len(report.conflicts)} conflicts ({resolution}):[/bold red]")
+        for record_id, reason in report.conflicts:
+            console.print(f"  Record {record_id}: {reason}")
+
 def edit_launch_record():
     """Edit an existing launch record."""
     clear_screen()
     console.print(Panel("[bold]Edit Launch Record[/bold]", border_style="yellow"))
     
-    records = data_manager.get_all_records()
+    records = current_logbook().get_all_records()
     if not records:
         console.print("[bold yellow]No launch records found to edit.[/bold yellow]")
         input("\nPress Enter to continue...")
@@ -180,7 +687,7 @@ def edit_launch_record():
     
     try:
         record_id = int(Prompt.ask("Enter ID of the record to edit"))
-        record = data_manager.get_record_by_id(record_id)
+        record = current_logbook().get_record_by_id(record_id)
         
         if not record:
             console.print(f"[bold red]No record found with ID {record_id}[/bold red]")
@@ -219,8 +726,9 @@ def edit_launch_record():
             notes=notes
         )
         
-        data_manager.update_record(updated_record)
-        console.print("[bold green]Launch record updated successfully![/bold green]")
+        if not show_record_problems(updated_record):
+            current_logbook().update_record(updated_record)
+            console.print("[bold green]Launch record updated successfully![/bold green]")
         
     except ValueError:
         console.print("[bold red]Please enter a valid ID number[/bold red]")
@@ -234,7 +742,7 @@ def delete_launch_record():
     clear_screen()
     console.print(Panel("[bold]Delete Launch Record[/bold]", border_style="red"))
     
-    records = data_manager.get_all_records()
+    records = current_logbook().get_all_records()
     if not records:
         console.print("[bold yellow]No launch records found to delete.[/bold yellow]")
         input("\nPress Enter to continue...")
@@ -244,7 +752,7 @@ def delete_launch_record():
     
     try:
         record_id = int(Prompt.ask("Enter ID of the record to delete"))
-        record = data_manager.get_record_by_id(record_id)
+        record = current_logbook().get_record_by_id(record_id)
         
         if not record:
             console.print(f"[bold red]No record found with ID {record_id}[/bold red]")
@@ -258,7 +766,7 @@ def delete_launch_record():
         
         confirm = Confirm.ask("Are you sure you want to delete this record?")
         if confirm:
-            data_manager.delete_record(record_id)
+            current_logbook().delete_record(record_id)
             console.print("[bold green]Launch record deleted successfully![/bold green]")
         else:
             console.print("Deletion cancelled.")
@@ -301,14 +809,51 @@ def rocket_type_search():
     console.print(Panel("[bold]Search by Rocket Type[/bold]", border_style="blue"))
     
     rocket_type = Prompt.ask("Enter rocket type or name")
-    search_launches(rocket_type)
+    search_launches(rocket_type, fuzzy_fallback=True)
 
-def search_launches(search_term):
-    """Search for launches by date or rocket type."""
+def search_launches(search_term, fuzzy=False, fuzzy_fallback=False, sort=None, reverse=False):
+    """
+    Search for launches by date or rocket type.
+    
+    Args:
+        search_term: Term to search for
+        fuzzy: Match rocket names and motor types allowing for typos
+        fuzzy_fallback: Fall back to a fuzzy search if nothing matches exactly
+        sort: Field to sort the results on, or None to keep their order
+        reverse: Sort in descending order
+    """
     clear_screen()
     console.print(Panel(f"[bold]Search Results for: {search_term}[/bold]", border_style="blue"))
     
-    records = data_manager.search_records(search_term)
+    if streaming() and not fuzzy:
+        # Count the matches first, then stream them again into the tables
+        try:
+            count = sum(1 for _record in data_manager.iter_search_records(search_term))
+        except (json.JSONDecodeError, FileNotFoundError, EOFError):
+            count = 0
+        if count or not fuzzy_fallback:
+            if not count:
+                console.print(f"[bold yellow]No records found matching '{search_term}'.[/bold yellow]")
+            else:
+                console.print(f"[bold green]Found {count} matching records:[/bold green]")
+                records = data_manager.iter_search_records(search_term)
+                display_launch_chunks(external_sort(records, sort, reverse) if sort else records)
+            input("\nPress Enter to continue...")
+            return
+    
+    records = [] if fuzzy else current_logbook().search_records(search_term)
+    
+    if not records and (fuzzy or fuzzy_fallback):
+        matches = current_logbook().get_fuzzy_index().search(search_term)
+        if matches:
+            if not fuzzy:
+                console.print(f"[bold yellow]No exact matches for '{search_term}'.[/bold yellow]")
+            names = ", ".join(value for value, _distance in matches)
+            console.print(f"[bold]Closest matches:[/bold] {names}")
+            records = current_logbook().fuzzy_search_records(search_term)
+    
+    if sort:
+        records = sort_records(records, sort, reverse)
     
     if not records:
         console.print(f"[bold yellow]No records found matching '{search_term}'.[/bold yellow]")
@@ -318,20 +863,63 @@ def search_launches(search_term):
     
     input("\nPress Enter to continue...")
 
-def display_statistics():
+def top_launches_menu():
+    """Ask which launches to rank and display them."""
+    clear_screen()
+    console.print(Panel("[bold]Top Launches[/bold]", border_style="blue"))
+    
+    field = Prompt.ask("Rank by", choices=["altitude", "date"], default="altitude")
+    per = Prompt.ask("Per", choices=["all", "rocket", "motor"], default="all")
+    count = Prompt.ask("How many" + (" per group" if per != "all" else ""), default="10" if per == "all" else "1")
+    try:
+        count = int(count)
+    except ValueError:
+        console.print("[bold red]Please enter a valid number[/bold red]")
+        input("\nPress Enter to continue...")
+        return
+    
+    display_top_launches(count, field, None if per == "all" else per)
+
+def display_top_launches(count, field="altitude", per=None, smallest=False):
+    """
+    Display the launches with the highest (or lowest) values of a field.
+    
+    Args:
+        count: Number of launches, per group if per is given
+        field: Field to rank on, e.g. 'altitude' or 'date' (latest first)
+        per: 'rocket' or 'motor' to rank the launches of each group separately
+        smallest: Rank the lowest values first instead
+    """
+    clear_screen()
+    order = "lowest" if smallest else "highest"
+    group = f" per {per}" if per else ""
+    console.print(Panel(f"[bold]Top {count} launches{group} by {field} ({order} first)[/bold]", border_style="blue"))
+    
+    result = current_logbook().get_top_records(count, field, smallest=smallest, per=per)
+    # Groups are listed one after another, each best first
+    records = [record for records in result.values() for record in records] if per else result
+    
+    if not records:
+        console.print("[bold yellow]No launch records found.[/bold yellow]")
+    else:
+        display_launch_records(records)
+    
+    input("\nPress Enter to continue...")
+
+def display_statistics(verify_hash=False):
     """Display statistics about the launch records."""
     clear_screen()
     console.print(Panel("[bold]Launch Statistics[/bold]", border_style="green"))
     
-    records = data_manager.get_all_records()
+    # Served from the statistics sidecar when the data file is unchanged
+    snapshot = data_manager.get_statistics_snapshot(verify_hash=verify_hash)
+    stats = snapshot['statistics']
     
-    if not records:
+    if not stats['total_launches']:
         console.print("[bold yellow]No launch records found for statistics.[/bold yellow]")
         input("\nPress Enter to continue...")
         return
     
-    stats = calculate_statistics(records)
-    
     # Create a new table for statistics
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("Statistic")
@@ -351,8 +939,305 @@ def display_statistics():
     
     console.print(table)
     
+    table = Table(show_header=True, header_style="bold magenta", title="Altitude by Impulse Class")
+    table.add_column("Impulse Class")
+    for name in ("Launches", "Mean", "Min", "Max"):
+        table.add_column(name, justify="right")
+    for impulse_class, values in sorted(snapshot['impulse_class_altitudes'],
+                                        key=lambda pair: impulse_class_rank(pair[0])):
+        table.add_row("Unknown" if impulse_class is None else impulse_class, str(values['count']),
+                      f"{values['mean']:.2f}", f"{values['min']:.2f}", f"{values['max']:.2f}")
+    console.print(table)
+    
+    table = Table(show_header=True, header_style="bold magenta", title="Success Rate by Ejection Delay")
+    table.add_column("Delay")
+    table.add_column("Success Rate", justify="right")
+    for delay, rate in sorted(snapshot['delay_success_rates'], key=lambda pair: _group_sort_key(pair[0])):
+        table.add_row("Plugged or unknown" if delay is None else f"{delay} s", f"{rate:.2f}%")
+    console.print(table)
+    
     input("\nPress Enter to continue...")
 
+def _group_sort_key(group_key):
+    """Sort key for group keys that may mix values with None (unknown)."""
+    cells = group_key if isinstance(group_key, tuple) else (group_key,)
+    return tuple((1, 0) if cell is None else (0, cell) for cell in cells)
+
+def display_group_report(keys, aggregates):
+    """Display aggregates grouped by the given keys in a table."""
+    try:
+        keys = parse_group_keys(keys)
+        aggregates = [name.strip() for name in aggregates.split(",") if name.strip()]
+        if streaming():
+            aggregates = check_aggregates(aggregates)
+            try:
+                groups = spilling_group_by(lambda: data_manager.iter_views(STATS_FIELDS), keys, STATS_FIELDS,
+                                           group_limit(memory_budget))
+            except (json.JSONDecodeError, FileNotFoundError, EOFError):
+                groups = {}
+            groups = {key: aggregate.result(aggregates) for key, aggregate in groups.items()}
+        else:
+            groups = group_by(data_manager.get_views(STATS_FIELDS), keys, aggregates)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return
+    
+    if not groups:
+        console.print("[bold yellow]No launch records found for statistics.[/bold yellow]")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta",
+                  title=f"Launches grouped by {', '.join(keys) or 'all'}")
+    for key in keys:
+        table.add_column(key.replace("_", " ").capitalize())
+    for name in aggregates:
+        table.add_column(name.replace("_", " ").capitalize(), justify="right")
+    
+    for group_key in sorted(groups, key=_group_sort_key):
+        values = groups[group_key]
+        key_cells = list(group_key) if isinstance(group_key, tuple) else [group_key]
+        key_cells = ["Unknown" if cell is None else cell for cell in key_cells]
+        value_cells = []
+        for name in aggregates:
+            if name == "count":
+                value_cells.append(str(values[name]))
+            elif name == "success_rate":
+                value_cells.append(f"{values[name]:.2f}%")
+            else:
+                value_cells.append(f"{values[name]:.2f}")
+        table.add_row(*[str(cell) for cell in key_cells], *value_cells)
+    
+    console.print(table)
+
+def display_trends(window_days, by_rocket=False, csv_path=None):
+    """
+    Display or export rolling-window trends for each launch date.
+    
+    Args:
+        window_days: Length of the rolling window in days
+        by_rocket: Report each rocket instead of all launches
+        csv_path: File to write the trends to as CSV ('-' for standard
+            output) instead of displaying a table
+    """
+    try:
+        engine = compute_trends(data_manager.get_views(TREND_FIELDS), window_days)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return
+    points = engine.rocket_points if by_rocket else engine.points
+    columns = ROCKET_TREND_COLUMNS if by_rocket else TREND_COLUMNS
+    
+    if csv_path:
+        if csv_path == "-":
+            write_trends_csv(sys.stdout, points, columns)
+            return
+        try:
+            with open(csv_path, 'w', newline='') as f:
+                write_trends_csv(f, points, columns)
+        except OSError as e:
+            console.print(f"[bold red]Cannot write {csv_path}: {e}[/bold red]")
+            return
+        console.print(f"[bold green]Wrote {len(points)} trend points to {csv_path}.[/bold green]")
+        return
+    
+    if not points:
+        console.print("[bold yellow]No launch records found for statistics.[/bold yellow]")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta",
+                  title=f"Trends over {window_days}-day windows" + (" per rocket" if by_rocket else ""))
+    table.add_column("Date")
+    if by_rocket:
+        table.add_column("Rocket Name")
+    table.add_column("Launches", justify="right")
+    if not by_rocket:
+        table.add_column("Per Week", justify="right")
+    table.add_column("Success Rate", justify="right")
+    table.add_column("Mean Altitude (m)", justify="right")
+    
+    for point in points:
+        cells = [format_date_for_display(point['date'])]
+        if by_rocket:
+            cells.append(point['rocket'])
+        cells.append(str(point['launches']))
+        if not by_rocket:
+            cells.append(f"{point['launches_per_week']:.2f}")
+        cells.append(f"{point['success_rate']:.2f}%")
+        cells.append(f"{point['mean_altitude']:.2f}")
+        table.add_row(*cells)
+    
+    console.print(table)
+
+def display_validation_report():
+    """Validate the whole logbook and display the problems found."""
+    try:
+        report = data_manager.validate()
+    except json.JSONDecodeError as e:
+        console.print(f"[bold red]The data file is not valid JSON: {str(e)}[/bold red]")
+        return
+    
+    if report.ok:
+        console.print(f"[bold green]All {report.checked} records are valid.[/bold green]")
+        return
+    
+    console.print(f"[bold yellow]{report.rejected} of {report.checked} records have problems "
+                  f"and are skipped when loading:[/bold yellow]")
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Row", justify="right")
+    table.add_column("ID", style="dim")
+    table.add_column("Field")
+    table.add_column("Problem")
+    for issue in report.issues:
+        table.add_row(
+            str(issue.index),
+            "" if issue.record_id is None else str(issue.record_id),
+            issue.field or "",
+            issue.message
+        )
+    console.print(table)
+
+def verify_data_file():
+    """
+    Check the data file for damage and display the result.
+    
+    Returns:
+        bool: True if no damage was found
+    """
+    report = data_manager.verify()
+    if report.ok:
+        method = f"{report.blocks} block checksum{'s' if report.blocks != 1 else ''}" if report.checksums else "a full read (no checksums)"
+        console.print(f"[bold green]The data file is intact: {report.records} records checked "
+                      f"with {method}.[/bold green]")
+        return True
+    
+    console.print("[bold red]The data file is damaged or was edited externally.[/bold red]")
+    if report.bad_blocks:
+        console.print(f"{len(report.bad_blocks)} of {report.blocks} blocks do not match their checksums "
+                      f"(blocks {', '.join(str(index) for index in report.bad_blocks)}); "
+                      f"{report.records} records are in intact blocks.")
+    for problem in report.problems:
+        console.print(problem)
+    console.print("Run 'rocket-logbook --recover' to salvage the records.")
+    return False
+
+def recover_data_file():
+    """Salvage the records of a damaged data file and report the outcome."""
+    result = data_manager.recover()
+    console.print(f"[bold green]Recovered {result['recovered']} records, {result['salvaged']} of them "
+                  f"from damaged parts of the file.[/bold green]")
+    if result['rejected']:
+        console.print(f"[bold yellow]{result['rejected']} recovered rows have problems and are kept "
+                      f"but skipped when loading; see --validate.[/bold yellow]")
+    console.print(f"The damaged file was kept as {result['backup']}.")
+
+def display_duplicates(near=False, merge=False):
+    """
+    Display groups of duplicate launches and optionally merge them.
+    
+    Args:
+        near: Also report near-duplicates
+        merge: Merge every reported group in one write; near-duplicate
+            groups are only merged after confirmation
+    """
+    groups = data_manager.find_duplicates(near=near)
+    if not groups:
+        console.print("[bold green]No duplicate launches found.[/bold green]")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Kind")
+    table.add_column("Keep", style="dim")
+    table.add_column("Duplicates", style="dim")
+    table.add_column("Date")
+    table.add_column("Rocket Name")
+    table.add_column("Motor Type")
+    table.add_column("Altitude (m)")
+    for group in groups:
+        keeper = group.keeper
+        table.add_row(
+            "Exact" if group.kind == 'exact' else "[yellow]Near[/yellow]",
+            str(keeper.id),
+            ", ".join(str(record.id) for record in group.duplicates),
+            format_date_for_display(keeper.date),
+            keeper.rocket_name,
+            ", ".join(dict.fromkeys(record.motor_type for record in group.records)),
+            ", ".join(dict.fromkeys(str(record.altitude) for record in group.records))
+        )
+    
+    duplicates = sum(len(group.duplicates) for group in groups)
+    console.print(f"[bold yellow]Found {len(groups)} groups with {duplicates} duplicate records:[/bold yellow]")
+    console.print(table)
+    
+    if merge:
+        near_groups = sum(1 for group in groups if group.kind == 'near')
+        if near_groups:
+            try:
+                confirmed = Confirm.ask(f"Also merge the {near_groups} near-duplicate groups? "
+                                        f"They may be separate launches")
+            except EOFError:
+                confirmed = False
+            if not confirmed:
+                groups = [group for group in groups if group.kind == 'exact']
+                console.print("[yellow]Near-duplicate groups were left unchanged.[/yellow]")
+        if not groups:
+            return
+        removed = data_manager.merge_duplicates(groups)
+        console.print(f"[bold green]Merged duplicates; removed {removed} records.[/bold green]")
+    else:
+        console.print("Run again with --merge to keep the first record of each group and remove the others.")
+
+def list_launches_as_of(when):
+    """Display the launch records as they were at a past point in time."""
+    timestamp = parse_timestamp(when)
+    if timestamp is None:
+        console.print("[bold red]Invalid time. Please use YYYY-MM-DD or YYYY-MM-DDTHH:MM.[/bold red]")
+        return
+    
+    records = data_manager.as_of(timestamp)
+    if records is None:
+        console.print(f"[bold yellow]The logbook history does not go back to {when}.[/bold yellow]")
+        return
+    
+    console.print(Panel(f"[bold]Launch Records as of {when}[/bold]", border_style="blue"))
+    if not records:
+        console.print("[bold yellow]No launch records found.[/bold yellow]")
+    else:
+        display_launch_records(records)
+
+def undo_last_change():
+    """Undo the most recent change to the logbook."""
+    event = data_manager.undo()
+    if event is None:
+        console.print("[bold yellow]Nothing to undo.[/bold yellow]")
+        return
+    
+    count = len(event['changes'])
+    noun = "record" if count == 1 else "records"
+    console.print(f"[bold green]Undid {event['op']} of {count} {noun}.[/bold green]")
+
+def display_altitude_percentiles(group):
+    """Display estimated altitude percentiles overall and per rocket or motor."""
+    sketches = data_manager.get_altitude_sketches()
+    if not sketches['all'].count:
+        console.print("[bold yellow]No launch records found for statistics.[/bold yellow]")
+        return
+    
+    quantiles = [0.5, 0.9, 0.95, 0.99]
+    table = Table(show_header=True, header_style="bold magenta",
+                  title=f"Altitude percentiles by {group} (meters, rank error under {DEFAULT_RANK_ERROR:.1%})")
+    table.add_column(group.capitalize())
+    table.add_column("Launches", justify="right")
+    for q in quantiles:
+        table.add_column(f"P{int(q * 100)}", justify="right")
+    
+    rows = sorted(sketches[group].items())
+    rows.append(("All launches", sketches['all']))
+    for name, sketch in rows:
+        values = sketch.quantiles(quantiles)
+        table.add_row(name, str(sketch.count), *[f"{value:.2f}" for value in values])
+    
+    console.print(table)
+
 if __name__ == "__main__":
     try:
         main()
@@ -1,3 +1,10 @@
+from collections import namedtuple
+from functools import lru_cache
+from rocket_logbook.motors import parse_motor_designation
+
+# Fields of a launch record, in file order
+RECORD_FIELDS = ('id', 'date', 'rocket_name', 'motor_type', 'altitude', 'success', 'notes')
+
 class LaunchRecord:
     """Model class representing a single rocket launch record."""
     
@@ -20,26 +27,112 @@ class LaunchRecord:
         self.motor_type = motor_type
         self.altitude = altitude
         self.success = success
-        self.notes = notes
+        self._notes = notes
+        # (blob, ref) while the notes are stored out of line and unchanged
+        self._notes_source = None
     
-    def to_dict(self):
+    @property
+    def notes(self):
+        """Additional notes, read from the notes blob on first access if stored out of line."""
+        if self._notes is None:
+            blob, ref = self._notes_source
+            self._notes = blob.read(ref)
+        return self._notes
+    
+    @notes.setter
+    def notes(self, value):
+        """Set the notes; the record no longer refers to stored notes."""
+        self._notes = value
+        self._notes_source = None
+    
+    def set_notes_source(self, blob, ref):
+        """
+        Refer to notes stored out of line instead of holding them.
+        
+        Args:
+            blob: NotesBlob holding the notes
+            ref: [generation, offset, length] reference into the blob
+        """
+        self._notes = None
+        self._notes_source = (blob, ref)
+    
+    def get_notes_ref(self, blob):
+        """
+        Get the reference of the notes if they are stored unchanged in a blob.
+        
+        Args:
+            blob: NotesBlob the notes are expected in
+            
+        Returns:
+            list: [generation, offset, length], or None if the notes are
+                held in memory or belong to another blob
+        """
+        if self._notes_source is not None and self._notes_source[0] is blob:
+            return self._notes_source[1]
+        return None
+    
+    @property
+    def motor(self):
+        """
+        Structured fields parsed from the motor type.
+        
+        Returns:
+            MotorDesignation: Parsed designation, shared by all records with the same motor type
+        """
+        return parse_motor_designation(self.motor_type)
+    
+    def to_dict(self, include_notes=True):
         """
         Convert the launch record to a dictionary for JSON serialization.
         
+        Args:
+            include_notes: Include the notes; leaving them out avoids reading
+                notes that are stored out of line
+        
         Returns:
             dict: Dictionary representation of the launch record
         """
-        return {
+        data = {
             'id': self.id,
             'date': self.date,
             'rocket_name': self.rocket_name,
             'motor_type': self.motor_type,
             'altitude': self.altitude,
-            'success': self.success,
-            'notes': self.notes
+            'success': self.success
         }
+        if include_notes:
+            data['notes'] = self.notes
+        return data
     
     def __str__(self):
         """Return a string representation of the launch record."""
         status = "Successful" if self.success else "Failed"
-        return f"Launch {self.id}: {self.date} - {self.rocket_name} ({status})"
\ No newline at end of file
+        return f"Launch {self.id}: {self.date} - {self.rocket_name} ({status})"
+
+@lru_cache(maxsize=None)
+def record_view_type(fields):
+    """
+    Get a lightweight read-only record type holding only some fields.
+    
+    Views are named tuples, so they cost far less to build and keep than a
+    LaunchRecord and hold no reference to the fields left out, typically
+    the notes. A view that includes motor_type also has the motor property.
+    
+    Args:
+        fields: Tuple of field names from RECORD_FIELDS
+        
+    Returns:
+        type: Named tuple class with those fields, shared by all callers
+        
+    Raises:
+        ValueError: If a field name is not a record field
+    """
+    unknown = [field for field in fields if field not in RECORD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown record fields: {', '.join(unknown)}")
+    
+    base = namedtuple('RecordView', fields)
+    namespace = {'__slots__': ()}
+    if 'motor_type' in fields:
+        namespace['motor'] = LaunchRecord.motor
+    return type('RecordView', (base,), namespace)
@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+
+# Matches designations such as "C6-5", "F10-4", "1/2A6-2", "D12-P" or "G80-7T".
+# Optional fractional prefix, impulse class letter, average thrust in newtons,
+# propellant letters, then an optional delay in seconds ("P" means plugged,
+# other letters are non-numeric delay codes such as "M" for medium).
+MOTOR_PATTERN = re.compile(
+    r'^(?P<fraction>1/[248])?(?P<letter>[A-O])(?P<thrust>\d+(?:\.\d+)?)[A-Z]*'
+    r'(?:-(?P<delay>\d+|[A-Z]+)[A-Z]*)?$'
+)
+
+class MotorDesignation:
+    """Structured fields parsed from a motor designation string."""
+
+    __slots__ = ('designation', 'impulse_class', 'average_thrust', 'delay', 'plugged', 'valid')
+
+    def __init__(self, designation, impulse_class=None, average_thrust=None, delay=None,
+                 plugged=False, valid=False):
+        """
+        Initialize a parsed motor designation.
+
+        Args:
+            designation (str): The original motor type string
+            impulse_class (str): Impulse class, e.g. "C" or "1/2A"
+            average_thrust (float): Average thrust in newtons
+            delay (int): Ejection delay in seconds, None if plugged, coded or not given
+            plugged (bool): Whether the motor is a plugged (no ejection) motor
+            valid (bool): Whether the designation could be parsed
+        """
+        self.designation = designation
+        self.impulse_class = impulse_class
+        self.average_thrust = average_thrust
+        self.delay = delay
+        self.plugged = plugged
+        self.valid = valid
+
+    def __repr__(self):
+        """Return a representation of the parsed designation."""
+        if not self.valid:
+            return f"MotorDesignation({self.designation!r}, valid=False)"
+        return (f"MotorDesignation({self.designation!r}, impulse_class={self.impulse_class!r}, "
+                f"average_thrust={self.average_thrust!r}, delay={self.delay!r})")
+
+@lru_cache(maxsize=None)
+def parse_motor_designation(motor_type):
+    """
+    Parse a motor designation string into its structured fields.
+
+    Results are cached per distinct string, so a logbook pays for parsing
+    once per motor it uses rather than once per record or per query.
+
+    Args:
+        motor_type: Motor type string, e.g. "C6-5"
+
+    Returns:
+        MotorDesignation: Parsed designation; valid is False if unparseable
+    """
+    if not isinstance(motor_type, str):
+        return MotorDesignation(motor_type)
+
+    normalized = re.sub(r'\s+', '', motor_type).upper()
+    match = MOTOR_PATTERN.match(normalized)
+    if not match:
+        return MotorDesignation(motor_type)
+
+    impulse_class = (match.group('fraction') or '') + match.group('letter')
+    thrust = float(match.group('thrust'))
+    delay = match.group('delay')
+
+    return MotorDesignation(
+        motor_type,
+        impulse_class=impulse_class,
+        average_thrust=thrust,
+        delay=int(delay) if delay and delay.isdigit() else None,
+        plugged=delay == 'P',
+        valid=True
+    )
+
+def impulse_class_rank(impulse_class):
+    """
+    Sort key ordering impulse classes by total impulse.
+
+    Each class has twice the impulse of the one before it, so 1/4A < 1/2A
+    < A < B. Unknown classes (None) sort last.
+
+    Args:
+        impulse_class: Impulse class, e.g. "C" or "1/2A", or None
+
+    Returns:
+        tuple: Key for sorted()
+    """
+    if impulse_class is None:
+        return (1, 0)
+    fraction, letter = impulse_class[:-1], impulse_class[-1]
+    halvings = int(fraction[2:]).bit_length() - 1 if fraction else 0
+    return (0, ord(letter) - ord('A') - halvings)
@@ -0,0 +1,170 @@
+import heapq
+from bisect import bisect_left, insort
+
+# Record fields launches can be sorted and ranked by
+SORT_FIELDS = ('id', 'date', 'rocket_name', 'motor_type', 'altitude', 'success')
+
+# Fields the interactive session keeps sorted indexes for
+INDEXED_FIELDS = ('date', 'altitude')
+
+# Groupings for top-N per group, mapped to the record field grouped on
+TOP_PER_KEYS = {'rocket': 'rocket_name', 'motor': 'motor_type'}
+
+def sort_key(field):
+    """
+    Get a sort key for records on a field, with ties broken by ID.
+
+    Args:
+        field: Name of a field in SORT_FIELDS
+
+    Returns:
+        Function mapping a record to a (value, id) tuple
+
+    Raises:
+        ValueError: If the field cannot be sorted on
+    """
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort on '{field}', expected one of {', '.join(SORT_FIELDS)}")
+    return lambda record: (getattr(record, field), record.id)
+
+def sort_records(records, field, reverse=False):
+    """
+    Sort records on a field.
+
+    Args:
+        records: Iterable of LaunchRecord objects
+        field: Name of a field in SORT_FIELDS
+        reverse: Sort in descending order
+
+    Returns:
+        list: Sorted records
+    """
+    return sorted(records, key=sort_key(field), reverse=reverse)
+
+def top_records(records, n, field='altitude', smallest=False):
+    """
+    Select the n records with the largest (or smallest) values of a field.
+
+    A heap of n records is kept while the records stream past, so this
+    costs O(N log n) and holds only n records, instead of a full sort.
+
+    Args:
+        records: Iterable of LaunchRecord objects, e.g. a generator
+        n: Number of records to select
+        field: Name of a field in SORT_FIELDS
+        smallest: Select the smallest values instead
+
+    Returns:
+        list: Selected records, best first
+    """
+    select = heapq.nsmallest if smallest else heapq.nlargest
+    return select(n, records, key=sort_key(field))
+
+class _Descending:
+    """Sort key wrapper inverting the order, so a min-heap can keep the smallest values."""
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+def top_records_per_group(records, n, field='altitude', per='rocket', smallest=False):
+    """
+    Select the n best records of each rocket or motor in one pass.
+
+    Each group keeps its own heap of at most n entries, so this costs
+    O(N log n) and holds n records per group.
+
+    Args:
+        records: Iterable of LaunchRecord objects, e.g. a generator
+        n: Number of records to select per group
+        field: Name of a field in SORT_FIELDS
+        per: 'rocket' or 'motor'
+        smallest: Select the smallest values instead
+
+    Returns:
+        dict: Group value to its selected records, best first, with the
+            groups in alphabetical order
+
+    Raises:
+        ValueError: If the grouping is unknown
+    """
+    if per not in TOP_PER_KEYS:
+        raise ValueError(f"Unknown grouping '{per}', expected one of {', '.join(TOP_PER_KEYS)}")
+    if n <= 0:
+        return {}
+    group_field = TOP_PER_KEYS[per]
+    key = sort_key(field)
+    wrap = _Descending if smallest else (lambda value: value)
+
+    # Min-heaps of (key, record) whose root is the worst record kept; keys
+    # end in the unique ID, so records themselves are never compared
+    heaps = {}
+    for record in records:
+        entry = (wrap(key(record)), record)
+        heap = heaps.setdefault(getattr(record, group_field), [])
+        if len(heap) < n:
+            heapq.heappush(heap, entry)
+        elif heap[0] < entry:
+            heapq.heapreplace(heap, entry)
+
+    return {group: [record for _key, record in sorted(heaps[group], reverse=True)]
+            for group in sorted(heaps)}
+
+class SortedIndex:
+    """
+    Record IDs kept sorted on one field, updated in place as records change.
+
+    Building the index sorts once; each later addition or removal is a
+    binary search plus a list insertion or deletion, so a sorted listing or
+    a top-N never needs a full sort again.
+    """
+
+    def __init__(self, field, records=()):
+        """
+        Build the index.
+
+        Args:
+            field: Name of the field to sort on
+            records: Iterable of LaunchRecord objects to index
+        """
+        self.field = field
+        self._entries = sorted((getattr(record, field), record.id) for record in records)
+
+    def __len__(self):
+        """Number of indexed records."""
+        return len(self._entries)
+
+    def add(self, record):
+        """Index a record; it must not be indexed already."""
+        insort(self._entries, (getattr(record, self.field), record.id))
+
+    def remove(self, record):
+        """Remove a record as it was indexed; unknown records are ignored."""
+        entry = (getattr(record, self.field), record.id)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def ids(self, reverse=False, limit=None):
+        """
+        Get record IDs in order of the field.
+
+        Args:
+            reverse: Descending order, largest values first
+            limit: Return at most this many IDs
+
+        Returns:
+            list: Record IDs
+        """
+        entries = self._entries
+        if limit is not None:
+            if limit <= 0:
+                return []
+            entries = entries[-limit:] if reverse else entries[:limit]
+        if reverse:
+            entries = reversed(entries)
+        return [record_id for _value, record_id in entries]
@@ -0,0 +1,296 @@
+import html
+import shutil
+import tempfile
+from datetime import datetime
+from rocket_logbook.stats import summarize_records
+from rocket_logbook.utils import format_date_for_display
+
+# Output formats of write_report
+REPORT_FORMATS = ('html', 'md')
+
+# Launches per page of the launch list
+REPORT_PAGE_SIZE = 100
+
+# Rows of the summary table: (label, statistics key, value format)
+SUMMARY_ROWS = (
+    ("Total Launches", 'total_launches', "{}"),
+    ("Successful Launches", 'successful_launches', "{}"),
+    ("Failed Launches", 'failed_launches', "{}"),
+    ("Success Rate", 'success_rate', "{:.2f}%"),
+    ("Average Altitude", 'avg_altitude', "{:.2f} meters"),
+    ("Max Altitude", 'max_altitude', "{:.2f} meters"),
+    ("Min Altitude", 'min_altitude', "{:.2f} meters"),
+    ("Most Used Rocket", 'most_used_rocket', "{}"),
+    ("Most Used Motor", 'most_used_motor', "{}"),
+    ("First Launch Date", 'first_launch_date', "date"),
+    ("Latest Launch Date", 'latest_launch_date', "date")
+)
+
+# Summary statistics that have a value in an empty logbook; the others are shown as N/A
+COUNT_KEYS = ('total_launches', 'successful_launches', 'failed_launches')
+
+# Columns of the launch list
+LAUNCH_COLUMNS = ("ID", "Date", "Rocket Name", "Motor Type", "Altitude (m)", "Success", "Notes")
+
+HTML_STYLE = """body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 0.3em 0.6em; text-align: left; vertical-align: top; }
+th { background: #f0e6f6; }
+td.number { text-align: right; }"""
+
+def _launch_cells(record):
+    """Text of the launch list cells of a record."""
+    return (
+        str(record.id),
+        format_date_for_display(record.date),
+        record.rocket_name,
+        record.motor_type,
+        str(record.altitude),
+        "Yes" if record.success else "No",
+        " ".join(record.notes.split())
+    )
+
+def _summary_cells(statistics):
+    """(label, text) pairs of the summary table."""
+    cells = []
+    empty = not statistics['total_launches']
+    for label, key, fmt in SUMMARY_ROWS:
+        value = statistics[key]
+        if empty and key not in COUNT_KEYS:
+            cells.append((label, "N/A"))
+        else:
+            cells.append((label, format_date_for_display(value) if fmt == "date" else fmt.format(value)))
+    return cells
+
+class MarkdownReport:
+    """
+    Writes the parts of a report as Markdown.
+
+    Report writers are called in order: begin, summary, launches_begin,
+    then page_begin, row for each launch and page_end for every page of
+    the launch list, and finally end.
+    """
+
+    extension = "md"
+
+    def __init__(self, stream):
+        """
+        Initialize a writer.
+
+        Args:
+            stream: Text file object the Markdown is written to
+        """
+        self.write = stream.write
+
+    @staticmethod
+    def _escape(text):
+        """Escape the characters that would end or break a table cell."""
+        return text.replace("\\", "\\\\").replace("|", "\\|")
+
+    def _table(self, header, rows):
+        """
+        Write a table followed by a blank line.
+
+        Args:
+            header: Column headings
+            rows: Iterable of rows, each a sequence of cell texts
+        """
+        self.write("| " + " | ".join(header) + " |\n")
+        self.write("|" + "---|" * len(header) + "\n")
+        for row in rows:
+            self.write("| " + " | ".join(self._escape(cell) for cell in row) + " |\n")
+        self.write("\n")
+
+    def begin(self, title, generated):
+        """
+        Write the title and when the report was generated.
+
+        Args:
+            title: Title of the report
+            generated: Date and time of generation as text
+        """
+        self.write(f"# {title}\n\nGenerated {generated}.\n\n")
+
+    def summary(self, summary):
+        """
+        Write the summary statistics, launches per month and success rate per rocket.
+
+        Args:
+            summary: Dictionary returned by stats.summarize_records
+        """
+        self.write("## Summary\n\n")
+        self._table(("Statistic", "Value"), _summary_cells(summary['statistics']))
+        self.write("## Launches per Month\n\n")
+        months = summary['monthly_launch_count']
+        self._table(("Month", "Launches"), [(month, str(months[month])) for month in sorted(months)])
+        self.write("## Success Rate per Rocket\n\n")
+        rates = summary['rocket_success_rates']
+        self._table(("Rocket", "Success Rate"), [(rocket, f"{rates[rocket]:.2f}%") for rocket in sorted(rates)])
+
+    def launches_begin(self, count):
+        """
+        Write the heading of the launch list.
+
+        Args:
+            count: Number of launches in the list
+        """
+        self.write(f"## Launches\n\n{count} launches.\n\n")
+
+    def page_begin(self, number):
+        """
+        Write the heading and table header of a page of the launch list.
+
+        Args:
+            number: Page number, starting at 1
+        """
+        self.write(f"### Page {number}\n\n")
+        self.write("| " + " | ".join(LAUNCH_COLUMNS) + " |\n")
+        self.write("|" + "---|" * len(LAUNCH_COLUMNS) + "\n")
+
+    def row(self, record):
+        """
+        Write the table row of a launch.
+
+        Args:
+            record: LaunchRecord to list
+        """
+        self.write("| " + " | ".join(self._escape(cell) for cell in _launch_cells(record)) + " |\n")
+
+    def page_end(self):
+        """End the table of a page of the launch list."""
+        self.write("\n")
+
+    def end(self):
+        """Finish the report; Markdown needs no closing text."""
+        pass
+
+class HtmlReport:
+    """Writes the parts of a report as a self-contained HTML page, like MarkdownReport."""
+
+    extension = "html"
+
+    def __init__(self, stream):
+        """
+        Initialize a writer.
+
+        Args:
+            stream: Text file object the HTML is written to
+        """
+        self.write = stream.write
+
+    def _table(self, header, rows, numeric=()):
+        """
+        Write a table.
+
+        Args:
+            header: Column headings
+            rows: Iterable of rows, each a sequence of cell texts
+            numeric: Indexes of the columns aligned right
+        """
+        self.write("<table>\n<tr>" + "".join(f"<th>{html.escape(cell)}</th>" for cell in header) + "</tr>\n")
+        for row in rows:
+            self._row(row, numeric)
+        self.write("</table>\n")
+
+    def _row(self, cells, numeric=()):
+        """Write a table row, escaping the cells and aligning the numeric columns right."""
+        self.write("<tr>" + "".join(
+            f'<td class="number">{html.escape(cell)}</td>' if index in numeric else f"<td>{html.escape(cell)}</td>"
+            for index, cell in enumerate(cells)
+        ) + "</tr>\n")
+
+    def begin(self, title, generated):
+        """Write the document head with the style sheet, then the title; see MarkdownReport.begin."""
+        title = html.escape(title)
+        self.write(f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n'
+                   f"<style>\n{HTML_STYLE}\n</style>\n</head>\n<body>\n"
+                   f"<h1>{title}</h1>\n<p>Generated {html.escape(generated)}.</p>\n")
+
+    def summary(self, summary):
+        """Write the summary tables; see MarkdownReport.summary."""
+        self.write("<h2>Summary</h2>\n")
+        self._table(("Statistic", "Value"), _summary_cells(summary['statistics']))
+        self.write("<h2>Launches per Month</h2>\n")
+        months = summary['monthly_launch_count']
+        self._table(("Month", "Launches"), [(month, str(months[month])) for month in sorted(months)], (1,))
+        self.write("<h2>Success Rate per Rocket</h2>\n")
+        rates = summary['rocket_success_rates']
+        self._table(("Rocket", "Success Rate"),
+                    [(rocket, f"{rates[rocket]:.2f}%") for rocket in sorted(rates)], (1,))
+
+    def launches_begin(self, count):
+        """Write the heading of the launch list; see MarkdownReport.launches_begin."""
+        self.write(f"<h2>Launches</h2>\n<p>{count} launches.</p>\n")
+
+    def page_begin(self, number):
+        """Write the heading, with an anchor to link to, and the table header of a page."""
+        self.write(f'<h3 id="page-{number}">Page {number}</h3>\n<table>\n<tr>'
+                   + "".join(f"<th>{html.escape(cell)}</th>" for cell in LAUNCH_COLUMNS) + "</tr>\n")
+
+    def row(self, record):
+        """Write the table row of a launch, with the ID and altitude aligned right."""
+        self._row(_launch_cells(record), (0, 4))
+
+    def page_end(self):
+        """Close the table of a page of the launch list."""
+        self.write("</table>\n")
+
+    def end(self):
+        """Close the document."""
+        self.write("</body>\n</html>\n")
+
+REPORT_WRITERS = {'md': MarkdownReport, 'html': HtmlReport}
+
+def write_report(records, stream, fmt='md', title="Rocket Launch Report", page_size=REPORT_PAGE_SIZE):
+    """
+    Write a report with summary statistics and the full launch list.
+
+    The records are read once: the launch list is written to a temporary
+    file while the statistics are aggregated, then the summary and the
+    launch list are copied to the stream. Memory use does not grow with
+    the number of records.
+
+    Args:
+        records: Iterable of LaunchRecord objects, e.g. a generator
+        stream: Text file object to write to
+        fmt: 'html' or 'md'
+        title: Title of the report
+        page_size: Launches per page of the launch list
+
+    Returns:
+        int: Number of launches in the report
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report format '{fmt}', expected one of {', '.join(REPORT_FORMATS)}")
+    writer_type = REPORT_WRITERS[fmt]
+    count = 0
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as launches:
+        list_writer = writer_type(launches)
+
+        def listed(records):
+            nonlocal count
+            for record in records:
+                if count % page_size == 0:
+                    if count:
+                        list_writer.page_end()
+                    list_writer.page_begin(count // page_size + 1)
+                list_writer.row(record)
+                count += 1
+                yield record
+            if count:
+                list_writer.page_end()
+
+        summary = summarize_records(listed(records))
+
+        writer = writer_type(stream)
+        writer.begin(title, datetime.now().strftime('%Y-%m-%d %H:%M'))
+        writer.summary(summary)
+        writer.launches_begin(count)
+        launches.seek(0)
+        shutil.copyfileobj(launches, stream)
+        writer.end()
+    return count
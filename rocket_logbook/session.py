@@ -0,0 +1,424 @@
+import os
+import json
+import time
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.fuzzy import FuzzyIndex
+from rocket_logbook.history import apply_changes
+from rocket_logbook.cache import ResultCache
+from rocket_logbook.ranking import (SortedIndex, INDEXED_FIELDS, sort_records, top_records,
+                                     top_records_per_group)
+
+# Seconds after which pending changes are written to the data file by the
+# next mutation, even if the session is not saved explicitly
+AUTOSAVE_INTERVAL = 30.0
+
+class LogbookSession:
+    """
+    Unit of work over a logbook for the interactive menu.
+
+    The logbook is loaded once and kept in memory; reads and edits work on
+    the in-memory records, so they do not depend on the size of the data
+    file. Changes are tracked as before/after images and written with a
+    single save when the session is flushed, which happens on exit, before
+    anything that reads the data file directly, and at most
+    autosave_interval seconds after an unsaved change.
+
+    Every change is also appended to a small journal next to the data file
+    before it is applied. If the application is killed before a flush, the
+    journal is replayed the next time a session is opened, rebased onto
+    the data file as it is then: changes the file already holds (because
+    the flush did complete) are skipped, and records written by others in
+    the meantime are not overwritten.
+    """
+
+    def __init__(self, data_manager, autosave_interval=AUTOSAVE_INTERVAL, journal=True):
+        """
+        Open a session and load the logbook.
+
+        Args:
+            data_manager: DataManager of the logbook
+            autosave_interval: Seconds after which unsaved changes are
+                written by the next mutation, or None to only save on flush
+            journal: Journal each change so it survives a crash before the
+                next flush; without it unsaved changes are lost on a crash
+        """
+        self.data_manager = data_manager
+        self.autosave_interval = autosave_interval
+        self.journal = journal
+        self.journal_file = data_manager.data_file + ".journal.jsonl"
+        self.changes = []
+        self.remapped = []
+        self.skipped = []
+        self.last_flush = time.monotonic()
+        # Search results over the in-memory records, with the settings of the DataManager's cache
+        self.result_cache = ResultCache(data_manager.result_cache.maxsize, enabled=data_manager.result_cache.enabled)
+        self.generation = 0
+        self.reload()
+        self._recover()
+
+    def reload(self):
+        """Discard the in-memory state and load the logbook from the data file."""
+        self.records = {record.id: record for record in self.data_manager.get_all_records()}
+        self.fingerprint = self.data_manager.get_fingerprint()
+        rejected_ids = [row['id'] for row in self.data_manager.rejected_rows
+                        if isinstance(row, dict) and type(row.get('id')) is int]
+        self.max_id = max(list(self.records) + rejected_ids, default=0)
+        self._fuzzy_cache = None
+        self._sorted_indexes = {}
+        self.generation += 1
+
+    @property
+    def dirty(self):
+        """Whether there are changes that have not been written yet."""
+        return bool(self.changes)
+
+    def get_all_records(self):
+        """Return all records in file order."""
+        return list(self.records.values())
+
+    def get_record_by_id(self, record_id):
+        """
+        Retrieve a record by ID without reading the data file.
+
+        Args:
+            record_id: The ID of the record to retrieve
+
+        Returns:
+            LaunchRecord object if found, None otherwise
+        """
+        return self.records.get(record_id)
+
+    def get_next_id(self):
+        """Return the next available ID for a new record."""
+        return self.max_id + 1
+
+    def search_records(self, search_term):
+        """
+        Search the in-memory records, as DataManager.search_records does.
+
+        Args:
+            search_term: String to search for in dates or rocket names/types
+
+        Returns:
+            List of matching LaunchRecord objects
+        """
+        results = self.result_cache.get(('search', search_term.lower()), self.generation,
+                                        lambda: self.data_manager.filter_records(self.records.values(), search_term))
+        return list(results)
+
+    def get_fuzzy_index(self):
+        """Return a fuzzy index over the rocket names and motor types in memory."""
+        return self._get_fuzzy_cache()[0]
+
+    def fuzzy_search_records(self, search_term, max_distance=None):
+        """
+        Fuzzy search the in-memory records, as DataManager.fuzzy_search_records does.
+
+        Args:
+            search_term: Possibly misspelled rocket name or motor type
+            max_distance: Largest edit distance to accept
+
+        Returns:
+            List of matching LaunchRecord objects, closest matches first
+        """
+        index, records_by_value = self._get_fuzzy_cache()
+
+        results = []
+        seen_ids = set()
+        for value, _distance in index.search(search_term, max_distance):
+            for record in records_by_value[value]:
+                if record.id not in seen_ids:
+                    seen_ids.add(record.id)
+                    results.append(record)
+        return results
+
+    def _get_fuzzy_cache(self):
+        """Return (index, records by value), rebuilt after any change."""
+        if self._fuzzy_cache is None:
+            index = FuzzyIndex()
+            records_by_value = {}
+            for record in self.records.values():
+                for value in (record.rocket_name, record.motor_type):
+                    index.add(value)
+                    records_by_value.setdefault(value, []).append(record)
+            self._fuzzy_cache = (index, records_by_value)
+        return self._fuzzy_cache
+
+    def get_sorted_records(self, field, reverse=False):
+        """
+        Get all records sorted on a field.
+
+        Dates and altitudes are read from sorted indexes that are kept up to
+        date as records change, so only the first listing sorts.
+
+        Args:
+            field: Name of a field in ranking.SORT_FIELDS
+            reverse: Sort in descending order
+
+        Returns:
+            List of LaunchRecord objects
+        """
+        if field in INDEXED_FIELDS:
+            return [self.records[record_id] for record_id in self._get_sorted_index(field).ids(reverse)]
+        return sort_records(self.records.values(), field, reverse)
+
+    def get_top_records(self, n, field='altitude', smallest=False, per=None):
+        """
+        Get the records with the largest (or smallest) values of a field.
+
+        Args:
+            n: Number of records, per group if per is given
+            field: Name of a field in ranking.SORT_FIELDS
+            smallest: Select the smallest values instead
+            per: 'rocket' or 'motor' to select the top n of each group
+
+        Returns:
+            list: Records best first, or a dict of such lists per group
+        """
+        if per is not None:
+            return top_records_per_group(self.records.values(), n, field, per, smallest)
+        if field in INDEXED_FIELDS:
+            ids = self._get_sorted_index(field).ids(reverse=not smallest, limit=n)
+            return [self.records[record_id] for record_id in ids]
+        return top_records(self.records.values(), n, field, smallest)
+
+    def _get_sorted_index(self, field):
+        """Return the sorted index of a field, building it on first use."""
+        index = self._sorted_indexes.get(field)
+        if index is None:
+            index = SortedIndex(field, self.records.values())
+            self._sorted_indexes[field] = index
+        return index
+
+    def add_record(self, record):
+        """
+        Add a new launch record.
+
+        Args:
+            record: LaunchRecord object to add
+        """
+        self._record_change({'before': None, 'after': record.to_dict()})
+
+    def update_record(self, updated_record):
+        """
+        Update an existing launch record.
+
+        Args:
+            updated_record: LaunchRecord object with the updated data
+
+        Returns:
+            bool: True if successful, False if record not found
+        """
+        record = self.records.get(updated_record.id)
+        if record is None:
+            return False
+        self._record_change({'before': record.to_dict(), 'after': updated_record.to_dict()})
+        return True
+
+    def delete_record(self, record_id):
+        """
+        Delete a launch record by ID.
+
+        Args:
+            record_id: ID of the record to delete
+
+        Returns:
+            bool: True if successful, False if record not found
+        """
+        record = self.records.get(record_id)
+        if record is None:
+            return False
+        self._record_change({'before': record.to_dict(), 'after': None})
+        return True
+
+    def flush(self):
+        """
+        Write all pending changes to the data file in one save.
+
+        If the data file was changed by someone else since it was loaded,
+        it is reloaded first and the pending changes are rebased onto it:
+        records added in this session whose IDs were taken there in the
+        meantime are given new IDs, as sync_logbooks does, and updates and
+        deletes of records that were changed there are dropped. The
+        (old ID, new ID) pairs are left in remapped and the dropped changes
+        in skipped, as (record ID, reason) pairs.
+
+        Returns:
+            int: Number of changes written
+        """
+        self.remapped = []
+        self.skipped = []
+        if not self.changes:
+            return 0
+
+        changes = self.changes
+        if self.data_manager.get_fingerprint() != self.fingerprint:
+            state = {record.id: record.to_dict() for record in self.data_manager.get_all_records()}
+            rejected_ids = [row['id'] for row in self.data_manager.rejected_rows
+                            if isinstance(row, dict) and type(row.get('id')) is int]
+            # Above the IDs in the data file and the ones added here, so new IDs collide with neither
+            self.max_id = max([self.max_id] + list(state) + rejected_ids)
+            changes = self._rebase(changes, state)
+            records = [LaunchRecord(**row) for row in state.values()]
+            self._sorted_indexes = {}
+        else:
+            records = list(self.records.values())
+
+        if changes:
+            # Pure additions let the DataManager extend its sidecars in place
+            op = 'add' if all(change['before'] is None for change in changes) else 'session'
+            self.data_manager._commit(records, op, changes)
+
+        self.records = {record.id: record for record in records}
+        self.fingerprint = self.data_manager.get_fingerprint()
+        self.changes = []
+        self.last_flush = time.monotonic()
+        self._fuzzy_cache = None
+        self.generation += 1
+        self._clear_journal()
+        return len(changes)
+
+    def _rebase(self, changes, state):
+        """
+        Apply changes made against an older version of the logbook to the current one.
+
+        Records added here whose IDs are taken by other records are moved to
+        IDs above max_id, along with later changes to them. Updates and
+        deletes only apply if the record is still as it was when the change
+        was made. Changes that the data file already holds, such as those of
+        a journal whose flush completed, are left out.
+
+        Args:
+            changes: Pending changes, in the order they were made
+            state: Dictionary mapping record ID to record dictionary, as
+                reloaded from the data file; modified in place
+
+        Returns:
+            list: The changes that were applied to state
+        """
+        # Every version of each record written by these changes; a record
+        # already in one of them was put there by this session's own flush
+        versions = {}
+        for change in changes:
+            if change['after'] is not None:
+                versions.setdefault(change['after']['id'], []).append(change['after'])
+
+        new_ids = {}
+        rebased = []
+        for change in changes:
+            before, after = change['before'], change['after']
+            if before is None:
+                current = state.get(after['id'])
+                if current is not None and current in versions[after['id']]:
+                    continue
+                if current is not None:
+                    self.max_id += 1
+                    new_ids[after['id']] = self.max_id
+                    self.remapped.append((after['id'], self.max_id))
+            elif before['id'] in new_ids:
+                before = dict(before, id=new_ids[before['id']])
+            if after is not None and after['id'] in new_ids:
+                after = dict(after, id=new_ids[after['id']])
+
+            if before is not None:
+                current = state.get(before['id'])
+                if current != before:
+                    if current != after:
+                        reason = "deleted" if current is None else "changed"
+                        self.skipped.append((before['id'], f"{reason} in the data file since it was loaded"))
+                    continue
+
+            change = {'before': before, 'after': after}
+            apply_changes(state, [change])
+            rebased.append(change)
+        return rebased
+
+    def close(self):
+        """Flush pending changes; call when leaving interactive mode."""
+        self.flush()
+
+    def _record_change(self, change):
+        """Journal a change, apply it in memory and autosave if it is due."""
+        if self.journal:
+            self._append_journal(change)
+        self._apply(change)
+        self.changes.append(change)
+
+        if self.autosave_interval is not None and time.monotonic() - self.last_flush >= self.autosave_interval:
+            self.flush()
+
+    def _apply(self, change):
+        """Apply one change to the in-memory records and their sorted indexes."""
+        after = change['after']
+        record_id = change['before']['id'] if after is None else after['id']
+        old = self.records.get(record_id)
+        if after is None:
+            new = None
+            self.records.pop(record_id, None)
+        else:
+            # Assigning keeps an updated record in its place in file order
+            new = LaunchRecord(**after)
+            self.records[record_id] = new
+            self.max_id = max(self.max_id, record_id)
+
+        for index in self._sorted_indexes.values():
+            if old is not None:
+                index.remove(old)
+            if new is not None:
+                index.add(new)
+        self._fuzzy_cache = None
+        self.generation += 1
+
+    def _append_journal(self, change):
+        """
+        Durably append a change to the journal.
+
+        A new journal starts with the fingerprint and max_id the changes
+        were made against, so they can be rebased on recovery.
+        """
+        header = not os.path.exists(self.journal_file)
+        with open(self.journal_file, 'a') as f:
+            if header:
+                f.write(json.dumps({'base': self.fingerprint, 'max_id': self.max_id}, separators=(',', ':')) + "\n")
+            f.write(json.dumps(change, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _clear_journal(self):
+        """Remove the journal once its changes are in the data file."""
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+
+    def _recover(self):
+        """
+        Replay and save changes left in the journal by a session that did not finish.
+
+        The changes are rebased onto the data file as flush does, so records
+        written by others since, or by a flush that completed before the
+        crash, are not overwritten.
+        """
+        try:
+            with open(self.journal_file, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        # Without a header the base is unknown, so the changes are always rebased
+        base = None
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A change cut short by the crash was never applied
+                break
+            if 'base' in entry:
+                base = entry['base']
+                self.max_id = max(self.max_id, entry['max_id'])
+                continue
+            self._apply(entry)
+            self.changes.append(entry)
+        self.fingerprint = base
+        self.flush()
+        self._clear_journal()
@@ -0,0 +1,219 @@
+import math
+import random
+
+# Default accuracy parameter. With k=200 the rank error of a quantile query
+# is typically below 0.5% and stays below 1.5% with high probability,
+# regardless of how many values were added.
+DEFAULT_K = 200
+
+# Nominal rank error bound for DEFAULT_K, used for documentation and checks
+DEFAULT_RANK_ERROR = 0.015
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (KLL).
+
+    Values are kept in a hierarchy of compactors. When a level fills up it is
+    sorted and every other item is promoted to the next level with double
+    weight, so memory stays O(k log(n/k)) no matter how many values are added.
+    Sketches built over separate files or partitions can be merged, and the
+    result has the same error guarantee as a single sketch over all values.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            k: Accuracy parameter; larger values use more memory and are more accurate
+            seed: Seed for the compaction coin flips, for reproducible results
+        """
+        self.k = k
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.compactors = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        """Number of items a level may hold before it is compacted."""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _grow(self):
+        """Add a level and recompute the total capacity."""
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _compress(self):
+        """Compact levels until the sketch is back within its capacity."""
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items = sorted(self.compactors[level])
+                offset = self._random.randint(0, 1)
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = []
+                self._size = sum(len(compactor) for compactor in self.compactors)
+                if self._size < self._max_size:
+                    break
+
+    def add(self, value):
+        """
+        Add a value to the sketch.
+
+        Args:
+            value: Number to add
+        """
+        self.count += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        self.compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: QuantileSketch to merge in; it is left unchanged
+        """
+        if other.count == 0:
+            return
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+
+        self.count += other.count
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+
+        self._size = sum(len(compactor) for compactor in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def _weighted_items(self):
+        """Sorted list of (value, weight) pairs."""
+        items = []
+        for level, compactor in enumerate(self.compactors):
+            weight = 2 ** level
+            items.extend((value, weight) for value in compactor)
+        items.sort()
+        return items
+
+    def quantile(self, q):
+        """
+        Estimate the value at a quantile.
+
+        Args:
+            q: Quantile between 0 and 1, e.g. 0.5 for the median
+
+        Returns:
+            float: Estimated value, None if the sketch is empty
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """
+        Estimate the values at several quantiles with one pass over the sketch.
+
+        Args:
+            qs: Iterable of quantiles between 0 and 1
+
+        Returns:
+            list: Estimated values in the same order, None if the sketch is empty
+        """
+        qs = list(qs)
+        if self.count == 0:
+            return [None] * len(qs)
+
+        items = self._weighted_items()
+        total = sum(weight for _, weight in items)
+        results = []
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError("Quantiles must be between 0 and 1")
+            if q == 0:
+                results.append(self.minimum)
+                continue
+            if q == 1:
+                results.append(self.maximum)
+                continue
+
+            target = q * total
+            cumulative = 0
+            value = items[-1][0]
+            for item, weight in items:
+                cumulative += weight
+                if cumulative >= target:
+                    value = item
+                    break
+            results.append(value)
+        return results
+
+    def rank(self, value):
+        """
+        Estimate the fraction of added values less than or equal to a value.
+
+        Args:
+            value: Number to rank
+
+        Returns:
+            float: Estimated fraction between 0 and 1
+        """
+        if self.count == 0:
+            return 0.0
+        below = 0
+        total = 0
+        for level, compactor in enumerate(self.compactors):
+            weight = 2 ** level
+            total += weight * len(compactor)
+            below += weight * sum(1 for item in compactor if item <= value)
+        return below / total
+
+    def to_dict(self):
+        """
+        Convert the sketch to a dictionary for JSON serialization.
+
+        Returns:
+            dict: Dictionary representation of the sketch
+        """
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min': self.minimum,
+            'max': self.maximum,
+            'compactors': self.compactors
+        }
+
+    @classmethod
+    def from_dict(cls, data, seed=None):
+        """
+        Rebuild a sketch from its dictionary representation.
+
+        Args:
+            data: Dictionary produced by to_dict
+            seed: Seed for future compactions
+
+        Returns:
+            QuantileSketch: The restored sketch
+        """
+        sketch = cls(data['k'], seed)
+        sketch.count = data['count']
+        sketch.minimum = data['min']
+        sketch.maximum = data['max']
+        sketch.compactors = [list(compactor) for compactor in data['compactors']] or [[]]
+        sketch._max_size = sum(sketch._capacity(level) for level in range(len(sketch.compactors)))
+        sketch._size = sum(len(compactor) for compactor in sketch.compactors)
+        return sketch
@@ -1,17 +1,276 @@
-from collections import Counter
-from datetime import datetime
+from rocket_logbook.sketches import QuantileSketch, DEFAULT_K
+
+# Aggregates the group-by engine knows how to report
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max', 'success_rate')
+
+# Aggregates reported for each impulse class
+IMPULSE_CLASS_AGGREGATES = ('count', 'mean', 'min', 'max')
+
+# Functions extracting a grouping key from a record. Dates are stored as
+# YYYY-MM-DD, so month and year are plain prefixes of the date string.
+GROUP_KEYS = {
+    'rocket': lambda record: record.rocket_name,
+    'motor': lambda record: record.motor_type,
+    'month': lambda record: record.date[:7],
+    'year': lambda record: record.date[:4],
+    'impulse_class': lambda record: record.motor.impulse_class,
+    'delay': lambda record: record.motor.delay,
+}
+
+class GroupAggregate:
+    """Running aggregates for a single group, updated one record at a time."""
+
+    __slots__ = ('count', 'successes', 'total', 'minimum', 'maximum',
+                 'first_date', 'latest_date')
+
+    def __init__(self):
+        """Initialize an empty aggregate."""
+        self.count = 0
+        self.successes = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.first_date = None
+        self.latest_date = None
+
+    def add(self, record):
+        """
+        Fold a single record into the aggregate.
+
+        Args:
+            record: LaunchRecord object to add
+        """
+        altitude = record.altitude
+        date = record.date
+
+        self.count += 1
+        if record.success:
+            self.successes += 1
+        self.total += altitude
+
+        if self.minimum is None or altitude < self.minimum:
+            self.minimum = altitude
+        if self.maximum is None or altitude > self.maximum:
+            self.maximum = altitude
+
+        # ISO dates compare correctly as strings
+        if self.first_date is None or date < self.first_date:
+            self.first_date = date
+        if self.latest_date is None or date > self.latest_date:
+            self.latest_date = date
+
+    def merge(self, other):
+        """
+        Combine another aggregate into this one.
+
+        Args:
+            other: GroupAggregate to merge in
+        """
+        self.count += other.count
+        self.successes += other.successes
+        self.total += other.total
+
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+        if other.first_date is not None and (self.first_date is None or other.first_date < self.first_date):
+            self.first_date = other.first_date
+        if other.latest_date is not None and (self.latest_date is None or other.latest_date > self.latest_date):
+            self.latest_date = other.latest_date
+
+    @property
+    def mean(self):
+        """Mean altitude of the group."""
+        return self.total / self.count if self.count else 0
+
+    @property
+    def success_rate(self):
+        """Success rate of the group as a percentage."""
+        return (self.successes / self.count) * 100 if self.count else 0
+
+    def result(self, aggregates=AGGREGATES):
+        """
+        Report the requested aggregates.
+
+        Args:
+            aggregates: Iterable of aggregate names from AGGREGATES
+
+        Returns:
+            dict: Dictionary with aggregate names as keys
+        """
+        values = {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.mean,
+            'min': self.minimum if self.minimum is not None else 0,
+            'max': self.maximum if self.maximum is not None else 0,
+            'success_rate': self.success_rate,
+        }
+        return {name: values[name] for name in aggregates}
+
+def parse_group_keys(keys):
+    """
+    Normalize a group-by key specification.
+
+    Args:
+        keys: Comma separated string (e.g. "rocket,month") or iterable of key names
+
+    Returns:
+        tuple: Tuple of key names
+
+    Raises:
+        ValueError: If a key name is not one of GROUP_KEYS
+    """
+    if isinstance(keys, str):
+        keys = [key.strip() for key in keys.split(',') if key.strip()]
+    keys = tuple(keys)
+
+    for key in keys:
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Unknown group-by key '{key}'. Choose from: {', '.join(GROUP_KEYS)}")
+    return keys
+
+def _make_key_function(keys):
+    """Build a function mapping a record to its group key for the given keys."""
+    if not keys:
+        return lambda record: ()
+    if len(keys) == 1:
+        return GROUP_KEYS[keys[0]]
+
+    extractors = [GROUP_KEYS[key] for key in keys]
+    return lambda record: tuple(extract(record) for extract in extractors)
+
+def multi_group_by(records, groupings):
+    """
+    Compute several groupings in a single pass over a record stream.
+
+    Args:
+        records: Iterable of LaunchRecord objects (may be a generator)
+        groupings: Dictionary mapping a result name to a key specification
+            accepted by parse_group_keys. An empty specification aggregates
+            over all records.
+
+    Returns:
+        dict: Dictionary mapping each result name to a dictionary of
+            group key -> GroupAggregate. Single keys are plain values,
+            combined keys are tuples and the empty key is ().
+    """
+    plans = []
+    results = {}
+    for name, keys in groupings.items():
+        groups = {}
+        results[name] = groups
+        plans.append((_make_key_function(parse_group_keys(keys)), groups))
+
+    for record in records:
+        for key_function, groups in plans:
+            key = key_function(record)
+            aggregate = groups.get(key)
+            if aggregate is None:
+                aggregate = groups[key] = GroupAggregate()
+            aggregate.add(record)
+
+    return results
+
+def check_aggregates(aggregates):
+    """
+    Check a list of aggregate names.
+
+    Args:
+        aggregates: Iterable of aggregate names
+
+    Returns:
+        tuple: Tuple of aggregate names
+
+    Raises:
+        ValueError: If a name is not one of AGGREGATES
+    """
+    aggregates = tuple(aggregates)
+    for name in aggregates:
+        if name not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{name}'. Choose from: {', '.join(AGGREGATES)}")
+    return aggregates
+
+def group_by(records, keys, aggregates=AGGREGATES):
+    """
+    Group records by the given keys and compute aggregates for each group.
+
+    Args:
+        records: Iterable of LaunchRecord objects
+        keys: Key specification accepted by parse_group_keys
+        aggregates: Iterable of aggregate names from AGGREGATES
+
+    Returns:
+        dict: Dictionary with group keys as keys and aggregate dictionaries as values
+    """
+    aggregates = check_aggregates(aggregates)
+    groups = multi_group_by(records, {'groups': keys})['groups']
+    return {key: aggregate.result(aggregates) for key, aggregate in groups.items()}
+
+def _most_common(groups):
+    """Return the key with the highest count, preferring the first seen on ties."""
+    best_key = "None"
+    best_count = 0
+    for key, aggregate in groups.items():
+        if aggregate.count > best_count:
+            best_key = key
+            best_count = aggregate.count
+    return best_key
 
 def calculate_statistics(records):
     """
     Calculate various statistics about the launch records.
-    
+
     Args:
         records: List of LaunchRecord objects
-        
+
     Returns:
         dict: Dictionary containing various statistics
     """
-    if not records:
+    results = multi_group_by(records, {'overall': (), 'rocket': 'rocket', 'motor': 'motor'})
+    return _statistics_from_groups(results)
+
+def summarize_records(records):
+    """
+    Compute statistics and the per-month, rocket, impulse class and delay breakdowns in one pass.
+
+    Gives the same results as calling calculate_statistics,
+    get_monthly_launch_count, get_rocket_success_rates,
+    get_impulse_class_altitudes and get_delay_success_rates, but reads the
+    records only once, so they can be streamed.
+
+    Args:
+        records: Iterable of LaunchRecord objects (may be a generator)
+
+    Returns:
+        dict: Dictionary with 'statistics', 'monthly_launch_count',
+            'rocket_success_rates', 'impulse_class_altitudes' and
+            'delay_success_rates' entries
+    """
+    results = multi_group_by(records, {'overall': (), 'rocket': 'rocket', 'motor': 'motor', 'month': 'month',
+                                       'impulse_class': 'impulse_class', 'delay': 'delay'})
+    return {
+        'statistics': _statistics_from_groups(results),
+        'monthly_launch_count': {month: aggregate.count for month, aggregate in results['month'].items()},
+        'rocket_success_rates': _success_rates(results['rocket']),
+        'impulse_class_altitudes': _impulse_class_altitudes(results['impulse_class']),
+        'delay_success_rates': _success_rates(results['delay'])
+    }
+
+def _success_rates(groups):
+    """Map each group key to the success rate of its group."""
+    return {key: aggregate.success_rate for key, aggregate in groups.items()}
+
+def _impulse_class_altitudes(groups):
+    """Map each impulse class to the altitude aggregates of its group."""
+    return {key: aggregate.result(IMPULSE_CLASS_AGGREGATES) for key, aggregate in groups.items()}
+
+def _statistics_from_groups(results):
+    """Build the calculate_statistics result from overall, rocket and motor groups."""
+    overall = results['overall'].get(())
+
+    if overall is None:
         return {
             'total_launches': 0,
             'successful_launches': 0,
@@ -25,104 +284,125 @@ def calculate_statistics(records):
             'first_launch_date': "None",
             'latest_launch_date': "None"
         }
-    
-    # Basic counts
-    total_launches = len(records)
-    successful_launches = sum(1 for r in records if r.success)
-    failed_launches = total_launches - successful_launches
-    
-    # Success rate percentage
-    success_rate = (successful_launches / total_launches) * 100 if total_launches > 0 else 0
-    
-    # Altitude statistics
-    altitudes = [r.altitude for r in records]
-    avg_altitude = sum(altitudes) / len(altitudes) if altitudes else 0
-    max_altitude = max(altitudes) if altitudes else 0
-    min_altitude = min(altitudes) if altitudes else 0
-    
-    # Most common rocket and motor
-    rocket_counter = Counter(r.rocket_name for r in records)
-    motor_counter = Counter(r.motor_type for r in records)
-    
-    most_used_rocket = rocket_counter.most_common(1)[0][0] if rocket_counter else "None"
-    most_used_motor = motor_counter.most_common(1)[0][0] if motor_counter else "None"
-    
-    # Date ranges
-    dates = [datetime.strptime(r.date, "%Y-%m-%d") for r in records]
-    first_launch_date = min(dates).strftime("%Y-%m-%d") if dates else "None"
-    latest_launch_date = max(dates).strftime("%Y-%m-%d") if dates else "None"
-    
+
     return {
-        'total_launches': total_launches,
-        'successful_launches': successful_launches,
-        'failed_launches': failed_launches,
-        'success_rate': success_rate,
-        'avg_altitude': avg_altitude,
-        'max_altitude': max_altitude,
-        'min_altitude': min_altitude,
-        'most_used_rocket': most_used_rocket,
-        'most_used_motor': most_used_motor,
-        'first_launch_date': first_launch_date,
-        'latest_launch_date': latest_launch_date
+        'total_launches': overall.count,
+        'successful_launches': overall.successes,
+        'failed_launches': overall.count - overall.successes,
+        'success_rate': overall.success_rate,
+        'avg_altitude': overall.mean,
+        'max_altitude': overall.maximum,
+        'min_altitude': overall.minimum,
+        'most_used_rocket': _most_common(results['rocket']),
+        'most_used_motor': _most_common(results['motor']),
+        'first_launch_date': overall.first_date,
+        'latest_launch_date': overall.latest_date
     }
 
 def get_monthly_launch_count(records):
     """
     Get launch counts by month.
-    
+
     Args:
         records: List of LaunchRecord objects
-        
+
     Returns:
         dict: Dictionary with month-year keys and count values
     """
-    if not records:
-        return {}
-    
-    monthly_counts = {}
-    
-    for record in records:
-        date_obj = datetime.strptime(record.date, "%Y-%m-%d")
-        month_year = date_obj.strftime("%Y-%m")
-        
-        if month_year in monthly_counts:
-            monthly_counts[month_year] += 1
-        else:
-            monthly_counts[month_year] = 1
-    
-    return monthly_counts
+    groups = multi_group_by(records, {'month': 'month'})['month']
+    return {month: aggregate.count for month, aggregate in groups.items()}
 
 def get_rocket_success_rates(records):
     """
     Calculate success rates for each rocket type.
-    
+
     Args:
         records: List of LaunchRecord objects
-        
+
     Returns:
         dict: Dictionary with rocket names as keys and success rates as values
     """
-    if not records:
-        return {}
-    
-    # Count total and successful launches for each rocket
-    rocket_totals = {}
-    rocket_successes = {}
-    
+    return _success_rates(multi_group_by(records, {'rocket': 'rocket'})['rocket'])
+
+def get_impulse_class_altitudes(records):
+    """
+    Calculate altitude statistics for each motor impulse class.
+
+    Args:
+        records: List of LaunchRecord objects
+
+    Returns:
+        dict: Dictionary with impulse classes as keys (None for unparseable
+            motor types) and dictionaries of count, mean, min and max altitude
+    """
+    return _impulse_class_altitudes(multi_group_by(records, {'impulse_class': 'impulse_class'})['impulse_class'])
+
+def get_delay_success_rates(records):
+    """
+    Calculate success rates for each ejection delay.
+
+    Args:
+        records: List of LaunchRecord objects
+
+    Returns:
+        dict: Dictionary with delays in seconds as keys (None for plugged,
+            missing or unparseable delays) and success rates as values
+    """
+    return _success_rates(multi_group_by(records, {'delay': 'delay'})['delay'])
+
+def build_altitude_sketches(records, k=DEFAULT_K, sketches=None):
+    """
+    Build altitude quantile sketches overall, per rocket and per motor in one pass.
+
+    Args:
+        records: Iterable of LaunchRecord objects (may be a generator)
+        k: Accuracy parameter of new sketches
+        sketches: Existing sketches to extend incrementally, as returned by
+            a previous call; updated in place
+
+    Returns:
+        dict: Dictionary with 'all' (a QuantileSketch), 'rocket' and 'motor'
+            (dictionaries mapping names to QuantileSketch objects)
+    """
+    if sketches is None:
+        sketches = {'all': QuantileSketch(k), 'rocket': {}, 'motor': {}}
+    overall = sketches['all']
+    by_rocket = sketches['rocket']
+    by_motor = sketches['motor']
+
     for record in records:
-        rocket_name = record.rocket_name
-        
-        if rocket_name not in rocket_totals:
-            rocket_totals[rocket_name] = 0
-            rocket_successes[rocket_name] = 0
-        
-        rocket_totals[rocket_name] += 1
-        if record.success:
-            rocket_successes[rocket_name] += 1
-    
-    # Calculate success rates
-    success_rates = {}
-    for rocket, total in rocket_totals.items():
-        success_rates[rocket] = (rocket_successes[rocket] / total) * 100
-    
-    return success_rates
\ No newline at end of file
+        altitude = record.altitude
+        overall.add(altitude)
+
+        sketch = by_rocket.get(record.rocket_name)
+        if sketch is None:
+            sketch = by_rocket[record.rocket_name] = QuantileSketch(k)
+        sketch.add(altitude)
+
+        sketch = by_motor.get(record.motor_type)
+        if sketch is None:
+            sketch = by_motor[record.motor_type] = QuantileSketch(k)
+        sketch.add(altitude)
+
+    return sketches
+
+def merge_altitude_sketches(target, other):
+    """
+    Merge altitude sketches built over another file or partition into target.
+
+    Args:
+        target: Sketches as returned by build_altitude_sketches; updated in place
+        other: Sketches to merge in; left unchanged
+
+    Returns:
+        dict: The updated target
+    """
+    target['all'].merge(other['all'])
+    for key in ('rocket', 'motor'):
+        for name, sketch in other[key].items():
+            if name in target[key]:
+                target[key][name].merge(sketch)
+            else:
+                merged = target[key][name] = QuantileSketch(sketch.k)
+                merged.merge(sketch)
+    return target
@@ -0,0 +1,617 @@
+import io
+import os
+import re
+import json
+import gzip
+import lzma
+import zlib
+import threading
+from abc import ABC, abstractmethod
+
+# Compiled JSON libraries used by the fast codecs when they are installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Magic bytes at the start of compressed files
+GZIP_MAGIC = b'\x1f\x8b'
+LZMA_MAGIC = b'\xfd7zXZ\x00'
+
+# File extensions selecting compression for new files
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.xz': 'lzma',
+    '.lzma': 'lzma',
+}
+
+COMPRESSIONS = (None, 'gzip', 'lzma')
+
+# JSON layouts: the original pretty-printed layout and a compact one
+LAYOUTS = {
+    'pretty': {'indent': 4},
+    'compact': {'separators': (',', ':')},
+}
+
+# JSON codecs in order of preference; 'json' (the standard library) is always available
+CODECS = ('msgspec', 'orjson', 'json')
+
+# Insignificant whitespace between JSON tokens
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Where record notes are kept: inline in each record, or in a notes blob
+NOTES_STORAGES = ('inline', 'blob')
+
+# Size of the chunks read when streaming records out of a file
+READ_CHUNK_SIZE = 64 * 1024
+
+# Number of items encoded at once when writing a file
+WRITE_BATCH_SIZE = 1000
+
+def detect_compression(path):
+    """
+    Detect the compression of a data file.
+
+    Existing files are identified by their magic bytes, so a renamed file is
+    still read correctly. New or empty files use the file extension.
+
+    Args:
+        path: Path of the data file
+
+    Returns:
+        str: 'gzip', 'lzma' or None for plain JSON
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(len(LZMA_MAGIC))
+    except FileNotFoundError:
+        head = b''
+
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(LZMA_MAGIC):
+        return 'lzma'
+    if head:
+        return None
+
+    extension = os.path.splitext(path)[1].lower()
+    return COMPRESSION_EXTENSIONS.get(extension)
+
+def open_data_file(path, mode='r', compression=None, errors='strict'):
+    """
+    Open a data file as a text stream, compressing or decompressing on the fly.
+
+    Args:
+        path: Path of the data file
+        mode: 'r' to read or 'w' to write
+        compression: 'gzip', 'lzma' or None
+        errors: How invalid UTF-8 is handled, e.g. 'replace' to read
+            damaged files
+
+    Returns:
+        A text file object
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'")
+
+    if compression == 'gzip':
+        # mtime=0 keeps output deterministic for identical content; level 6
+        # compresses almost as well as the default 9 at a fraction of the time
+        if mode == 'w':
+            raw = gzip.GzipFile(path, 'wb', compresslevel=6, mtime=0)
+        else:
+            raw = gzip.GzipFile(path, 'rb')
+        return io.TextIOWrapper(raw, encoding='utf-8', errors=errors)
+    if compression == 'lzma':
+        return lzma.open(path, mode + 't', encoding='utf-8', errors=errors)
+    return open(path, mode, encoding='utf-8', errors=errors)
+
+def detect_layout(path, compression=None):
+    """
+    Detect whether an existing data file is pretty-printed or compact.
+
+    Args:
+        path: Path of the data file
+        compression: Compression of the file as returned by detect_compression
+
+    Returns:
+        str: 'pretty' or 'compact', None if the file is missing or empty
+    """
+    try:
+        with open_data_file(path, 'r', compression) as f:
+            head = f.read(2)
+    except (OSError, EOFError, lzma.LZMAError):
+        return None
+
+    if len(head) < 2 or head == '[]':
+        return None
+    return 'pretty' if head[1].isspace() else 'compact'
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Incrementally decode the items of a top-level JSON array.
+
+    Only one chunk plus the item being decoded is held in memory, so
+    arbitrarily large (and compressed) files can be streamed.
+
+    Args:
+        stream: Text file object positioned at the start of the array
+        chunk_size: Number of characters to read at a time
+
+    Yields:
+        Each decoded array item
+
+    Raises:
+        json.JSONDecodeError: If the document is not a valid JSON array
+    """
+    # The decoder's scanner decodes one value at an offset without the
+    # per-call overhead of raw_decode
+    decode = json.JSONDecoder().scan_once
+    skip = WHITESPACE.match
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+    first = True
+
+    while True:
+        position = skip(buffer, position).end()
+
+        if position >= len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, position)
+            buffer = stream.read(chunk_size)
+            position = 0
+            eof = not buffer
+            continue
+
+        if not started:
+            if buffer[position] != '[':
+                raise json.JSONDecodeError("Expecting '['", buffer, position)
+            position += 1
+            started = True
+            continue
+        if first and buffer[position] == ']':
+            _expect_end(stream, buffer, position + 1, chunk_size)
+            return
+
+        try:
+            item, end = decode(buffer, position)
+            follow = skip(buffer, end).end()
+            delimiter = buffer[follow] if follow < len(buffer) else None
+        except (json.JSONDecodeError, StopIteration):
+            # The item may just be cut off at the end of the buffer
+            delimiter = None
+            follow = position
+            if eof:
+                raise json.JSONDecodeError("Expecting value", buffer, position)
+
+        # A number cut off at the end of the buffer still decodes (as a shorter
+        # number), so only accept an item once the delimiter after it is seen
+        if delimiter != ',' and delimiter != ']':
+            more = '' if eof else stream.read(chunk_size)
+            if not more:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, follow)
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+
+        yield item
+        if delimiter == ']':
+            _expect_end(stream, buffer, follow + 1, chunk_size)
+            return
+        position = follow + 1
+        first = False
+
+        # Drop consumed text so the buffer stays around one chunk in size
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+def _expect_end(stream, buffer, position, chunk_size):
+    """Raise JSONDecodeError, as json.loads does, if anything but whitespace follows the array."""
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+        if position < len(buffer):
+            raise json.JSONDecodeError("Extra data", buffer, position)
+        buffer = stream.read(chunk_size)
+        position = 0
+        if not buffer:
+            return
+
+def write_json_array(stream, items, layout='pretty', codec=None, blocks=None):
+    """
+    Write items as a JSON array, encoding a bounded batch of items at a time.
+
+    With the standard library codec the output is byte-identical to
+    json.dump with the same layout options, but the whole document never
+    has to be held in memory.
+
+    Each batch is written as one block: the opening bracket or separating
+    comma followed by the items. Blocks always start at an item boundary,
+    so a reader can resume at any of them.
+
+    Args:
+        stream: Text file object to write to
+        items: Iterable of JSON-serializable items (may be a generator)
+        layout: 'pretty' for the original indented layout or 'compact'
+        codec: Codec from get_codec encoding the batches, defaults to the
+            standard library
+        blocks: Optional list to append [offset, length, crc32, items] to
+            for each block, with the offset and length in characters and
+            the CRC-32 of the block's UTF-8 encoding
+
+    Returns:
+        int: Length of the document in characters
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'")
+
+    encode = (codec or JSON_CODEC).array_encoder(layout)
+    # Length of the closing bracket (with its newline when pretty-printed)
+    tail = 2 if layout == 'pretty' else 1
+    write = stream.write
+    position = 0
+    batch = []
+
+    def flush():
+        nonlocal position
+        # Encode the batch as an array and replace its brackets
+        block = ('[' if position == 0 else ',') + encode(batch)[1:-tail]
+        write(block)
+        if blocks is not None:
+            blocks.append([position, len(block), zlib.crc32(block.encode('utf-8')), len(batch)])
+        position += len(block)
+        batch.clear()
+
+    for item in items:
+        batch.append(item)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            flush()
+
+    if batch:
+        flush()
+
+    end = array_end(layout, position == 0)
+    write(end)
+    return position + len(end)
+
+def array_end(layout, empty):
+    """Text write_json_array ends a document with, after its last block."""
+    if empty:
+        return '[]'
+    return '\n]' if layout == 'pretty' else ']'
+
+class JsonCodec:
+    """Standard library JSON codec, which streams records in and out of the file."""
+
+    name = 'json'
+
+    def iter_array(self, stream):
+        """
+        Decode the items of a top-level JSON array.
+
+        Args:
+            stream: Text file object positioned at the start of the array
+
+        Returns:
+            Iterator over the decoded items
+
+        Raises:
+            json.JSONDecodeError: If the document is not a valid JSON array
+        """
+        return iter_json_array(stream)
+
+    def array_encoder(self, layout):
+        """
+        Get a function encoding a list of items as a JSON array.
+
+        Args:
+            layout: 'pretty' or 'compact', as for write_json_array
+
+        Returns:
+            Function taking a list and returning the array as a string
+        """
+        return json.JSONEncoder(**LAYOUTS[layout]).encode
+
+class _CompiledCodec(JsonCodec, ABC):
+    """
+    Base of the codecs backed by a compiled JSON library.
+
+    The library parses the whole document in one call, which is several
+    times faster than streaming it but holds the text of the file in
+    memory while the records are decoded. Documents it rejects, such as
+    ones with the NaN literals the standard library accepts, are decoded by
+    the standard library instead, so every file that loaded before still
+    loads.
+
+    Only the compact layout is encoded by the library. Neither library can
+    indent by four spaces, so the pretty layout stays byte-identical to
+    earlier files. Compact output differs from the standard library only in
+    leaving non-ASCII characters unescaped and in the exponent format of
+    very large or small numbers, and decodes to the same values.
+
+    Subclasses set decode_errors and encode_errors to the exceptions the
+    library raises for input it rejects, which are answered by falling back
+    to the standard library, and implement _loads and _dumps.
+    """
+
+    @abstractmethod
+    def _loads(self, text):
+        """
+        Decode a JSON document with the library.
+
+        Args:
+            text: The whole document as a string
+
+        Returns:
+            The decoded value
+
+        Raises:
+            decode_errors: If the library rejects the document
+        """
+
+    @abstractmethod
+    def _dumps(self, items):
+        """
+        Encode a list with the library in the compact layout.
+
+        Args:
+            items: List of JSON-compatible values
+
+        Returns:
+            str: The encoded array
+
+        Raises:
+            encode_errors: If the library cannot encode a value
+        """
+
+    def iter_array(self, stream):
+        """Decode the items of a top-level JSON array; see JsonCodec.iter_array."""
+        text = stream.read()
+        try:
+            items = self._loads(text)
+        except self.decode_errors:
+            items = json.loads(text)
+        if not isinstance(items, list):
+            raise json.JSONDecodeError("Expecting '['", text, 0)
+        yield from items
+
+    def array_encoder(self, layout):
+        """Get a function encoding a list as a JSON array; see JsonCodec.array_encoder."""
+        fallback = super().array_encoder(layout)
+        if layout != 'compact':
+            return fallback
+
+        dumps = self._dumps
+        errors = self.encode_errors
+
+        def encode(items):
+            # Values the library cannot encode, such as integers beyond
+            # 64 bits, are left to the standard library
+            try:
+                return dumps(items)
+            except errors:
+                return fallback(items)
+        return encode
+
+class OrjsonCodec(_CompiledCodec):
+    """Codec backed by orjson."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        """Initialize the codec; orjson must be installed."""
+        self.decode_errors = orjson.JSONDecodeError
+        self.encode_errors = orjson.JSONEncodeError
+
+    def _loads(self, text):
+        """Decode a JSON document with orjson; see _CompiledCodec._loads."""
+        return orjson.loads(text)
+
+    def _dumps(self, items):
+        """Encode a list with orjson, which writes the compact layout; see _CompiledCodec._dumps."""
+        return orjson.dumps(items).decode('utf-8')
+
+class MsgspecCodec(_CompiledCodec):
+    """Codec backed by msgspec."""
+
+    name = 'msgspec'
+
+    def __init__(self):
+        """Initialize the codec with a reusable decoder and encoder; msgspec must be installed."""
+        self.decode_errors = msgspec.DecodeError
+        self.encode_errors = (msgspec.EncodeError, OverflowError)
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def _loads(self, text):
+        """Decode a JSON document with msgspec; see _CompiledCodec._loads."""
+        return self._decoder.decode(text)
+
+    def _dumps(self, items):
+        """Encode a list with msgspec, which writes the compact layout; see _CompiledCodec._dumps."""
+        return self._encoder.encode(items).decode('utf-8')
+
+# Codec used when none is given
+JSON_CODEC = JsonCodec()
+
+def available_codecs():
+    """Names of the codecs that can be used, in order of preference."""
+    libraries = {'msgspec': msgspec, 'orjson': orjson, 'json': json}
+    return [name for name in CODECS if libraries[name] is not None]
+
+def get_codec(name=None):
+    """
+    Get a JSON codec by name.
+
+    Args:
+        name: 'json', 'orjson' or 'msgspec', or None or 'auto' for the
+            fastest one installed
+
+    Returns:
+        Codec object
+
+    Raises:
+        ValueError: If the codec is unknown or its library is not installed
+    """
+    if name is None or name == 'auto':
+        name = available_codecs()[0]
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}'")
+    if name not in available_codecs():
+        raise ValueError(f"The {name} codec needs the {name} package, which is not installed")
+
+    if name == 'orjson':
+        return OrjsonCodec()
+    if name == 'msgspec':
+        return MsgspecCodec()
+    return JSON_CODEC
+
+class NotesBlob:
+    """
+    Append-only files holding record notes out of line.
+
+    Notes are stored as UTF-8 bytes in generation-numbered files next to the
+    data file (rocket_launches.json.notes.1, .2, ...). A record refers to
+    its notes with [generation, offset, length], so reading the data file
+    never touches the notes, and fetching one note is a single seek and read.
+    Compaction copies the live notes into a new generation, so the data file
+    written afterwards always points at a complete blob, even if the
+    application stops half way.
+    """
+
+    def __init__(self, base_path):
+        """
+        Initialize the blob stored next to a data file.
+
+        Args:
+            base_path: Path prefix of the blob files, e.g. the data file plus ".notes"
+        """
+        self.base_path = base_path
+        self._handles = {}
+        # Handles are shared, so a seek and its read must not interleave
+        self._lock = threading.Lock()
+
+    def path(self, generation):
+        """Return the path of the blob file of a generation."""
+        return f"{self.base_path}.{generation}"
+
+    def generations(self):
+        """
+        List the generations present on disk.
+
+        Returns:
+            list: Generation numbers in ascending order
+        """
+        directory = os.path.dirname(os.path.abspath(self.base_path))
+        prefix = os.path.basename(self.base_path) + "."
+        generations = []
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                generations.append(int(suffix))
+        return sorted(generations)
+
+    @property
+    def latest_generation(self):
+        """The newest generation, or None if there is no blob yet."""
+        generations = self.generations()
+        return generations[-1] if generations else None
+
+    def size(self, generation):
+        """Return the size in bytes of a generation, 0 if it does not exist."""
+        try:
+            return os.path.getsize(self.path(generation))
+        except FileNotFoundError:
+            return 0
+
+    def read_bytes(self, ref):
+        """
+        Read the raw bytes of one note.
+
+        Args:
+            ref: [generation, offset, length] reference
+
+        Returns:
+            bytes: The encoded note
+        """
+        generation, offset, length = ref
+        with self._lock:
+            handle = self._handles.get(generation)
+            if handle is None:
+                handle = open(self.path(generation), 'rb')
+                self._handles[generation] = handle
+            handle.seek(offset)
+            return handle.read(length)
+
+    def read(self, ref):
+        """
+        Read one note.
+
+        Args:
+            ref: [generation, offset, length] reference
+
+        Returns:
+            str: The note
+        """
+        return self.read_bytes(ref).decode('utf-8')
+
+    def append(self, generation, chunks):
+        """
+        Durably append encoded notes to a generation, creating it if needed.
+
+        Args:
+            generation: Generation to append to
+            chunks: List of bytes objects
+
+        Returns:
+            list: [generation, offset, length] reference of each chunk
+        """
+        refs = []
+        if not chunks:
+            return refs
+        with open(self.path(generation), 'ab') as f:
+            offset = f.tell()
+            for chunk in chunks:
+                refs.append([generation, offset, len(chunk)])
+                offset += len(chunk)
+            f.write(b''.join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+        return refs
+
+    def remove_generations(self, keep=None):
+        """
+        Delete the blob files of all generations except one.
+
+        Args:
+            keep: Generation to keep, or None to delete the whole blob
+        """
+        for generation in self.generations():
+            if generation == keep:
+                continue
+            with self._lock:
+                handle = self._handles.pop(generation, None)
+                if handle is not None:
+                    handle.close()
+            try:
+                os.remove(self.path(generation))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Close the file handles kept open for reading."""
+        with self._lock:
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
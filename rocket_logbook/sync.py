@@ -0,0 +1,316 @@
+import json
+import hashlib
+from rocket_logbook.integrity import DataFileDamagedError
+
+# Number of buckets records are spread over by ID. Replicas are compared
+# bucket by bucket, so only buckets holding changed records are looked into.
+NUM_BUCKETS = 256
+
+def record_hash(row):
+    """
+    Content hash of a record dictionary, including its ID.
+
+    Args:
+        row: Record dictionary
+
+    Returns:
+        str: Hex digest that changes whenever any field of the record changes
+    """
+    data = json.dumps(row, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class RecordSummary:
+    """
+    Per-record hashes of a logbook, grouped into buckets by record ID.
+
+    Each bucket digest is the XOR of the hashes of its records, so it does
+    not depend on record order and can be updated in constant time when a
+    single record is added, changed or removed. Two replicas whose digests
+    match for a bucket hold the same records in it.
+    """
+
+    def __init__(self):
+        """Initialize an empty summary."""
+        self.buckets = [{} for _ in range(NUM_BUCKETS)]
+        self.digests = [0] * NUM_BUCKETS
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a summary from record dictionaries.
+
+        Args:
+            rows: Iterable of record dictionaries
+
+        Returns:
+            RecordSummary: Summary of the rows
+        """
+        summary = cls()
+        for row in rows:
+            summary.set(row['id'], record_hash(row))
+        return summary
+
+    def get(self, record_id):
+        """Return the hash of a record, or None if the ID is not present."""
+        return self.buckets[record_id % NUM_BUCKETS].get(record_id)
+
+    def set(self, record_id, digest):
+        """
+        Set or remove the hash of a record.
+
+        Args:
+            record_id: ID of the record
+            digest: Hash from record_hash, or None to remove the record
+        """
+        index = record_id % NUM_BUCKETS
+        bucket = self.buckets[index]
+        old = bucket.pop(record_id, None)
+        if old is not None:
+            self.digests[index] ^= int(old, 16)
+        if digest is not None:
+            bucket[record_id] = digest
+            self.digests[index] ^= int(digest, 16)
+
+    def apply(self, changes):
+        """
+        Apply the changes of one mutation.
+
+        Args:
+            changes: List of {'before': row or None, 'after': row or None}
+        """
+        for change in changes:
+            if change['before'] is not None:
+                self.set(change['before']['id'], None)
+            if change['after'] is not None:
+                self.set(change['after']['id'], record_hash(change['after']))
+
+    def hashes(self):
+        """Return a dictionary mapping every record ID to its hash."""
+        result = {}
+        for bucket in self.buckets:
+            result.update(bucket)
+        return result
+
+    def differing_ids(self, other):
+        """
+        Find the IDs that may differ between two summaries.
+
+        Args:
+            other: RecordSummary of another replica
+
+        Returns:
+            set: IDs in buckets whose digests differ
+        """
+        ids = set()
+        for index in range(NUM_BUCKETS):
+            if self.digests[index] != other.digests[index]:
+                ids.update(self.buckets[index])
+                ids.update(other.buckets[index])
+        return ids
+
+    def to_dict(self):
+        """
+        Convert the summary to a dictionary for JSON serialization.
+
+        Returns:
+            dict: Dictionary mapping record IDs (as strings) to hashes
+        """
+        return {str(record_id): digest for record_id, digest in self.hashes().items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a summary from its dictionary representation.
+
+        Args:
+            data: Dictionary produced by to_dict
+
+        Returns:
+            RecordSummary: The restored summary
+        """
+        summary = cls()
+        for record_id, digest in data.items():
+            summary.set(int(record_id), digest)
+        return summary
+
+class SyncReport:
+    """Outcome of synchronizing two logbooks."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.compared = 0
+        self.copied_to_a = []
+        self.copied_to_b = []
+        self.deleted_from_a = []
+        self.deleted_from_b = []
+        self.remapped = []
+        self.conflicts = []
+
+    @property
+    def changed(self):
+        """Whether either logbook was modified."""
+        return bool(self.copied_to_a or self.copied_to_b or self.deleted_from_a
+                    or self.deleted_from_b or self.remapped)
+
+    def to_dict(self):
+        """
+        Convert the report to a dictionary for JSON serialization.
+
+        Returns:
+            dict: Dictionary representation of the report
+        """
+        return {
+            'compared': self.compared,
+            'copied_to_a': self.copied_to_a,
+            'copied_to_b': self.copied_to_b,
+            'deleted_from_a': self.deleted_from_a,
+            'deleted_from_b': self.deleted_from_b,
+            'remapped': [{'old_id': old_id, 'new_id': new_id} for old_id, new_id in self.remapped],
+            'conflicts': [{'id': record_id, 'reason': reason} for record_id, reason in self.conflicts]
+        }
+
+def _same_launch(row_a, row_b):
+    """Whether two versions of a record plausibly describe the same launch."""
+    return row_a['date'] == row_b['date'] and row_a['rocket_name'] == row_b['rocket_name']
+
+def _load_rows(data_manager, ids):
+    """
+    Read the record dictionaries with the given IDs from a logbook.
+
+    Raises:
+        DataFileDamagedError: If the data file cannot be read
+    """
+    if not ids:
+        return {}
+    try:
+        return {record.id: record.to_dict() for record in data_manager.iter_records() if record.id in ids}
+    except (json.JSONDecodeError, UnicodeDecodeError, EOFError):
+        raise DataFileDamagedError(f"The data file {data_manager.data_file} is damaged; "
+                                   f"recover it before comparing it with another logbook")
+
+def sync_logbooks(manager_a, manager_b, prefer=None):
+    """
+    Two-way synchronize two replicas of a logbook.
+
+    Both replicas remember the record hashes they agreed on at the end of the
+    previous sync. Against that common base each differing record can be
+    classified as changed on one side, changed on both (a conflict), deleted
+    on one side or newly created. New records that were given the same ID on
+    both sides are kept on both, with the record from B moved to a fresh ID,
+    unless they share a date and rocket and so may be one launch edited
+    differently, which is reported as a conflict.
+
+    Comparison works on the record summaries, so only buckets that differ are
+    examined and only the differing records are read from the data files.
+
+    Args:
+        manager_a: DataManager of the first replica
+        manager_b: DataManager of the second replica
+        prefer: 'a' or 'b' to resolve conflicts in favour of that replica;
+            by default conflicting records are left untouched and reported
+
+    Returns:
+        SyncReport: What was copied, deleted, remapped and left in conflict
+
+    Raises:
+        DataFileDamagedError: If either data file cannot be read; nothing
+            is changed
+    """
+    report = SyncReport()
+    summary_a = manager_a.get_record_summary()
+    summary_b = manager_b.get_record_summary()
+    base = manager_a.get_sync_base(manager_b.data_file)
+    if base is None:
+        base = manager_b.get_sync_base(manager_a.data_file)
+
+    ids = summary_a.differing_ids(summary_b)
+    report.compared = len(ids)
+    candidates = {record_id for record_id in ids if summary_a.get(record_id) != summary_b.get(record_id)}
+
+    rows_a = _load_rows(manager_a, candidates)
+    rows_b = _load_rows(manager_b, candidates)
+
+    to_a, to_b = {}, {}
+    delete_a, delete_b = set(), set()
+    collisions = []
+    conflict_ids = set()
+
+    def conflict(record_id, reason):
+        if prefer == 'a':
+            if record_id in rows_a:
+                to_b[record_id] = rows_a[record_id]
+            else:
+                delete_b.add(record_id)
+        elif prefer == 'b':
+            if record_id in rows_b:
+                to_a[record_id] = rows_b[record_id]
+            else:
+                delete_a.add(record_id)
+        else:
+            conflict_ids.add(record_id)
+        report.conflicts.append((record_id, reason))
+
+    for record_id in sorted(candidates):
+        hash_a = summary_a.get(record_id)
+        hash_b = summary_b.get(record_id)
+        hash_base = base.get(record_id) if base is not None else None
+
+        if hash_a is not None and hash_b is not None:
+            if hash_base == hash_a:
+                to_a[record_id] = rows_b[record_id]
+            elif hash_base == hash_b:
+                to_b[record_id] = rows_a[record_id]
+            elif hash_base is not None:
+                conflict(record_id, "changed in both logbooks")
+            elif _same_launch(rows_a[record_id], rows_b[record_id]):
+                # Without a common base an edit cannot be told apart from a
+                # new record, so the same launch is reported as a conflict
+                conflict(record_id, "differs between logbooks")
+            else:
+                collisions.append(record_id)
+        elif hash_a is not None:
+            if hash_base is None:
+                to_b[record_id] = rows_a[record_id]
+            elif hash_base == hash_a:
+                delete_a.add(record_id)
+            else:
+                conflict(record_id, "changed in A but deleted in B")
+        else:
+            if hash_base is None:
+                to_a[record_id] = rows_b[record_id]
+            elif hash_base == hash_b:
+                delete_b.add(record_id)
+            else:
+                conflict(record_id, "changed in B but deleted in A")
+
+    if collisions:
+        next_id = max(manager_a.get_next_id(), manager_b.get_next_id())
+        for record_id in collisions:
+            row = dict(rows_b[record_id], id=next_id)
+            report.remapped.append((record_id, next_id))
+            # B's record moves to the new ID in both logbooks, A's record keeps the old one
+            to_a[next_id] = row
+            to_b[next_id] = row
+            to_b[record_id] = rows_a[record_id]
+            next_id += 1
+
+    remapped_ids = {new_id for _old_id, new_id in report.remapped}
+    report.copied_to_a = sorted(record_id for record_id in to_a if record_id not in remapped_ids)
+    report.copied_to_b = sorted(record_id for record_id in to_b if record_id not in remapped_ids)
+    report.deleted_from_a = sorted(delete_a)
+    report.deleted_from_b = sorted(delete_b)
+
+    manager_a.replace_records(to_a, delete_a)
+    manager_b.replace_records(to_b, delete_b)
+
+    # Record the agreed state; conflicting records keep their old base so
+    # they are reported again until resolved
+    new_base = manager_a.get_record_summary().hashes()
+    for record_id in conflict_ids:
+        new_base.pop(record_id, None)
+        if base is not None and record_id in base:
+            new_base[record_id] = base[record_id]
+    manager_a.set_sync_base(manager_b.data_file, new_base)
+    manager_b.set_sync_base(manager_a.data_file, new_base)
+
+    return report
@@ -0,0 +1,339 @@
+import threading
+from contextlib import contextmanager
+from rocket_logbook.data_manager import DataManager, STATS_SNAPSHOT_VERSION
+from rocket_logbook.models import record_view_type
+from rocket_logbook.stats import summarize_records
+
+class ReadWriteLock:
+    """
+    Reader-writer lock that lets many readers in at once and writers alone.
+
+    Writers are preferred: once a writer is waiting, new readers wait too,
+    so a steady stream of reads cannot starve writes. Both sides are
+    reentrant, and the thread holding the write lock may also take the read
+    lock, so locked methods can call each other. Upgrading a read lock to a
+    write lock is not supported, since two upgrading readers would deadlock.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        """Acquire the lock for reading, blocking while a writer holds or awaits it."""
+        local = self._local
+        depth = getattr(local, 'read_depth', 0)
+        if depth or self._writer == threading.get_ident():
+            local.read_depth = depth + 1
+            return
+
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        local.read_depth = 1
+
+    def release_read(self):
+        """Release a read acquisition."""
+        local = self._local
+        local.read_depth -= 1
+        if local.read_depth or self._writer == threading.get_ident():
+            return
+
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Acquire the lock for writing, blocking until all readers have left.
+
+        Raises:
+            RuntimeError: If the calling thread holds only a read lock
+        """
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, 'read_depth', 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        """Release a write acquisition."""
+        with self._condition:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    def holds_write(self):
+        """Return whether the calling thread holds the write lock."""
+        return self._writer == threading.get_ident()
+
+    @contextmanager
+    def read_locked(self):
+        """Context manager holding the lock for reading."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """Context manager holding the lock for writing."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class _Snapshot:
+    """Immutable in-memory copy of the logbook as of one fingerprint."""
+
+    __slots__ = ('records', 'by_id', 'fingerprint', 'max_id', 'statistics')
+
+    def __init__(self, records, fingerprint, rejected_rows):
+        self.records = records
+        self.by_id = {record.id: record for record in records}
+        self.fingerprint = fingerprint
+        ids = list(self.by_id)
+        ids.extend(row['id'] for row in rejected_rows
+                   if isinstance(row, dict) and type(row.get('id')) is int)
+        self.max_id = max(ids, default=0)
+        self.statistics = None
+
+def _reader(method):
+    """Run a method with the read lock held."""
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read_locked():
+            return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+def _writer(method):
+    """Run a method with the write lock held."""
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write_locked():
+            return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+class ThreadSafeDataManager(DataManager):
+    """
+    DataManager that can be shared between threads.
+
+    Reads are served from an in-memory snapshot of the logbook under a
+    shared read lock, so they run in parallel and do not touch the data
+    file. Every mutation holds the write lock for its whole
+    read-modify-write, so concurrent writers are serialized and no write is
+    lost. The snapshot is replaced after each write and reloaded if the data
+    file was changed by another process, which costs one stat per read.
+
+    Records returned by read methods are shared with the snapshot and must
+    not be modified in place; pass a new LaunchRecord to update_record.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the data manager; accepts the same arguments as DataManager."""
+        self.lock = ReadWriteLock()
+        self._snapshot = None
+        super().__init__(*args, **kwargs)
+
+    def _get_snapshot(self):
+        """Return a current snapshot, loading the data file if needed."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.fingerprint == self.get_fingerprint():
+            return snapshot
+
+        with self.lock.write_locked():
+            snapshot = self._snapshot
+            fingerprint = self.get_fingerprint()
+            if snapshot is None or snapshot.fingerprint != fingerprint:
+                records = super().get_all_records()
+                snapshot = _Snapshot(records, fingerprint, self.rejected_rows)
+                self._snapshot = snapshot
+            return snapshot
+
+    def get_all_records(self):
+        """Retrieve all valid launch records from the in-memory snapshot."""
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return list(snapshot.records)
+
+    def get_record_by_id(self, record_id):
+        """
+        Retrieve a specific launch record by ID.
+
+        Args:
+            record_id: The ID of the record to retrieve
+
+        Returns:
+            LaunchRecord object if found, None otherwise
+        """
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return snapshot.by_id.get(record_id)
+
+    def get_next_id(self):
+        """Generate the next available ID for a new record."""
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return snapshot.max_id + 1
+
+    def get_views(self, fields):
+        """
+        Retrieve all valid records holding only the requested fields.
+
+        Args:
+            fields: Tuple of field names, as for DataManager.iter_views
+
+        Returns:
+            List of named tuples built from the in-memory snapshot
+        """
+        view_type = record_view_type(tuple(fields))
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return [view_type._make([getattr(record, field) for field in view_type._fields])
+                    for record in snapshot.records]
+
+    def search_records(self, search_term):
+        """
+        Search the in-memory snapshot for records matching a search term.
+
+        Args:
+            search_term: String to search for in dates or rocket names/types
+
+        Returns:
+            List of matching LaunchRecord objects
+        """
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return self.filter_records(snapshot.records, search_term)
+
+    def get_top_records(self, n, field='altitude', smallest=False, per=None):
+        """
+        Retrieve the records with the largest (or smallest) values of a field.
+
+        Args:
+            n: Number of records, per group if per is given
+            field: Name of a field in ranking.SORT_FIELDS
+            smallest: Select the smallest values instead
+            per: 'rocket' or 'motor' to select the top n of each group
+    
+        Returns:
+            list: Records from the in-memory snapshot, best first, or a dict
+                of such lists per group
+        """
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            return self._select_top_records(snapshot.records, n, field, smallest, per)
+
+    def get_statistics_snapshot(self, verify_hash=False):
+        """
+        Get statistics, monthly counts, success rates and breakdowns for the logbook.
+
+        Computed once per snapshot from memory in a single pass; the
+        statistics sidecar is neither read nor written.
+
+        Args:
+            verify_hash: Accepted for compatibility; the snapshot is always current
+
+        Returns:
+            dict: Dictionary with the same entries as DataManager.get_statistics_snapshot
+        """
+        snapshot = self._get_snapshot()
+        with self.lock.read_locked():
+            if snapshot.statistics is None:
+                # Racing readers compute the same value, so either result may win
+                summary = summarize_records(snapshot.records)
+                snapshot.statistics = {
+                    'version': STATS_SNAPSHOT_VERSION,
+                    'fingerprint': snapshot.fingerprint,
+                    'statistics': summary['statistics'],
+                    'monthly_launch_count': summary['monthly_launch_count'],
+                    'rocket_success_rates': summary['rocket_success_rates'],
+                    'impulse_class_altitudes': [list(pair) for pair in summary['impulse_class_altitudes'].items()],
+                    'delay_success_rates': [list(pair) for pair in summary['delay_success_rates'].items()]
+                }
+            return snapshot.statistics
+
+    def add_new_record(self, record):
+        """
+        Assign the next available ID to a record and add it atomically.
+
+        Calling get_next_id and add_record separately lets two threads pick
+        the same ID; this does both under the write lock.
+
+        Args:
+            record: LaunchRecord object to add; its id is overwritten
+
+        Returns:
+            int: The ID given to the record
+        """
+        with self.lock.write_locked():
+            record.id = self.get_next_id()
+            self.add_record(record)
+            return record.id
+
+    add_record = _writer(DataManager.add_record)
+    add_records = _writer(DataManager.add_records)
+    update_record = _writer(DataManager.update_record)
+    delete_record = _writer(DataManager.delete_record)
+    merge_duplicates = _writer(DataManager.merge_duplicates)
+    replace_records = _writer(DataManager.replace_records)
+    as_of = _reader(DataManager.as_of)
+    get_altitude_sketches = _reader(DataManager.get_altitude_sketches)
+
+    def undo(self):
+        """Undo the most recent change; see DataManager.undo."""
+        with self.lock.write_locked():
+            try:
+                return super().undo()
+            finally:
+                self._snapshot = None
+
+    def recover(self):
+        """Rewrite a damaged data file with the records that can be recovered; see DataManager.recover."""
+        with self.lock.write_locked():
+            try:
+                return super().recover()
+            finally:
+                self._snapshot = None
+
+    def _publish_validation(self, report, rejected_rows):
+        """
+        Keep the outcome of a validation pass only if it ran under the write lock.
+
+        Streaming readers such as get_altitude_sketches run under the shared read lock, so
+        publishing there would race with writers that save rejected_rows.
+        The snapshot load and every write validate under the write lock.
+        """
+        if self.lock.holds_write():
+            super()._publish_validation(report, rejected_rows)
+
+    def _commit(self, records, op, changes):
+        """Save the records and replace the in-memory snapshot with them."""
+        with self.lock.write_locked():
+            try:
+                super()._commit(records, op, changes)
+            except BaseException:
+                self._snapshot = None
+                raise
+            self._snapshot = _Snapshot(list(records), self.get_fingerprint(), self.rejected_rows)
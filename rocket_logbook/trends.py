@@ -0,0 +1,195 @@
+import csv
+from collections import deque
+from datetime import date as Date
+from rocket_logbook.ranking import sort_records
+
+# Default length of the rolling window in days
+DEFAULT_WINDOW_DAYS = 30
+
+# Record fields the trend engine reads
+TREND_FIELDS = ('id', 'date', 'rocket_name', 'altitude', 'success')
+
+# Columns of the overall and per-rocket trend rows
+TREND_COLUMNS = ('date', 'launches', 'launches_per_week', 'success_rate', 'mean_altitude')
+ROCKET_TREND_COLUMNS = ('date', 'rocket', 'launches', 'success_rate', 'mean_altitude')
+
+class _Window:
+    """Running count, successes and altitude sum of the launches in a window."""
+
+    __slots__ = ('count', 'successes', 'altitude')
+
+    def __init__(self):
+        """Create an empty window."""
+        self.count = 0
+        self.successes = 0
+        self.altitude = 0.0
+
+    def add(self, altitude, success, sign=1):
+        """
+        Add a launch to the running sums, or remove one.
+
+        Args:
+            altitude: Altitude of the launch
+            success: Whether the launch succeeded
+            sign: 1 to add the launch, -1 to remove it as it leaves the window
+        """
+        self.count += sign
+        self.successes += sign if success else 0
+        self.altitude += sign * altitude
+
+    def row(self):
+        """Launch count, success rate (%) and mean altitude of the window."""
+        if not self.count:
+            return 0, 0.0, 0.0
+        return self.count, self.successes / self.count * 100, self.altitude / self.count
+
+class TrendEngine:
+    """
+    Rolling-window trends over launches in date order.
+
+    For each launch date the engine reports, over the window of the last
+    window_days days up to and including that date, the number of
+    launches, launches per week, the success rate and the mean altitude,
+    both overall and for the rocket(s) launched that day.
+
+    Launches enter and leave the window through a deque, and running sums
+    are updated as they do, so each launch costs O(1) however long the
+    window is. The engine keeps its state between calls, so launches
+    logged later (with IDs above max_id) can be added with extend
+    without reading the earlier ones again.
+    """
+
+    def __init__(self, window_days=DEFAULT_WINDOW_DAYS):
+        """
+        Create an engine with an empty window.
+
+        Args:
+            window_days: Length of the rolling window in days
+
+        Raises:
+            ValueError: If the window is shorter than a day
+        """
+        if window_days < 1:
+            raise ValueError("The trend window must be at least 1 day")
+        self.window_days = window_days
+        self.points = []
+        self.rocket_points = []
+        self.max_id = None
+        self._window = deque()
+        self._overall = _Window()
+        self._rockets = {}
+        self._day = None
+        self._day_rockets = {}
+
+    def add(self, record):
+        """
+        Add the next launch.
+
+        Args:
+            record: Record or view with the TREND_FIELDS, dated no earlier
+                than the launches added so far
+
+        Raises:
+            ValueError: If the launch is dated before the last one added
+        """
+        day = Date.fromisoformat(record.date).toordinal()
+        if self._day is not None and day < self._day:
+            raise ValueError(f"Launch {record.id} on {record.date} is earlier than the launches "
+                             f"already added; rebuild the trends instead")
+
+        # Evict the launches that have left the window
+        window = self._window
+        start = day - self.window_days
+        while window and window[0][0] <= start:
+            _day, rocket, altitude, success = window.popleft()
+            self._overall.add(altitude, success, -1)
+            rocket_window = self._rockets[rocket]
+            rocket_window.add(altitude, success, -1)
+            if not rocket_window.count:
+                del self._rockets[rocket]
+
+        altitude = float(record.altitude)
+        window.append((day, record.rocket_name, altitude, record.success))
+        self._overall.add(altitude, record.success)
+        rocket_window = self._rockets.get(record.rocket_name)
+        if rocket_window is None:
+            rocket_window = self._rockets[record.rocket_name] = _Window()
+        rocket_window.add(altitude, record.success)
+
+        # Later launches on the same day replace that day's points
+        if day != self._day:
+            self._day = day
+            self._day_rockets = {}
+            self.points.append(None)
+        count, success_rate, mean_altitude = self._overall.row()
+        self.points[-1] = {
+            'date': record.date,
+            'launches': count,
+            'launches_per_week': count * 7 / self.window_days,
+            'success_rate': success_rate,
+            'mean_altitude': mean_altitude
+        }
+        index = self._day_rockets.get(record.rocket_name)
+        if index is None:
+            index = self._day_rockets[record.rocket_name] = len(self.rocket_points)
+            self.rocket_points.append(None)
+        count, success_rate, mean_altitude = rocket_window.row()
+        self.rocket_points[index] = {
+            'date': record.date,
+            'rocket': record.rocket_name,
+            'launches': count,
+            'success_rate': success_rate,
+            'mean_altitude': mean_altitude
+        }
+        if self.max_id is None or record.id > self.max_id:
+            self.max_id = record.id
+
+    def extend(self, records):
+        """
+        Add launches in date order, e.g. the ones appended since the last call.
+
+        Args:
+            records: Iterable of records or views with the TREND_FIELDS,
+                sorted by date and dated no earlier than the launches
+                added so far
+
+        Returns:
+            int: Number of launches added
+
+        Raises:
+            ValueError: If a launch is out of date order; the launches
+                before it remain added
+        """
+        added = 0
+        for record in records:
+            self.add(record)
+            added += 1
+        return added
+
+def compute_trends(records, window_days=DEFAULT_WINDOW_DAYS):
+    """
+    Compute rolling-window trends over launches in any order.
+
+    Args:
+        records: Iterable of records or views with the TREND_FIELDS
+        window_days: Length of the rolling window in days
+
+    Returns:
+        TrendEngine: Engine holding the trend points, ready to be extended
+    """
+    engine = TrendEngine(window_days)
+    engine.extend(sort_records(records, 'date'))
+    return engine
+
+def write_trends_csv(stream, points, columns=TREND_COLUMNS):
+    """
+    Write trend points as CSV for plotting.
+
+    Args:
+        stream: Text file object opened with newline=''
+        points: Trend point dictionaries, e.g. TrendEngine.points
+        columns: Columns to write, TREND_COLUMNS or ROCKET_TREND_COLUMNS
+    """
+    writer = csv.DictWriter(stream, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(points)
@@ -1,6 +1,6 @@
 import os
-import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from rocket_logbook.validation import is_valid_date
 
 def validate_date(date_str):
     """
@@ -12,16 +12,8 @@ def validate_date(date_str):
     Returns:
         bool: True if valid, False otherwise
     """
-    # Basic format validation using regex
-    if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-        return False
-    
-    # Validate it can be parsed as a date
-    try:
-        datetime.strptime(date_str, '%Y-%m-%d')
-        return True
-    except ValueError:
-        return False
+    # Compiled pattern plus a cached calendar check, shared with batch validation
+    return is_valid_date(date_str)
 
 def clear_screen():
     """Clear the terminal screen."""
@@ -46,4 +38,27 @@ def format_date_for_display(date_str):
         date_obj = datetime.strptime(date_str, '%Y-%m-%d')
         return date_obj.strftime('%B %d, %Y')
     except (ValueError, TypeError):
-        return date_str  # Return original if formatting fails
\ No newline at end of file
+        return date_str  # Return original if formatting fails
+
+def parse_timestamp(value):
+    """
+    Parse a point in time given on the command line.
+    
+    Args:
+        value: "YYYY-MM-DD" (meaning the end of that day), "YYYY-MM-DD HH:MM",
+            "YYYY-MM-DDTHH:MM" or either of those with seconds, in local time
+        
+    Returns:
+        datetime: Parsed local time, or None if the value is not recognised
+    """
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+    return day + timedelta(days=1) - timedelta(microseconds=1)
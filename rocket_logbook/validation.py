@@ -0,0 +1,266 @@
+import re
+import math
+from datetime import date
+from functools import lru_cache
+
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Fields of a stored launch record and the types they must have
+FIELD_TYPES = {
+    'id': int,
+    'date': str,
+    'rocket_name': str,
+    'motor_type': str,
+    'altitude': (int, float),
+    'success': bool,
+    'notes': str,
+}
+REQUIRED_FIELDS = frozenset(field for field in FIELD_TYPES if field != 'notes')
+ALL_FIELDS = frozenset(FIELD_TYPES)
+
+# Fields of a record whose notes are stored out of line; notes_ref is
+# [generation, offset, length] in the notes blob
+NOTES_REF_FIELDS = REQUIRED_FIELDS | {'notes_ref'}
+STORED_FIELDS = ALL_FIELDS | {'notes_ref'}
+
+# Upper bound on a plausible altitude in meters
+MAX_ALTITUDE = 1000000
+
+@lru_cache(maxsize=65536)
+def is_valid_date(date_str):
+    """
+    Check that a string is a real calendar date in YYYY-MM-DD format.
+
+    Results are cached, since a logbook only has a few thousand distinct dates.
+
+    Args:
+        date_str: String to validate
+
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    if not isinstance(date_str, str) or not DATE_PATTERN.match(date_str):
+        return False
+    try:
+        date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+        return True
+    except ValueError:
+        return False
+
+class ValidationIssue:
+    """A single problem found while validating a record."""
+
+    __slots__ = ('index', 'record_id', 'field', 'message')
+
+    def __init__(self, index, record_id, field, message):
+        """
+        Initialize a validation issue.
+
+        Args:
+            index (int): Position of the row in the validated batch or file
+            record_id: ID of the record, None if it has no usable ID
+            field (str): Name of the offending field, None for the row as a whole
+            message (str): Description of the problem
+        """
+        self.index = index
+        self.record_id = record_id
+        self.field = field
+        self.message = message
+
+    def to_dict(self):
+        """
+        Convert the issue to a dictionary.
+
+        Returns:
+            dict: Dictionary representation of the issue
+        """
+        return {
+            'index': self.index,
+            'record_id': self.record_id,
+            'field': self.field,
+            'message': self.message
+        }
+
+    def __str__(self):
+        """Return a readable description of the issue."""
+        location = f"row {self.index}"
+        if self.record_id is not None:
+            location += f" (id {self.record_id})"
+        if self.field:
+            return f"{location}: {self.field}: {self.message}"
+        return f"{location}: {self.message}"
+
+class ValidationReport:
+    """Structured result of validating a batch of records."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.checked = 0
+        self.valid = 0
+        self.issues = []
+        self.rejected_indexes = []
+
+    @property
+    def ok(self):
+        """Whether every checked record was valid."""
+        return not self.issues
+
+    @property
+    def rejected(self):
+        """Number of rows rejected."""
+        return len(self.rejected_indexes)
+
+    def merge(self, other):
+        """
+        Combine another report into this one.
+
+        Args:
+            other: ValidationReport to merge in
+        """
+        self.checked += other.checked
+        self.valid += other.valid
+        self.issues.extend(other.issues)
+        self.rejected_indexes.extend(other.rejected_indexes)
+
+    def to_dict(self):
+        """
+        Convert the report to a dictionary.
+
+        Returns:
+            dict: Dictionary representation of the report
+        """
+        return {
+            'checked': self.checked,
+            'valid': self.valid,
+            'rejected': self.rejected,
+            'issues': [issue.to_dict() for issue in self.issues]
+        }
+
+def check_record_fields(row):
+    """
+    Check every field of a single record.
+
+    Args:
+        row: Dictionary of record fields
+
+    Returns:
+        list: List of (field, message) tuples, empty if the record is valid
+    """
+    if not isinstance(row, dict):
+        return [(None, f"expected an object, got {type(row).__name__}")]
+
+    problems = []
+    for field in sorted(REQUIRED_FIELDS - row.keys()):
+        problems.append((field, "missing"))
+    for field in sorted(row.keys() - STORED_FIELDS):
+        problems.append((field, "unknown field"))
+    if 'notes_ref' in row:
+        if 'notes' in row:
+            problems.append(('notes_ref', "cannot be combined with notes"))
+        elif not is_notes_ref(row['notes_ref']):
+            problems.append(('notes_ref', "must be a list of generation, offset and length"))
+
+    for field, expected in FIELD_TYPES.items():
+        if field not in row:
+            continue
+        value = row[field]
+        # bool is a subclass of int, but True is not a valid ID or altitude
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            problems.append((field, f"expected {_type_name(expected)}, got {type(value).__name__}"))
+            continue
+
+        if field == 'id' and value <= 0:
+            problems.append((field, "must be a positive integer"))
+        elif field == 'date' and not is_valid_date(value):
+            problems.append((field, "must be a valid date in YYYY-MM-DD format"))
+        elif field == 'altitude' and not (0 <= value <= MAX_ALTITUDE):
+            if isinstance(value, float) and math.isnan(value):
+                problems.append((field, "must be a number"))
+            else:
+                problems.append((field, f"must be between 0 and {MAX_ALTITUDE} meters"))
+
+    return problems
+
+def is_notes_ref(value):
+    """Check that a value is a [generation, offset, length] reference into the notes blob."""
+    return (type(value) is list and len(value) == 3
+            and all(type(item) is int and item >= 0 for item in value))
+
+def _type_name(expected):
+    """Readable name for an expected type or tuple of types."""
+    if isinstance(expected, tuple):
+        return "number"
+    return {int: "integer", str: "string", bool: "boolean"}[expected]
+
+def validate_batch(rows, seen_ids=None, start_index=0):
+    """
+    Validate a batch of raw records.
+
+    Well-formed rows take a fast path that only checks exact types and the
+    cached date lookup; only rows that fail it are examined field by field.
+
+    Args:
+        rows: Iterable of dictionaries as stored in the data file
+        seen_ids: Set of IDs already used by earlier batches; updated in place
+            so duplicate IDs are caught across batches
+        start_index: Index of the first row, used in the report
+
+    Returns:
+        tuple: (list of valid rows, ValidationReport)
+    """
+    if seen_ids is None:
+        seen_ids = set()
+    report = ValidationReport()
+    valid_rows = []
+    append = valid_rows.append
+    seen_add = seen_ids.add
+
+    # Dates already known to be valid in this batch; cheaper than the cache
+    valid_dates = set()
+    all_fields = ALL_FIELDS
+    notes_ref_fields = NOTES_REF_FIELDS
+
+    index = start_index - 1
+    for index, row in enumerate(rows, start_index):
+        # Fast path: exact type checks only, no messages are built
+        if type(row) is dict and ((row.keys() == all_fields and type(row['notes']) is str)
+                                  or (row.keys() == notes_ref_fields and is_notes_ref(row['notes_ref']))):
+            record_id = row['id']
+            date_str = row['date']
+            altitude = row['altitude']
+            if (type(record_id) is int and record_id > 0
+                    and type(row['rocket_name']) is str
+                    and type(row['motor_type']) is str
+                    and (type(altitude) is float or type(altitude) is int)
+                    and 0 <= altitude <= MAX_ALTITUDE
+                    and type(row['success']) is bool
+                    and type(date_str) is str
+                    and (date_str in valid_dates or (is_valid_date(date_str) and not valid_dates.add(date_str)))):
+                if record_id not in seen_ids:
+                    seen_add(record_id)
+                    append(row)
+                    continue
+                report.issues.append(ValidationIssue(index, record_id, 'id', f"duplicate id {record_id}"))
+                report.rejected_indexes.append(index)
+                continue
+
+        # Slow path: examine every field to describe what is wrong
+        problems = check_record_fields(row)
+        record_id = row.get('id') if isinstance(row, dict) else None
+        if not isinstance(record_id, int) or isinstance(record_id, bool):
+            record_id = None
+        if not problems:
+            if record_id in seen_ids:
+                problems = [('id', f"duplicate id {record_id}")]
+            else:
+                seen_add(record_id)
+                append(row)
+                continue
+
+        for field, message in problems:
+            report.issues.append(ValidationIssue(index, record_id, field, message))
+        report.rejected_indexes.append(index)
+
+    report.checked = index - start_index + 1
+    report.valid = len(valid_rows)
+    return valid_rows, report
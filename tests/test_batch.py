@@ -0,0 +1,60 @@
+import io
+import json
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.batch import BatchError, BatchRunner, parse_command, run_batch
+from rocket_logbook.stats import summarize_records
+
+def launch(record_id, rocket_name="Alpha", altitude=300.0, success=True):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=altitude, success=success)
+
+def run(manager, text):
+    output = io.StringIO()
+    failures = run_batch(manager, text.splitlines(), output)
+    return failures, [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_parse_command_accepts_words_and_json():
+    assert parse_command('add date=2024-06-01 rocket_name="Big Bertha" altitude=250 success=yes') == \
+        ('add', {'date': "2024-06-01", 'rocket_name': "Big Bertha", 'altitude': 250.0, 'success': True})
+    assert parse_command('{"op": "delete", "id": 3}') == ('delete', {'id': 3})
+    assert parse_command('search Alpha') == ('search', {'term': "Alpha"})
+    assert parse_command('  # comment') is None
+    with pytest.raises(BatchError):
+        parse_command('launch id=1')
+    with pytest.raises(BatchError):
+        parse_command('add altitude=high')
+
+def test_batch_writes_once_and_reports_failures(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_record(launch(1))
+    failures, results = run(manager, "\n".join([
+        'add date=2024-06-01 rocket_name=Beta motor_type=B6-4 altitude=150 success=true',
+        'update id=1 altitude=320',
+        'delete id=9',
+        'commit',
+    ]))
+
+    assert failures == 1
+    assert [result['ok'] for result in results] == [True, True, False, True, True]
+    assert results[0]['id'] == 2
+    assert results[3]['written'] == 2
+    assert results[4] == {'line': None, 'op': 'commit', 'ok': True, 'written': 0}
+    records = DataManager(manager.data_file).get_all_records()
+    assert [(record.id, record.altitude) for record in records] == [(1, 320.0), (2, 150.0)]
+
+def test_stats_include_pending_changes_in_one_summary(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2, "Beta", 500.0, False)])
+    runner = BatchRunner(manager)
+    runner.execute('add', {'date': "2024-07-01", 'rocket_name': "Beta", 'motor_type': "C6-5",
+                           'altitude': 450.0, 'success': True})
+
+    result = runner.execute('stats', {})
+    summary = summarize_records(runner.session.get_all_records())
+    assert result['statistics'] == summary['statistics']
+    assert result['statistics']['total_launches'] == 3
+    assert result['rocket_success_rates'] == summary['rocket_success_rates']
+    assert result['delay_success_rates'] == [list(pair) for pair in summary['delay_success_rates'].items()]
+    json.dumps(result)
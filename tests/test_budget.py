@@ -0,0 +1,88 @@
+import os
+import random
+import tempfile
+
+import pytest
+
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager, STATS_FIELDS
+from rocket_logbook.budget import (chunks, external_sort, format_size, group_limit, parse_size,
+                                   spilling_group_by, GROUP_MEMORY)
+from rocket_logbook.ranking import sort_records
+from rocket_logbook.stats import group_by
+
+def random_records(seed, count=500):
+    rng = random.Random(seed)
+    return [LaunchRecord(id=record_id, date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                         rocket_name=rng.choice(("Alpha", "Beta", "Gamma", "Ünïcode")),
+                         motor_type=rng.choice(("A8-3", "B6-4", "C6-5", "D12-P")),
+                         altitude=float(rng.randint(0, 50) * 10), success=rng.random() < 0.8,
+                         notes=rng.choice(("", "windy")))
+            for record_id in range(1, count + 1)]
+
+@pytest.fixture
+def spill_directory(tmp_path, monkeypatch):
+    directory = tmp_path / "spill"
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+@pytest.mark.parametrize("text, size", [("512", 512), ("512K", 512 * 1024), ("64m", 64 * 1024 ** 2),
+                                        ("64MiB", 64 * 1024 ** 2), ("1.5G", 3 * 1024 ** 3 // 2)])
+def test_parse_size(text, size):
+    assert parse_size(text) == size
+
+@pytest.mark.parametrize("text", ["", "M", "-1M", "64T", "lots"])
+def test_parse_size_rejects_invalid_sizes(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+def test_sizes_and_chunks():
+    assert format_size(3 * 1024 ** 2 // 2) == "1.5 MiB"
+    assert group_limit(10 * GROUP_MEMORY) == 10
+    assert group_limit(0) == 1
+    assert list(chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunks([], 3)) == []
+
+@pytest.mark.parametrize("field", ['altitude', 'date', 'rocket_name', 'success'])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_external_sort_matches_sort_records(spill_directory, field, reverse):
+    records = random_records(1)
+    result = list(external_sort(iter(records), field, reverse, chunk_size=64))
+    assert [record.to_dict() for record in result] == \
+        [record.to_dict() for record in sort_records(records, field, reverse)]
+    assert os.listdir(spill_directory) == []
+
+@pytest.mark.parametrize("keys", ['rocket', 'rocket,motor', 'impulse_class,delay'])
+def test_spilling_group_by_matches_group_by(spill_directory, keys):
+    records = random_records(2)
+    calls = []
+
+    def make_records():
+        calls.append(1)
+        return iter(records)
+
+    groups = spilling_group_by(make_records, keys, STATS_FIELDS, max_groups=3)
+    assert len(calls) == 2
+    assert {key: aggregate.result() for key, aggregate in groups.items()} == group_by(records, keys)
+    assert os.listdir(spill_directory) == []
+
+def test_spilling_group_by_stays_in_memory_below_the_limit(spill_directory):
+    records = random_records(3)
+    calls = []
+
+    def make_records():
+        calls.append(1)
+        return iter(records)
+
+    groups = spilling_group_by(make_records, 'rocket', STATS_FIELDS, max_groups=10)
+    assert len(calls) == 1
+    assert {key: aggregate.result() for key, aggregate in groups.items()} == group_by(records, 'rocket')
+
+def test_spilling_group_by_reads_views_from_a_data_file(tmp_path, spill_directory):
+    records = random_records(4, 200)
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records(records)
+    groups = spilling_group_by(lambda: manager.iter_views(STATS_FIELDS), 'motor,month', STATS_FIELDS, 5)
+    assert {key: aggregate.result() for key, aggregate in groups.items()} == \
+        group_by(manager.get_views(STATS_FIELDS), 'motor,month')
@@ -0,0 +1,65 @@
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.session import LogbookSession
+from rocket_logbook.cache import ResultCache
+
+def launch(record_id, rocket_name="Alpha"):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=300.0, success=True)
+
+def test_repeated_lookups_hit_until_the_generation_changes():
+    cache = ResultCache(maxsize=2)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [len(calls)]
+
+    assert cache.get('a', 1, compute) == [1]
+    assert cache.get('a', 1, compute) == [1]
+    assert cache.get('a', 2, compute) == [2]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.info() == {'enabled': True, 'size': 1, 'maxsize': 2, 'hits': 1, 'misses': 2,
+                            'hit_rate': 1 / 3}
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.get('a', 0, list)
+    cache.get('b', 0, list)
+    cache.get('a', 0, list)
+    cache.get('c', 0, list)
+    cache.get('a', 0, list)
+    cache.get('b', 0, list)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+def test_disabled_and_oversized_results_are_not_kept():
+    cache = ResultCache(enabled=False)
+    cache.get('a', 0, list)
+    cache.get('a', 0, list)
+    assert cache.info()['size'] == 0 and cache.hit_rate == 0.0
+
+    cache = ResultCache(max_items=2)
+    cache.get('a', 0, lambda: [1, 2, 3])
+    cache.get('a', 0, lambda: [1, 2, 3])
+    assert (cache.hits, cache.misses, cache.info()['size']) == (0, 2, 0)
+
+def test_data_manager_searches_hit_until_a_save(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2, "Beta")])
+    for _ in range(3):
+        assert [record.id for record in manager.search_records("Beta")] == [2]
+    assert (manager.result_cache.hits, manager.result_cache.misses) == (2, 1)
+
+    manager.add_record(launch(3, "Beta"))
+    assert [record.id for record in manager.search_records("Beta")] == [2, 3]
+    assert (manager.result_cache.hits, manager.result_cache.misses) == (2, 2)
+
+def test_session_searches_miss_after_an_edit(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2, "Beta")])
+    session = LogbookSession(manager, autosave_interval=None, journal=False)
+    session.search_records("beta")
+    session.search_records("BETA")
+    session.add_record(launch(3, "Beta"))
+    assert [record.id for record in session.search_records("Beta")] == [2, 3]
+    assert (session.result_cache.hits, session.result_cache.misses) == (1, 2)
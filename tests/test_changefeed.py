@@ -0,0 +1,90 @@
+import pytest
+
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.changefeed import FeedConsumer, change_events
+
+def launch(record_id, altitude=300.0):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name="Alpha", motor_type="C6-5",
+                        altitude=altitude, success=True)
+
+def summary(changes):
+    return [(change['op'], change['cause'], change['id']) for change in changes]
+
+def test_change_events_split_an_event_per_record():
+    row = launch(1).to_dict()
+    event = {'seq': 4, 'timestamp': 1.0, 'op': 'sync',
+             'changes': [{'before': None, 'after': row}, {'before': row, 'after': None}]}
+    events = change_events(event)
+    assert [(change['seq'], change['index'], change['op'], change['cause']) for change in events] == \
+        [(4, 0, 'add', 'sync'), (4, 1, 'delete', 'sync')]
+    assert events[1]['before'] == row and events[1]['after'] is None
+
+def test_consumer_resumes_after_its_last_ack(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file)
+    manager.add_records([launch(1), launch(2)])
+    manager.update_record(launch(1, 450.0))
+
+    consumer = manager.get_feed_consumer("leaderboard")
+    changes = consumer.poll()
+    assert summary(changes) == [('add', 'add', 1), ('add', 'add', 2), ('update', 'update', 1)]
+    assert changes[2]['after']['altitude'] == 450.0
+
+    # Without an ack the same changes are delivered again
+    assert summary(DataManager(data_file).get_feed_consumer("leaderboard").poll()) == summary(changes)
+    consumer.ack()
+
+    manager.delete_record(2)
+    resumed = DataManager(data_file).get_feed_consumer("leaderboard")
+    assert summary(resumed.poll()) == [('delete', 'delete', 2)]
+    resumed.ack()
+    assert resumed.poll() == []
+
+def test_poll_limit_counts_history_events(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    for record_id in range(1, 4):
+        manager.add_record(launch(record_id))
+    consumer = manager.get_feed_consumer("batches")
+    assert [change['id'] for change in consumer.poll(limit=2)] == [1, 2]
+    consumer.ack()
+    assert [change['id'] for change in consumer.poll(limit=2)] == [3]
+
+def test_seek_to_end_and_undo(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2)])
+    consumer = manager.get_feed_consumer("export")
+    assert consumer.seek_to_end() == 1
+    assert consumer.poll() == []
+
+    manager.undo()
+    # The inverse of an event lists its changes in reverse
+    assert summary(consumer.poll()) == [('delete', 'undo', 2), ('delete', 'undo', 1)]
+
+def test_replaced_log_is_found_again_by_sequence_number(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_record(launch(1))
+    manager.add_record(launch(2))
+    consumer = manager.get_feed_consumer("mirror")
+    consumer.poll(limit=1)
+    consumer.ack()
+    consumer.position['offset'] += 3
+
+    assert [change['id'] for change in consumer.poll()] == [2]
+
+def test_subscribers_see_saved_changes(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    seen = []
+    manager.subscribe(seen.append)
+    manager.add_record(launch(1))
+    manager.unsubscribe(seen.append)
+    manager.add_record(launch(2))
+    assert summary(seen) == [('add', 'add', 1)]
+
+def test_invalid_names_and_disabled_history_are_rejected(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    with pytest.raises(ValueError):
+        manager.get_feed_consumer("../escape")
+    with pytest.raises(ValueError):
+        DataManager(str(tmp_path / "other.json"), history=False).get_feed_consumer("leaderboard")
+    assert isinstance(manager.get_feed_consumer("ok.name-1"), FeedConsumer)
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.storage import CODECS, available_codecs, get_codec, write_json_array, _CompiledCodec
+
+ITEMS = [{'id': 1, 'name': "Éclair", 'altitude': 1.5e-7, 'notes': "line\nbreak \"quoted\""},
+         {'id': 2, 'name': None, 'altitude': 300.0, 'success': False, 'nested': [1, {'a': []}]}]
+
+def load(codec, text):
+    return list(codec.iter_array(io.StringIO(text)))
+
+def dump(codec, items, layout):
+    stream = io.StringIO()
+    write_json_array(stream, items, layout, codec=codec)
+    return stream.getvalue()
+
+@pytest.fixture(params=available_codecs())
+def codec(request):
+    return get_codec(request.param)
+
+@pytest.mark.parametrize("layout", ['pretty', 'compact'])
+def test_round_trip_matches_the_standard_library(codec, layout):
+    text = dump(codec, ITEMS, layout)
+    assert json.loads(text) == ITEMS
+    assert load(codec, text) == ITEMS
+    assert load(codec, dump(get_codec('json'), ITEMS, layout)) == ITEMS
+
+def test_pretty_layout_is_byte_identical(codec):
+    assert dump(codec, ITEMS, 'pretty') == dump(get_codec('json'), ITEMS, 'pretty')
+
+def test_rejected_documents_fall_back_to_the_standard_library(codec):
+    assert load(codec, '[NaN, 1]')[1] == 1
+    huge = [2 ** 70]
+    assert json.loads(dump(codec, huge, 'compact')) == huge
+    with pytest.raises(json.JSONDecodeError):
+        load(codec, '{"id": 1}')
+    with pytest.raises(json.JSONDecodeError):
+        load(codec, '[1, 2')
+
+def test_data_manager_reads_files_written_by_every_codec(tmp_path, codec):
+    records = [LaunchRecord(id=1, date="2024-05-04", rocket_name="Alpha", motor_type="C6-5",
+                            altitude=300.0, success=True, notes="Ünïcode")]
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file, layout='compact', codec=codec.name).add_records(records)
+    for name in available_codecs():
+        loaded = DataManager(data_file, codec=name).get_all_records()
+        assert [record.to_dict() for record in loaded] == [record.to_dict() for record in records]
+
+def test_compiled_codec_cannot_be_used_without_a_library():
+    with pytest.raises(TypeError):
+        _CompiledCodec()
+
+def test_get_codec_rejects_unknown_and_missing_libraries():
+    with pytest.raises(ValueError):
+        get_codec('yaml')
+    for name in CODECS:
+        if name not in available_codecs():
+            with pytest.raises(ValueError):
+                get_codec(name)
+    assert get_codec('auto').name == available_codecs()[0]
@@ -0,0 +1,45 @@
+import json
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.dashboard import LogbookWatcher, watch
+
+def launch(record_id, rocket_name="Alpha", success=True, altitude=300.0):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=altitude, success=success)
+
+def test_changes_are_applied_from_the_event_log(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_record(launch(1))
+    watcher = LogbookWatcher(DataManager(data_file))
+
+    writer = DataManager(data_file)
+    writer.add_record(launch(2, "Viking", success=False, altitude=100.0))
+    writer.update_record(launch(1, altitude=500.0))
+    writer.delete_record(2)
+    assert watcher.poll()
+
+    aggregates = watcher.aggregates
+    assert (aggregates.total, aggregates.successes, aggregates.altitude_sum) == (1, 1, 500.0)
+    assert aggregates.rocket_totals == {"Alpha": 1}
+    assert [row['id'] for row in aggregates.recent] == [1]
+    assert (watcher.full_reloads, watcher.incremental_updates) == (1, 3)
+    assert not watcher.poll()
+
+def test_external_edits_trigger_a_full_reload(tmp_path):
+    data_file = tmp_path / "logbook.json"
+    DataManager(str(data_file)).add_record(launch(1))
+    watcher = LogbookWatcher(DataManager(str(data_file)))
+
+    rows = json.loads(data_file.read_text())
+    rows.append(dict(rows[0], id=2))
+    data_file.write_text(json.dumps(rows))
+    # The first poll waits for a history event that never comes
+    assert not watcher.poll()
+    assert watcher.poll()
+    assert (watcher.aggregates.total, watcher.full_reloads) == (2, 2)
+
+@pytest.mark.parametrize("interval", [0, -1, float('nan')])
+def test_interval_must_be_positive(tmp_path, interval):
+    with pytest.raises(ValueError):
+        watch(DataManager(str(tmp_path / "logbook.json")), None, interval)
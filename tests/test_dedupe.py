@@ -0,0 +1,23 @@
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.dedupe import find_duplicate_groups, is_near_duplicate
+
+def launch(record_id, motor_type="C6-5", altitude=300.0, success=True, rocket_name="Estes Alpha III"):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name,
+                        motor_type=motor_type, altitude=altitude, success=success)
+
+def test_exact_duplicates_ignore_case_and_spacing():
+    groups = find_duplicate_groups([launch(1), launch(2, motor_type="c6-5", rocket_name="estes  alpha III")])
+    assert [(group.kind, group.to_dict()['keep'], group.to_dict()['remove']) for group in groups] == [('exact', 1, [2])]
+
+def test_near_duplicate_with_same_impulse_class():
+    assert is_near_duplicate(launch(1, "C6-5", 300.0), launch(2, "C6-3", 305.0))
+
+def test_different_impulse_class_is_not_near_duplicate():
+    assert not is_near_duplicate(launch(1, "B6-4"), launch(2, "C6-4"))
+    assert find_duplicate_groups([launch(1, "B6-4"), launch(2, "C6-4")], near=True) == []
+
+def test_different_outcome_is_not_near_duplicate():
+    assert not is_near_duplicate(launch(1, success=True), launch(2, "C6-3", success=False))
+
+def test_distant_altitudes_are_not_near_duplicates():
+    assert not is_near_duplicate(launch(1, altitude=300.0), launch(2, "C6-3", altitude=400.0))
@@ -0,0 +1,34 @@
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.federation import collect_data_files, federated_query
+
+def launch(record_id, date, rocket_name):
+    return LaunchRecord(id=record_id, date=date, rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=300.0, success=True)
+
+@pytest.fixture
+def club(tmp_path):
+    DataManager(str(tmp_path / "ann.json")).add_records([launch(1, "2024-05-04", "Alpha"),
+                                                         launch(2, "2024-06-01", "Viking")])
+    DataManager(str(tmp_path / "bob.json.gz")).add_records([launch(1, "2024-05-10", "Alpha")])
+    DataManager(str(tmp_path / "bob.json.gz")).get_statistics_snapshot()
+    (tmp_path / "broken.json").write_text('[{"id": 1, "date": ')
+    (tmp_path / "readme.txt").write_text("not a logbook")
+    return tmp_path
+
+def test_directories_expand_to_logbooks_without_sidecars(club):
+    names = [path.rsplit("/", 1)[1] for path in collect_data_files([str(club)])]
+    assert names == ["ann.json", "bob.json.gz", "broken.json"]
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_rows_are_merged_by_date_and_failures_isolated(club, use_processes):
+    result = federated_query([str(club), str(club / "missing.json")], workers=2, use_processes=use_processes)
+    assert [(path.rsplit("/", 1)[1], record.id) for path, record in result.rows] == [
+        ("ann.json", 1), ("bob.json.gz", 1), ("ann.json", 2)]
+    assert sorted((path.rsplit("/", 1)[1], error.split(":")[0]) for path, error in result.errors) == [
+        ("broken.json", "JSONDecodeError"), ("missing.json", "file not found")]
+
+def test_search_term_is_applied_in_every_logbook(club):
+    result = federated_query([str(club)], "alpha")
+    assert [record.date for _path, record in result.rows] == ["2024-05-04", "2024-05-10"]
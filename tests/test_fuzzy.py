@@ -0,0 +1,45 @@
+import random
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.fuzzy import FuzzyIndex, edit_distance, match_distance
+
+def test_edit_distance_counts_transpositions_as_one_edit():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("dgo", "dog") == 1
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("abcdef", "uvwxyz", limit=2) == 3
+
+def test_terms_match_runs_of_words():
+    assert match_distance("estes alfa", "estes alpha iii") == 2
+    assert match_distance("viking", "big bertha") > 2
+
+def test_index_finds_the_same_values_as_a_full_scan():
+    rng = random.Random(7)
+    alphabet = "abcdefghij "
+    values = {"".join(rng.choice(alphabet) for _ in range(rng.randint(3, 14))).strip() or "x" for _ in range(400)}
+    index = FuzzyIndex(values)
+    assert len(index) == len(values)
+
+    for _ in range(100):
+        value = rng.choice(sorted(values))
+        term = list(value)
+        term[rng.randrange(len(term))] = rng.choice(alphabet)
+        term = " ".join("".join(term).split())
+        if not term:
+            continue
+        for max_distance in (1, 2):
+            expected = sorted((candidate, distance) for candidate in values
+                              for distance in [match_distance(term, candidate.lower(), max_distance)]
+                              if distance <= max_distance)
+            assert sorted(index.search(term, max_distance)) == expected
+
+def test_fuzzy_search_records_ranks_closest_first(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([
+        LaunchRecord(id=1, date="2024-05-04", rocket_name="Big Bertha", motor_type="C6-5", altitude=200.0, success=True),
+        LaunchRecord(id=2, date="2024-05-04", rocket_name="Estes Alpha III", motor_type="C6-5", altitude=300.0, success=True),
+        LaunchRecord(id=3, date="2024-05-05", rocket_name="Estes Alpha", motor_type="B6-4", altitude=150.0, success=False),
+    ])
+    assert [record.id for record in manager.fuzzy_search_records("Estes Alpa")] == [3, 2]
+    assert [record.id for record in manager.fuzzy_search_records("Big Bretha")] == [1]
+    assert manager.fuzzy_search_records("Zzzzzz") == []
@@ -0,0 +1,57 @@
+import itertools
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.history import History, apply_changes
+
+def launch(record_id, rocket_name="Alpha"):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=300.0, success=True)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make every event one second later than the one before."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr("rocket_logbook.history.time.time", lambda: float(next(ticks)))
+
+def names(records):
+    return [(record.id, record.rocket_name) for record in records]
+
+def test_as_of_replays_events_after_the_nearest_snapshot(tmp_path, clock):
+    manager = DataManager(str(tmp_path / "logbook.json"), checkpoint_interval=2)
+    manager.add_record(launch(1))                    # event 1 at 1000
+    manager.add_record(launch(2))                    # event 2 at 1001, checkpoint
+    manager.update_record(launch(1, "Renamed"))      # event 3 at 1002
+    manager.delete_record(2)                         # event 4 at 1003, checkpoint
+
+    assert [snapshot['seq'] for snapshot in manager.history.get_snapshots()] == [0, 2, 4]
+    assert manager.as_of(999.5) is None
+    assert names(manager.as_of(1000.5)) == [(1, "Alpha")]
+    assert names(manager.as_of(1002.5)) == [(1, "Renamed"), (2, "Alpha")]
+    assert names(manager.as_of(2000)) == [(1, "Renamed")]
+
+def test_undo_walks_back_and_is_itself_recorded(tmp_path, clock):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2)])
+    manager.update_record(launch(2, "Renamed"))
+
+    assert manager.undo()['op'] == 'update'
+    assert names(manager.get_all_records()) == [(1, "Alpha"), (2, "Alpha")]
+    # A bulk add is undone as a whole
+    manager.undo()
+    assert manager.get_all_records() == []
+    assert manager.undo() is None
+    assert [event['op'] for event in manager.history.iter_events_reverse()] == ['undo', 'undo', 'update', 'add']
+
+def test_apply_changes_in_reverse_restores_the_before_images():
+    state = {1: {'id': 1, 'name': "a"}}
+    changes = [{'before': {'id': 1, 'name': "a"}, 'after': {'id': 1, 'name': "b"}},
+               {'before': None, 'after': {'id': 2, 'name': "c"}}]
+    apply_changes(state, changes)
+    assert state == {1: {'id': 1, 'name': "b"}, 2: {'id': 2, 'name': "c"}}
+    apply_changes(state, changes, reverse=True)
+    assert state == {1: {'id': 1, 'name': "a"}}
+
+def test_checkpoint_interval_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        History(str(tmp_path), checkpoint_interval=0)
@@ -0,0 +1,112 @@
+import os
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.integrity import DataFileDamagedError
+
+RECORDS = 2500
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "logbook.json")
+    DataManager(path, history=False).add_records([
+        LaunchRecord(id=record_id, date="2024-05-04", rocket_name=f"Rocket {record_id}",
+                     motor_type="C6-5", altitude=300.0, success=True)
+        for record_id in range(1, RECORDS + 1)
+    ])
+    return path
+
+def edit(path, change):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(change(text))
+
+def test_intact_file_is_verified_with_checksums(data_file):
+    report = DataManager(data_file).verify()
+    assert report.ok and report.checksums
+    assert (report.blocks, report.records) == (3, RECORDS)
+
+def test_damaged_block_is_found_and_recovered(data_file):
+    # Break the quote opening one record's rocket name in the second block
+    edit(data_file, lambda text: text.replace('"Rocket 1500"', 'XRocket 1500"'))
+    manager = DataManager(data_file)
+    report = manager.verify()
+    assert report.checksums and report.bad_blocks == [1]
+    assert report.records == RECORDS - 1000
+    assert any("edited externally" in problem for problem in report.problems)
+
+    manager.get_all_records()
+    assert manager.damaged
+    with pytest.raises(DataFileDamagedError):
+        manager.add_record(LaunchRecord(id=RECORDS + 1, date="2024-05-05", rocket_name="New",
+                                        motor_type="C6-5", altitude=300.0, success=True))
+
+    result = manager.recover()
+    assert (result['recovered'], result['salvaged']) == (RECORDS - 1, 999)
+    assert DataManager(data_file).verify().ok
+
+def test_truncated_file_is_verified_with_checksums(data_file):
+    edit(data_file, lambda text: text[:len(text) // 2])
+    manager = DataManager(data_file)
+    report = manager.verify()
+    assert report.checksums and report.bad_blocks == [1, 2]
+    assert report.records == 1000
+
+    result = manager.recover()
+    ids = [record.id for record in DataManager(data_file).get_all_records()]
+    assert ids == list(range(1, result['recovered'] + 1))
+    assert 1000 < result['recovered'] < RECORDS
+
+def test_data_after_the_array_fails_verify_and_load(data_file):
+    edit(data_file, lambda text: text + "junk")
+    manager = DataManager(data_file)
+    assert not manager.verify().ok
+    manager.get_all_records()
+    assert manager.damaged
+
+def test_whitespace_after_the_array_is_accepted(data_file):
+    edit(data_file, lambda text: text + "\n\n")
+    manager = DataManager(data_file)
+    assert manager.verify().ok
+    assert len(manager.get_all_records()) == RECORDS
+    assert not manager.damaged
+
+def test_deleted_characters_only_damage_their_block(data_file):
+    edit(data_file, lambda text: text.replace('"Rocket 500"', '"R 500"'))
+    manager = DataManager(data_file)
+    report = manager.verify()
+    assert report.bad_blocks == [0]
+    assert report.records == RECORDS - 1000
+
+    result = manager.recover()
+    assert (result['recovered'], result['salvaged']) == (RECORDS, 1000)
+    records = DataManager(data_file).get_all_records()
+    assert [record.id for record in records] == list(range(1, RECORDS + 1))
+    assert records[499].rocket_name == "R 500"
+
+def test_inserted_characters_only_damage_their_block(data_file):
+    edit(data_file, lambda text: text.replace('"Rocket 1500"', '"Rocket 1500" inserted garbage'))
+    manager = DataManager(data_file)
+    report = manager.verify()
+    assert report.bad_blocks == [1]
+    assert report.records == RECORDS - 1000
+
+    result = manager.recover()
+    assert (result['recovered'], result['salvaged']) == (RECORDS - 1, 999)
+
+def test_failed_save_leaves_the_data_file_intact(data_file, monkeypatch):
+    with open(data_file, 'rb') as f:
+        before = f.read()
+
+    def fail(stream, rows, *args):
+        stream.write("[")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("rocket_logbook.data_manager.write_json_array", fail)
+    manager = DataManager(data_file)
+    with pytest.raises(OSError):
+        manager.delete_record(1)
+    with open(data_file, 'rb') as f:
+        assert f.read() == before
+    assert not [name for name in os.listdir(os.path.dirname(data_file)) if name.endswith(".tmp")]
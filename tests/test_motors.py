@@ -0,0 +1,25 @@
+from rocket_logbook.motors import parse_motor_designation, impulse_class_rank
+
+def test_designations_are_parsed():
+    motor = parse_motor_designation("1/2A6-2")
+    assert (motor.valid, motor.impulse_class, motor.average_thrust, motor.delay) == (True, "1/2A", 6.0, 2)
+    motor = parse_motor_designation(" g80-7t ")
+    assert (motor.impulse_class, motor.average_thrust, motor.delay) == ("G", 80.0, 7)
+
+def test_plugged_and_coded_delays_have_no_seconds():
+    plugged = parse_motor_designation("D12-P")
+    assert plugged.plugged and plugged.delay is None
+    coded = parse_motor_designation("F50-M")
+    assert not coded.plugged and coded.delay is None and coded.impulse_class == "F"
+
+def test_unparseable_designations_are_invalid():
+    for motor_type in ("homemade", "", None, "Z9-1"):
+        motor = parse_motor_designation(motor_type)
+        assert not motor.valid and motor.impulse_class is None
+
+def test_parsing_is_cached_per_string():
+    assert parse_motor_designation("C6-5") is parse_motor_designation("C6-5")
+
+def test_impulse_classes_sort_by_total_impulse():
+    classes = ["C", None, "1/2A", "A", "1/4A", "1/8A", "B"]
+    assert sorted(classes, key=impulse_class_rank) == ["1/8A", "1/4A", "1/2A", "A", "B", "C", None]
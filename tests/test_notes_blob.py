@@ -0,0 +1,55 @@
+import json
+import os
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager, NOTES_COMPACT_MIN_BYTES
+
+def launch(record_id, notes=""):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name="Alpha", motor_type="C6-5",
+                        altitude=300.0, success=True, notes=notes)
+
+def stored_rows(data_file):
+    with open(data_file) as f:
+        return json.load(f)
+
+def test_notes_are_kept_out_of_the_data_file(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file, notes_storage='blob')
+    manager.add_records([launch(1, "Windy day, ✓ recovered"), launch(2)])
+
+    rows = stored_rows(data_file)
+    assert 'notes' not in rows[0] and rows[0]['notes_ref'][0] == 1
+    assert rows[1]['notes'] == ""
+    # The storage choice is remembered from the blob on disk
+    reopened = DataManager(data_file)
+    assert reopened.notes_storage == 'blob'
+    assert [record.notes for record in reopened.get_all_records()] == ["Windy day, ✓ recovered", ""]
+
+def test_unchanged_notes_keep_their_reference(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file, notes_storage='blob')
+    manager.add_records([launch(1, "first"), launch(2, "second")])
+    ref = stored_rows(data_file)[0]['notes_ref']
+
+    manager.update_record(launch(2, "second, edited"))
+    rows = stored_rows(data_file)
+    assert rows[0]['notes_ref'] == ref
+    assert DataManager(data_file).get_record_by_id(2).notes == "second, edited"
+
+def test_mostly_garbage_blob_is_compacted(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file, notes_storage='blob', history=False)
+    manager.add_records([launch(1, "keep me"), launch(2, "x" * (NOTES_COMPACT_MIN_BYTES + 1))])
+    manager.update_record(launch(2, "short"))
+    manager.update_record(launch(1, "keep me too"))
+
+    assert manager.notes_blob.generations() == [2]
+    assert not os.path.exists(data_file + ".notes.1")
+    assert [record.notes for record in DataManager(data_file).get_all_records()] == ["keep me too", "short"]
+
+def test_switching_back_to_inline_notes(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file, notes_storage='blob').add_records([launch(1, "out of line")])
+    manager = DataManager(data_file, notes_storage='inline')
+    manager.update_record(launch(1, "out of line"))
+    assert stored_rows(data_file)[0]['notes'] == "out of line"
+    assert manager.notes_blob.generations() == []
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.session import LogbookSession
+from rocket_logbook.ranking import SortedIndex, sort_records, top_records, top_records_per_group
+
+ROCKETS = ("Alpha", "Beta", "Gamma")
+
+def random_records(seed, count=200):
+    rng = random.Random(seed)
+    return [LaunchRecord(id=record_id, date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                         rocket_name=rng.choice(ROCKETS), motor_type=rng.choice(("B6-4", "C6-5")),
+                         altitude=float(rng.randint(0, 20) * 10), success=rng.random() < 0.8)
+            for record_id in range(1, count + 1)]
+
+def ids(records):
+    return [record.id for record in records]
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("smallest", [False, True])
+def test_top_records_match_a_full_sort(seed, smallest):
+    records = random_records(seed)
+    expected = sort_records(records, 'altitude', reverse=not smallest)[:10]
+    assert ids(top_records(iter(records), 10, smallest=smallest)) == ids(expected)
+
+@pytest.mark.parametrize("smallest", [False, True])
+def test_top_records_per_group_match_a_full_sort(smallest):
+    records = random_records(5)
+    selected = top_records_per_group(iter(records), 3, 'date', 'rocket', smallest)
+    assert list(selected) == list(ROCKETS)
+    for rocket in ROCKETS:
+        group = [record for record in records if record.rocket_name == rocket]
+        assert ids(selected[rocket]) == ids(sort_records(group, 'date', reverse=not smallest)[:3])
+    assert top_records_per_group(records, 0) == {}
+
+def test_unknown_fields_and_groupings_are_rejected():
+    with pytest.raises(ValueError):
+        sort_records([], 'notes')
+    with pytest.raises(ValueError):
+        top_records_per_group([], 1, per='pad')
+
+def test_sorted_index_follows_additions_and_removals():
+    records = random_records(7, 50)
+    index = SortedIndex('altitude', records[:40])
+    for record in records[40:]:
+        index.add(record)
+    for record in records[:10]:
+        index.remove(record)
+    index.remove(records[0])
+    kept = records[10:]
+
+    assert len(index) == 40
+    assert index.ids() == ids(sort_records(kept, 'altitude'))
+    assert index.ids(reverse=True, limit=5) == ids(sort_records(kept, 'altitude', reverse=True)[:5])
+    assert index.ids(limit=0) == []
+
+def test_session_indexes_stay_in_step_with_edits(tmp_path):
+    records = random_records(9, 30)
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records(records)
+    session = LogbookSession(manager, autosave_interval=None, journal=False)
+    assert ids(session.get_top_records(5)) == ids(manager.get_top_records(5))
+
+    session.delete_record(records[0].id)
+    changed = records[1].to_dict()
+    changed['altitude'] = 10000.0
+    session.update_record(LaunchRecord(**changed))
+    session.flush()
+    assert session.get_top_records(1)[0].id == records[1].id
+    assert ids(session.get_top_records(5, smallest=True)) == ids(manager.get_top_records(5, smallest=True))
@@ -0,0 +1,36 @@
+import io
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.report import write_report
+from rocket_logbook.storage import get_codec
+
+def launch(record_id):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name="Estes Alpha III",
+                        motor_type="C6-5", altitude=300.0, success=True)
+
+def test_empty_logbook_shows_not_applicable():
+    stream = io.StringIO()
+    assert write_report([], stream, 'md') == 0
+    text = stream.getvalue()
+    assert "None" not in text
+    assert "| Most Used Rocket | N/A |" in text
+    assert "| First Launch Date | N/A |" in text
+    assert "| Total Launches | 0 |" in text
+
+def test_launch_list_is_paged():
+    stream = io.StringIO()
+    assert write_report((launch(record_id) for record_id in range(1, 6)), stream, 'html', page_size=2) == 5
+    text = stream.getvalue()
+    assert text.count("<h3 id=\"page-") == 3
+    assert "May 04, 2024" in text
+    assert "<td>Estes Alpha III</td>" in text
+
+def test_records_can_be_streamed_with_another_codec(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([launch(1), launch(2)])
+    # A codec that cannot read, so only the one passed in is used
+    codec = manager.codec = object()
+
+    stream = io.StringIO()
+    assert write_report(manager.iter_records(codec=get_codec('json')), stream, 'md') == 2
+    assert manager.codec is codec
@@ -0,0 +1,102 @@
+import os
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.session import LogbookSession
+
+def launch(record_id, rocket_name):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name,
+                        motor_type="C6-5", altitude=300.0, success=True)
+
+def test_flush_moves_added_records_off_ids_taken_by_another_writer(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_record(launch(1, "A"))
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+
+    other = DataManager(data_file)
+    other.add_record(launch(other.get_next_id(), "OTHER"))
+
+    session.add_record(launch(session.get_next_id(), "SESSION"))
+    session.update_record(launch(2, "SESSION EDITED"))
+    assert session.flush() == 2
+    assert session.remapped == [(2, 3)]
+
+    rows = [(record.id, record.rocket_name) for record in DataManager(data_file).get_all_records()]
+    assert rows == [(1, "A"), (2, "OTHER"), (3, "SESSION EDITED")]
+    assert session.get_next_id() == 4
+
+def test_flush_without_other_writers_keeps_ids(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+    session.add_record(launch(session.get_next_id(), "A"))
+    session.flush()
+    assert session.remapped == []
+    assert [record.id for record in DataManager(data_file).get_all_records()] == [1]
+
+def crash(session):
+    """Drop a session without flushing, leaving its journal behind."""
+    session.changes = []
+
+def test_journal_is_rebased_onto_records_added_during_the_crash(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_record(launch(1, "A"))
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+    session.add_record(launch(session.get_next_id(), "Session"))
+    crash(session)
+
+    DataManager(data_file).add_record(launch(2, "Other"))
+    recovered = LogbookSession(DataManager(data_file), autosave_interval=None)
+    assert recovered.remapped == [(2, 3)]
+    rows = [(record.id, record.rocket_name) for record in DataManager(data_file).get_all_records()]
+    assert rows == [(1, "A"), (2, "Other"), (3, "Session")]
+    assert not os.path.exists(recovered.journal_file)
+
+def test_journal_of_a_completed_flush_changes_nothing(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file)
+    manager.add_records([launch(1, "A"), launch(2, "B")])
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+    session.add_record(launch(3, "C"))
+    session.update_record(launch(3, "C edited"))
+    session.delete_record(2)
+    with open(session.journal_file) as f:
+        journal = f.read()
+    session.flush()
+    # Killed after the save but before the journal was removed
+    with open(session.journal_file, 'w') as f:
+        f.write(journal)
+    DataManager(data_file).update_record(launch(1, "A edited"))
+    events = len(list(manager.history.iter_events_reverse()))
+
+    recovered = LogbookSession(DataManager(data_file), autosave_interval=None)
+    assert (recovered.remapped, recovered.skipped) == ([], [])
+    rows = [(record.id, record.rocket_name) for record in DataManager(data_file).get_all_records()]
+    assert rows == [(1, "A edited"), (3, "C edited")]
+    assert len(list(manager.history.iter_events_reverse())) == events
+
+def test_journaled_edits_of_records_changed_since_are_skipped(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_records([launch(1, "A"), launch(2, "B")])
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+    session.update_record(launch(1, "Session"))
+    session.delete_record(2)
+    crash(session)
+
+    other = DataManager(data_file)
+    other.update_record(launch(1, "Other"))
+    other.update_record(launch(2, "Other B"))
+    recovered = LogbookSession(DataManager(data_file), autosave_interval=None)
+    assert [record_id for record_id, _reason in recovered.skipped] == [1, 2]
+    rows = [(record.id, record.rocket_name) for record in DataManager(data_file).get_all_records()]
+    assert rows == [(1, "Other"), (2, "Other B")]
+
+def test_journal_is_replayed_when_the_file_is_unchanged(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_record(launch(1, "A"))
+    session = LogbookSession(DataManager(data_file), autosave_interval=None)
+    session.update_record(launch(1, "Session"))
+    session.add_record(launch(2, "New"))
+    crash(session)
+
+    LogbookSession(DataManager(data_file), autosave_interval=None)
+    rows = [(record.id, record.rocket_name) for record in DataManager(data_file).get_all_records()]
+    assert rows == [(1, "Session"), (2, "New")]
@@ -0,0 +1,83 @@
+import bisect
+import random
+
+import pytest
+
+from rocket_logbook.sketches import QuantileSketch, DEFAULT_RANK_ERROR
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+def rank_errors(sketch, values):
+    """Difference between the requested rank and the true rank of each estimate."""
+    exact = sorted(values)
+    errors = []
+    for q, estimate in zip(QUANTILES, sketch.quantiles(QUANTILES)):
+        true_rank = bisect.bisect_right(exact, estimate) / len(exact)
+        errors.append(abs(true_rank - q))
+    return errors
+
+def altitudes(count, seed):
+    """Skewed, altitude-like values with many repeats, as in real logbooks."""
+    rng = random.Random(seed)
+    return [round(rng.lognormvariate(5.5, 0.6), 1) for _ in range(count)]
+
+@pytest.mark.parametrize("count", [1000, 20000, 200000])
+def test_quantiles_within_rank_error(count):
+    values = altitudes(count, seed=count)
+    sketch = QuantileSketch(seed=1)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == count
+    assert max(rank_errors(sketch, values)) <= DEFAULT_RANK_ERROR
+
+def test_sorted_input_within_rank_error():
+    values = list(range(100000))
+    sketch = QuantileSketch(seed=2)
+    for value in values:
+        sketch.add(value)
+
+    assert max(rank_errors(sketch, values)) <= DEFAULT_RANK_ERROR
+
+@pytest.mark.parametrize("partitions", [2, 7, 16])
+def test_merged_partitions_within_rank_error(partitions):
+    values = altitudes(100000, seed=partitions)
+    chunk = (len(values) + partitions - 1) // partitions
+
+    merged = QuantileSketch(seed=3)
+    for index, start in enumerate(range(0, len(values), chunk)):
+        part = QuantileSketch(seed=100 + index)
+        for value in values[start:start + chunk]:
+            part.add(value)
+        merged.merge(part)
+
+    assert merged.count == len(values)
+    assert merged.minimum == min(values)
+    assert merged.maximum == max(values)
+    assert max(rank_errors(merged, values)) <= DEFAULT_RANK_ERROR
+
+def test_small_sketch_is_exact():
+    values = altitudes(50, seed=4)
+    sketch = QuantileSketch(seed=5)
+    for value in values:
+        sketch.add(value)
+
+    exact = sorted(values)
+    assert sketch.quantile(0) == exact[0]
+    assert sketch.quantile(1) == exact[-1]
+    assert sketch.quantile(0.5) == exact[24]
+
+def test_round_trip_keeps_estimates():
+    values = altitudes(30000, seed=6)
+    sketch = QuantileSketch(seed=7)
+    for value in values:
+        sketch.add(value)
+
+    restored = QuantileSketch.from_dict(sketch.to_dict(), seed=7)
+    assert restored.quantiles(QUANTILES) == sketch.quantiles(QUANTILES)
+    assert max(rank_errors(restored, values)) <= DEFAULT_RANK_ERROR
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantiles([0.5, 0.9]) == [None, None]
+    assert sketch.rank(10) == 0.0
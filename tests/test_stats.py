@@ -0,0 +1,72 @@
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.motors import impulse_class_rank
+from rocket_logbook.stats import (group_by, multi_group_by, parse_group_keys, summarize_records,
+                                  calculate_statistics, get_monthly_launch_count, get_rocket_success_rates,
+                                  get_impulse_class_altitudes, get_delay_success_rates)
+
+def launch(record_id, date, rocket_name, altitude, success=True, motor_type="C6-5"):
+    return LaunchRecord(id=record_id, date=date, rocket_name=rocket_name, motor_type=motor_type,
+                        altitude=altitude, success=success)
+
+RECORDS = [
+    launch(1, "2024-05-04", "Alpha", 300.0),
+    launch(2, "2024-05-18", "Alpha", 100.0, success=False),
+    launch(3, "2024-06-01", "Viking", 500.0, motor_type="D12-5"),
+    launch(4, "2025-01-12", "Alpha", 200.0),
+]
+
+def test_group_by_combined_keys():
+    groups = group_by(RECORDS, "rocket,year", ('count', 'mean', 'min', 'max', 'success_rate'))
+    assert groups == {
+        ("Alpha", "2024"): {'count': 2, 'mean': 200.0, 'min': 100.0, 'max': 300.0, 'success_rate': 50.0},
+        ("Viking", "2024"): {'count': 1, 'mean': 500.0, 'min': 500.0, 'max': 500.0, 'success_rate': 100.0},
+        ("Alpha", "2025"): {'count': 1, 'mean': 200.0, 'min': 200.0, 'max': 200.0, 'success_rate': 100.0},
+    }
+
+def test_multi_group_by_reads_a_generator_once():
+    results = multi_group_by((record for record in RECORDS), {'all': (), 'month': 'month'})
+    assert results['all'][()].count == 4
+    assert {month: aggregate.count for month, aggregate in results['month'].items()} == {
+        "2024-05": 2, "2024-06": 1, "2025-01": 1}
+
+def test_summarize_records_matches_separate_passes():
+    summary = summarize_records(iter(RECORDS))
+    assert summary['statistics'] == calculate_statistics(RECORDS)
+    assert summary['monthly_launch_count'] == get_monthly_launch_count(RECORDS)
+    assert summary['rocket_success_rates'] == get_rocket_success_rates(RECORDS)
+    assert summary['statistics']['most_used_rocket'] == "Alpha"
+    assert summary['statistics']['first_launch_date'] == "2024-05-04"
+
+def test_unknown_group_key_is_rejected():
+    assert parse_group_keys(" rocket , month ") == ('rocket', 'month')
+    with pytest.raises(ValueError):
+        parse_group_keys("colour")
+
+def test_impulse_class_and_delay_breakdowns():
+    records = [
+        launch(1, "2024-05-04", "Alpha", 100.0, motor_type="1/2A6-2"),
+        launch(2, "2024-05-04", "Alpha", 300.0, motor_type="C6-5"),
+        launch(3, "2024-05-05", "Alpha", 500.0, success=False, motor_type="C6-5"),
+        launch(4, "2024-05-05", "Alpha", 700.0, motor_type="D12-P"),
+        launch(5, "2024-05-06", "Alpha", 50.0, motor_type="homemade"),
+    ]
+    altitudes = get_impulse_class_altitudes(records)
+    assert altitudes["C"] == {'count': 2, 'mean': 400.0, 'min': 300.0, 'max': 500.0}
+    assert altitudes["1/2A"]['count'] == 1 and altitudes[None]['count'] == 1
+    assert get_delay_success_rates(records) == {2: 100.0, 5: 50.0, None: 100.0}
+
+    summary = summarize_records(iter(records))
+    assert summary['impulse_class_altitudes'] == altitudes
+    assert summary['delay_success_rates'] == get_delay_success_rates(records)
+    assert sorted(altitudes, key=impulse_class_rank) == ["1/2A", "C", "D", None]
+
+def test_statistics_snapshot_keeps_the_breakdowns(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_records(RECORDS)
+    computed = DataManager(data_file).get_statistics_snapshot()
+    cached = DataManager(data_file).get_statistics_snapshot()
+    assert cached == computed
+    assert dict(cached['delay_success_rates']) == {5: 75.0}
+    assert dict(cached['impulse_class_altitudes'])["D"]['count'] == 1
@@ -0,0 +1,46 @@
+import os
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+
+def launch(record_id, altitude=300.0):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name="Alpha", motor_type="C6-5",
+                        altitude=altitude, success=True)
+
+def fail_to_read(*args):
+    raise AssertionError("the data file was read")
+
+def test_unchanged_file_is_served_from_the_sidecar(tmp_path, monkeypatch):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_records([launch(1), launch(2, 500.0)])
+    first = DataManager(data_file).get_statistics_snapshot()
+    assert first['statistics']['max_altitude'] == 500.0
+    assert os.path.exists(data_file + ".stats.json")
+
+    manager = DataManager(data_file)
+    monkeypatch.setattr(manager, 'iter_views', fail_to_read)
+    assert manager.get_statistics_snapshot()['statistics'] == first['statistics']
+
+def test_changed_file_is_recomputed(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = DataManager(data_file)
+    manager.add_records([launch(1)])
+    assert manager.get_statistics_snapshot()['statistics']['total_launches'] == 1
+    manager.add_record(launch(2))
+    assert DataManager(data_file).get_statistics_snapshot()['statistics']['total_launches'] == 2
+
+def test_content_hash_catches_rewrites_that_keep_size_and_mtime(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    DataManager(data_file).add_records([launch(1, 300.0)])
+    DataManager(data_file).get_statistics_snapshot()
+
+    stat = os.stat(data_file)
+    with open(data_file) as f:
+        text = f.read()
+    with open(data_file, 'w') as f:
+        f.write(text.replace("300.0", "900.0"))
+    assert os.path.getsize(data_file) == stat.st_size
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert DataManager(data_file).get_statistics_snapshot()['statistics']['max_altitude'] == 300.0
+    snapshot = DataManager(data_file).get_statistics_snapshot(verify_hash=True)
+    assert snapshot['statistics']['max_altitude'] == 900.0
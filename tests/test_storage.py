@@ -0,0 +1,33 @@
+import io
+import json
+
+import pytest
+
+from rocket_logbook.storage import iter_json_array, write_json_array
+
+@pytest.mark.parametrize("text", ['[]', '[1, 2, 3]', '[{"a": [1, {"b": 2}]}, "x"]', '[1]  \n '])
+def test_matches_json_loads(text):
+    assert list(iter_json_array(io.StringIO(text), chunk_size=2)) == json.loads(text)
+
+@pytest.mark.parametrize("text", ['[1] x', '[1,2]GARBAGE{', '[] z', '[1, 2]' + ' ' * 100 + ']'])
+def test_rejects_data_after_array(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), chunk_size=8))
+
+@pytest.mark.parametrize("text", ['', '{}', '[1, 2', '[1 2]'])
+def test_rejects_invalid_arrays(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text)))
+
+@pytest.mark.parametrize("layout", ['pretty', 'compact'])
+def test_write_round_trip(layout):
+    items = [{'id': index, 'notes': "x" * index} for index in range(2500)]
+    stream = io.StringIO()
+    blocks = []
+    length = write_json_array(stream, items, layout, blocks=blocks)
+
+    text = stream.getvalue()
+    assert length == len(text)
+    assert json.loads(text) == items
+    assert sum(block[3] for block in blocks) == len(items)
+    assert list(iter_json_array(io.StringIO(text))) == items
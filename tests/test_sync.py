@@ -0,0 +1,66 @@
+import json
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.integrity import DataFileDamagedError
+from rocket_logbook.sync import sync_logbooks
+
+def launch(record_id, rocket_name="Alpha", date="2024-05-04"):
+    return LaunchRecord(id=record_id, date=date, rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=300.0, success=True)
+
+def rows(manager):
+    return [(record.id, record.rocket_name) for record in manager.get_all_records()]
+
+@pytest.fixture
+def replicas(tmp_path):
+    a = DataManager(str(tmp_path / "a.json"))
+    b = DataManager(str(tmp_path / "b.json"))
+    a.add_records([launch(1), launch(2, "Viking")])
+    sync_logbooks(a, b)
+    return a, b
+
+def test_changes_flow_both_ways(replicas):
+    a, b = replicas
+    assert rows(b) == [(1, "Alpha"), (2, "Viking")]
+
+    a.update_record(launch(1, "Alpha II"))
+    b.delete_record(2)
+    b.add_record(launch(3, "Comet", date="2024-06-01"))
+    report = sync_logbooks(a, b)
+    assert (report.copied_to_a, report.copied_to_b, report.deleted_from_a) == ([3], [1], [2])
+    assert rows(a) == rows(b) == [(1, "Alpha II"), (3, "Comet")]
+    assert not sync_logbooks(a, b).changed
+
+def test_edits_on_both_sides_are_conflicts_unless_a_side_is_preferred(replicas):
+    a, b = replicas
+    a.update_record(launch(1, "From A"))
+    b.update_record(launch(1, "From B"))
+    report = sync_logbooks(a, b)
+    assert report.conflicts == [(1, "changed in both logbooks")]
+    assert (rows(a)[0], rows(b)[0]) == ((1, "From A"), (1, "From B"))
+
+    sync_logbooks(a, b, prefer='b')
+    assert rows(a) == rows(b)
+
+def test_new_records_with_the_same_id_are_both_kept(replicas):
+    a, b = replicas
+    a.add_record(launch(3, "Comet", date="2024-06-01"))
+    b.add_record(launch(3, "Nova", date="2024-06-02"))
+    report = sync_logbooks(a, b)
+    assert report.remapped == [(3, 4)]
+    assert rows(a) == rows(b) == [(1, "Alpha"), (2, "Viking"), (3, "Comet"), (4, "Nova")]
+
+def test_damaged_replica_stops_the_sync(replicas):
+    a, b = replicas
+    with open(b.data_file) as f:
+        text = f.read()
+    with open(b.data_file, 'w') as f:
+        f.write(text[:len(text) // 2])
+
+    with pytest.raises(DataFileDamagedError):
+        sync_logbooks(a, DataManager(b.data_file))
+    assert rows(a) == [(1, "Alpha"), (2, "Viking")]
+    # No summary of the failed load was saved
+    with open(b.summary_file) as f:
+        assert set(json.load(f)['hashes']) == {"1", "2"}
@@ -0,0 +1,77 @@
+import json
+import threading
+import pytest
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.stats import summarize_records
+from rocket_logbook.threadsafe import ReadWriteLock, ThreadSafeDataManager
+
+def launch(record_id, rocket_name="Alpha", altitude=300.0, success=True):
+    return LaunchRecord(id=record_id, date="2024-05-04", rocket_name=rocket_name, motor_type="C6-5",
+                        altitude=altitude, success=success)
+
+def test_concurrent_writers_get_unique_ids(tmp_path):
+    manager = ThreadSafeDataManager(str(tmp_path / "logbook.json"))
+
+    def log_launches():
+        for _ in range(10):
+            manager.add_new_record(launch(0))
+
+    threads = [threading.Thread(target=log_launches) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [record.id for record in DataManager(manager.data_file).get_all_records()]
+    assert sorted(ids) == list(range(1, 41))
+
+def test_snapshot_reloads_after_an_external_change(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    manager = ThreadSafeDataManager(data_file)
+    manager.add_record(launch(1))
+    assert [record.id for record in manager.get_all_records()] == [1]
+
+    DataManager(data_file).add_record(launch(2))
+    assert [record.id for record in manager.get_all_records()] == [1, 2]
+    assert manager.get_next_id() == 3
+
+def test_statistics_match_a_single_pass_summary(tmp_path):
+    manager = ThreadSafeDataManager(str(tmp_path / "logbook.json"))
+    records = [launch(1), launch(2, "Beta", 500.0, False), launch(3, "Beta", 400.0)]
+    manager.add_records(records)
+
+    snapshot = manager.get_statistics_snapshot()
+    summary = summarize_records(records)
+    assert snapshot['statistics'] == summary['statistics']
+    assert snapshot['rocket_success_rates'] == summary['rocket_success_rates']
+    assert snapshot['monthly_launch_count'] == summary['monthly_launch_count']
+    assert snapshot['delay_success_rates'] == [list(pair) for pair in summary['delay_success_rates'].items()]
+    assert snapshot == DataManager(manager.data_file).get_statistics_snapshot()
+
+def test_read_locked_passes_do_not_replace_rejected_rows(tmp_path):
+    data_file = str(tmp_path / "logbook.json")
+    with open(data_file, 'w') as f:
+        json.dump([launch(1).to_dict(), {'id': 7, 'date': "not a date"}], f)
+    manager = ThreadSafeDataManager(data_file)
+    manager.get_all_records()
+    rejected_rows = manager.rejected_rows
+    assert [row['id'] for row in rejected_rows] == [7]
+
+    manager.get_altitude_sketches()
+    assert manager.rejected_rows is rejected_rows
+
+    manager.add_record(launch(2))
+    with open(data_file) as f:
+        assert 7 in [row['id'] for row in json.load(f)]
+
+def test_read_lock_cannot_be_upgraded():
+    lock = ReadWriteLock()
+    with lock.read_locked():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    with lock.write_locked():
+        assert lock.holds_write()
+        with lock.read_locked():
+            pass
+    assert not lock.holds_write()
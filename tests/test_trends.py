@@ -0,0 +1,69 @@
+import io
+import csv
+import random
+from datetime import date as Date
+
+import pytest
+
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.trends import TrendEngine, compute_trends, write_trends_csv, ROCKET_TREND_COLUMNS
+
+def random_records(seed, count=300):
+    rng = random.Random(seed)
+    return [LaunchRecord(id=record_id, date=Date.fromordinal(Date(2024, 1, 1).toordinal() + rng.randint(0, 200)).isoformat(),
+                         rocket_name=rng.choice(("Alpha", "Beta", "Gamma")), motor_type="C6-5",
+                         altitude=float(rng.randint(0, 40) * 10), success=rng.random() < 0.7)
+            for record_id in range(1, count + 1)]
+
+def window_of(records, day, window_days):
+    end = Date.fromisoformat(day).toordinal()
+    return [record for record in records
+            if end - window_days < Date.fromisoformat(record.date).toordinal() <= end]
+
+def expected_point(records):
+    count = len(records)
+    return (count, sum(record.success for record in records) / count * 100,
+            sum(record.altitude for record in records) / count)
+
+@pytest.mark.parametrize("window_days", [1, 7, 30])
+def test_rolling_points_match_a_full_rescan(window_days):
+    records = random_records(window_days)
+    engine = compute_trends(reversed(records), window_days)
+
+    assert [point['date'] for point in engine.points] == sorted({record.date for record in records})
+    for point in engine.points:
+        window = window_of(records, point['date'], window_days)
+        count, success_rate, mean_altitude = expected_point(window)
+        assert point['launches'] == count
+        assert point['launches_per_week'] == pytest.approx(count * 7 / window_days)
+        assert point['success_rate'] == pytest.approx(success_rate)
+        assert point['mean_altitude'] == pytest.approx(mean_altitude)
+    for point in engine.rocket_points:
+        window = [record for record in window_of(records, point['date'], window_days)
+                  if record.rocket_name == point['rocket']]
+        assert (point['launches'], point['success_rate']) == \
+            (expected_point(window)[0], pytest.approx(expected_point(window)[1]))
+
+def test_extend_continues_where_the_engine_left_off():
+    records = sorted(random_records(3), key=lambda record: (record.date, record.id))
+    engine = compute_trends(records[:200])
+    assert engine.extend(records[200:]) == 100
+    assert engine.points == compute_trends(records).points
+    assert engine.max_id == max(record.id for record in records)
+
+def test_out_of_order_launches_are_rejected():
+    records = sorted(random_records(4, 20), key=lambda record: record.date)
+    engine = TrendEngine()
+    with pytest.raises(ValueError):
+        engine.extend(records[10:] + records[:1])
+    assert engine.max_id == max(record.id for record in records[10:])
+    with pytest.raises(ValueError):
+        TrendEngine(0)
+
+def test_csv_has_one_row_per_point():
+    engine = compute_trends(random_records(5, 50))
+    stream = io.StringIO(newline='')
+    write_trends_csv(stream, engine.rocket_points, ROCKET_TREND_COLUMNS)
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert len(rows) == len(engine.rocket_points)
+    assert list(rows[0]) == list(ROCKET_TREND_COLUMNS)
@@ -0,0 +1,53 @@
+import json
+from rocket_logbook.models import LaunchRecord
+from rocket_logbook.data_manager import DataManager
+from rocket_logbook.validation import validate_batch, check_record_fields, is_valid_date
+
+def row(record_id, **fields):
+    values = {'id': record_id, 'date': "2024-05-04", 'rocket_name': "Alpha", 'motor_type': "C6-5",
+              'altitude': 300.0, 'success': True, 'notes': ""}
+    values.update(fields)
+    return values
+
+def test_valid_rows_pass_unchanged():
+    rows = [row(1), row(2, altitude=0), {key: value for key, value in row(3).items() if key != 'notes'}]
+    valid, report = validate_batch(rows)
+    assert valid == rows
+    assert (report.ok, report.checked, report.valid, report.rejected) == (True, 3, 3, 0)
+
+def test_invalid_rows_are_rejected_with_their_problems():
+    rows = [row(1), row(2, date="2024-02-30"), row(3, altitude=True), "junk", row(5, colour="red"),
+            row(6, altitude=float('nan')), row(0)]
+    valid, report = validate_batch(rows)
+    assert [item['id'] for item in valid] == [1]
+    assert report.rejected_indexes == [1, 2, 3, 4, 5, 6]
+    assert [(issue.index, issue.record_id, issue.field) for issue in report.issues] == [
+        (1, 2, 'date'), (2, 3, 'altitude'), (3, None, None), (4, 5, 'colour'), (5, 6, 'altitude'), (6, 0, 'id')]
+    assert str(report.issues[0]) == "row 1 (id 2): date: must be a valid date in YYYY-MM-DD format"
+
+def test_duplicate_ids_are_caught_across_batches():
+    seen_ids = set()
+    validate_batch([row(1), row(2)], seen_ids)
+    valid, report = validate_batch([row(2), row(3)], seen_ids, start_index=2)
+    assert [item['id'] for item in valid] == [3]
+    assert [(issue.index, issue.message) for issue in report.issues] == [(2, "duplicate id 2")]
+
+def test_missing_fields_and_bad_notes_refs():
+    problems = check_record_fields({'id': 1, 'notes_ref': [0, 1]})
+    assert ('date', "missing") in problems
+    assert ('notes_ref', "must be a list of generation, offset and length") in problems
+
+def test_dates_must_exist_in_the_calendar():
+    assert is_valid_date("2024-02-29")
+    assert not is_valid_date("2023-02-29")
+    assert not is_valid_date("2024-5-4")
+
+def test_rejected_rows_are_kept_when_saving(tmp_path):
+    data_file = tmp_path / "logbook.json"
+    data_file.write_text(json.dumps([row(1), row(2, date="someday")]))
+    manager = DataManager(str(data_file))
+    assert [record.id for record in manager.get_all_records()] == [1]
+    assert manager.last_validation_report.rejected == 1
+
+    manager.add_record(LaunchRecord(**row(3)))
+    assert [item['id'] for item in json.loads(data_file.read_text())] == [1, 3, 2]
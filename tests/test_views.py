@@ -0,0 +1,40 @@
+import pytest
+from rocket_logbook.models import LaunchRecord, record_view_type
+from rocket_logbook.data_manager import DataManager
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DataManager(str(tmp_path / "logbook.json"))
+    manager.add_records([
+        LaunchRecord(id=1, date="2024-05-04", rocket_name="Alpha", motor_type="C6-5", altitude=300.0,
+                     success=True, notes="first flight"),
+        LaunchRecord(id=2, date="2024-05-05", rocket_name="Viking", motor_type="D12-P", altitude=500.0,
+                     success=False),
+    ])
+    return manager
+
+def test_views_hold_only_the_requested_fields(manager):
+    views = manager.get_views(('id', 'altitude'))
+    assert views == [(1, 300.0), (2, 500.0)]
+    assert views[0].altitude == 300.0
+    assert not hasattr(views[0], 'notes')
+    assert manager.get_views(('id',)) == [(1,), (2,)]
+
+def test_views_with_motor_type_have_the_parsed_motor(manager):
+    views = manager.get_views(('motor_type',))
+    assert [view.motor.impulse_class for view in views] == ["C", "D"]
+    assert views[1].motor.plugged
+
+def test_views_read_notes_only_when_asked(manager):
+    assert [view.notes for view in manager.get_views(('id', 'notes'))] == ["first flight", ""]
+
+def test_view_types_are_shared_and_checked():
+    assert record_view_type(('id', 'date')) is record_view_type(('id', 'date'))
+    with pytest.raises(ValueError):
+        record_view_type(('id', 'colour'))
+
+def test_views_match_full_records(manager):
+    records = manager.get_all_records()
+    views = manager.get_views(('id', 'date', 'rocket_name', 'success'))
+    assert [tuple(view) for view in views] == [(record.id, record.date, record.rocket_name, record.success)
+                                               for record in records]